@@ -4,17 +4,63 @@ import signal
 import atexit
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from utils.config import CHROME_HEADLESS_OPTIONS, START_URL, START_KEY
+from selenium.webdriver.chrome.service import Service
+from utils.config import (
+    CHROME_HEADLESS_OPTIONS, START_URL, START_KEY, CRAWL_ENGINE, ASYNC_BROWSER_COUNT,
+    BROWSER_MODE, BROWSER_REMOTE_URL, BROWSER_DEBUG_HOST, BROWSER_PROFILE_DIR, CHROMEDRIVER_PATH,
+    PROFILE_EVERY, PROFILE_DIR
+)
+from scraper.browser_service import claim_slot, release_slot, get_debugger_address, get_profile_options
 from utils.file_manager import initialize_files
 from scraper.queue_processor import process_queue
 from utils.queue_manager import RedisQueueManager
+from utils.profiler import get_profiler
+
+def _chrome_service():
+    """CHROMEDRIVER_PATH가 지정되면 Selenium Manager 탐색 없이 해당 chromedriver를 사용합니다."""
+    return Service(executable_path=CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else Service()
 
 def create_driver():
-    """Chrome WebDriver를 생성하고 반환합니다."""
+    """
+    Chrome WebDriver를 생성하고 반환합니다.
+    BROWSER_MODE에 따라 새 Chrome을 실행(local)하거나, WebDriver 서버(remote) 또는
+    browser_service가 띄워둔 Chrome(devtools)에 연결합니다.
+    """
     chrome_options = Options()
-    for option in CHROME_HEADLESS_OPTIONS:
-        chrome_options.add_argument(option)
-    return webdriver.Chrome(options=chrome_options)
+    # 슬롯(프로필 폴더/DevTools 포트)은 이 호스트의 브라우저에만 의미가 있으므로 remote 모드에서는 사용하지 않음
+    slot = claim_slot() if BROWSER_MODE != "remote" and (BROWSER_PROFILE_DIR or BROWSER_MODE == "devtools") else None
+
+    if BROWSER_MODE == "devtools":
+        if slot is None:
+            raise Exception("사용 가능한 브라우저 슬롯이 없습니다.")
+        chrome_options.add_experimental_option("debuggerAddress", get_debugger_address(BROWSER_DEBUG_HOST, slot))
+        driver = webdriver.Chrome(options=chrome_options, service=_chrome_service())
+    else:
+        for option in CHROME_HEADLESS_OPTIONS:
+            chrome_options.add_argument(option)
+        if BROWSER_MODE == "remote":
+            driver = webdriver.Remote(command_executor=BROWSER_REMOTE_URL, options=chrome_options)
+        else:
+            if slot is not None:
+                for option in get_profile_options(slot):
+                    chrome_options.add_argument(option)
+            driver = webdriver.Chrome(options=chrome_options, service=_chrome_service())
+
+    driver.browser_slot = slot
+    return driver
+
+def close_driver(driver):
+    """
+    WebDriver를 종료합니다.
+    devtools 모드에서는 chromedriver만 종료하고 브라우저는 다음 실행을 위해 남겨둡니다.
+    """
+    try:
+        if BROWSER_MODE == "devtools":
+            driver.service.stop()
+        else:
+            driver.quit()
+    finally:
+        release_slot(getattr(driver, "browser_slot", None))
 
 def cleanup(queue_manager):
     """프로그램 종료 시 Redis 상태를 임시 파일로 저장합니다."""
@@ -31,6 +77,11 @@ if __name__ == "__main__":
     
     # 종료 시 cleanup 함수 실행 등록
     atexit.register(cleanup, queue_manager)
+
+    # 프로파일링 모드: process_page N번마다 한 번 측정하고, 종료 시 요약 보고서를 남김
+    if PROFILE_EVERY > 0:
+        print(f"프로파일링 모드: process_page {PROFILE_EVERY}회마다 측정 (결과: {PROFILE_DIR})")
+        atexit.register(get_profiler().write_summary)
     
     # 상태 복원 로딩을 담당할 스크래퍼인지 확인하고 복원 시도
     if queue_manager.is_first_scraper_for_loading():
@@ -55,9 +106,19 @@ if __name__ == "__main__":
         # 완전히 새로운 시작인 경우 Redis 데이터를 초기화 (선택 사항, 필요에 따라)
         # queue_manager.clear(START_KEY)
 
-    driver = create_driver()
-    try:
-        # process_queue 함수는 Redis 큐를 사용하여 상태를 공유하며 병렬 실행 가능
-        process_queue(driver, START_URL)
-    finally:
-        driver.quit()
\ No newline at end of file
+    if CRAWL_ENGINE == "async":
+        # asyncio 엔진: 여러 브라우저와 비동기 I/O를 함께 사용
+        from scraper.async_engine import process_queue_async
+        drivers = [create_driver() for _ in range(ASYNC_BROWSER_COUNT)]
+        try:
+            process_queue_async(drivers, START_URL)
+        finally:
+            for driver in drivers:
+                close_driver(driver)
+    else:
+        driver = create_driver()
+        try:
+            # process_queue 함수는 Redis 큐를 사용하여 상태를 공유하며 병렬 실행 가능
+            process_queue(driver, START_URL)
+        finally:
+            close_driver(driver)
\ No newline at end of file
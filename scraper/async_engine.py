@@ -0,0 +1,425 @@
+# scraper/async_engine.py
+# process_queue의 대안으로 사용하는 asyncio 기반 크롤 엔진입니다.
+# Redis와 HTTP는 비동기 클라이언트로, 브라우저 조작과 DB/파일 작업은 각각 전용 스레드 풀에서 실행하여
+# 한 워커 안에서도 여러 I/O가 동시에 진행되고 브라우저는 쉬지 않고 다음 페이지를 렌더링하도록 합니다.
+# 페이지 분석(날짜/카테고리/링크 정규화/지문)은 ANALYSIS_PROCESSES가 0보다 크면 분석 프로세스 풀에서 실행합니다.
+
+import asyncio
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from scraper.board_enumerator import enumerate_board, find_enumerator, mark_article_seen
+from scraper.page_archive import record_page
+from scraper.page_processor import (
+    ImageDownload,
+    analyze_page,
+    extract_content,
+    extract_references,
+    is_in_image_scope,
+    is_in_search_scope,
+    is_login_page,
+    is_valid_url,
+    store_page,
+    wait_for_page_load,
+)
+from utils.config import (
+    ASYNC_CONCURRENCY,
+    ASYNC_IO_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    PAGE_LOAD_DELAY,
+    SCRAPLIST_JSON,
+    START_KEY,
+    WORKER_IDLE_WAIT,
+)
+from utils.file_manager import load_json, process_file_download
+from utils.queue_manager import AsyncRedisQueueManager, RedisQueueManager
+from utils.url_manager import adjust_url
+from utils.worker_registry import WorkerRegistry
+from utils import rate_limiter
+from utils.scope_rules import get_scope_rules
+from utils.image_triage import get_image_triage
+from utils.near_duplicate import get_near_duplicate_index
+from utils.analysis_pool import get_analysis_pool, shutdown_analysis_pool
+from utils.profiler import profile_call
+
+
+def _render(driver, url: str, store: bool):
+    """
+    브라우저 스레드에서 실행: 페이지를 렌더링하고 본문과 참조 목록을 추출합니다.
+    본문은 저장할 페이지(store)만 추출하며, 본문 영역이 없거나 통합인증 페이지이면 참조 목록은 None입니다.
+    """
+    driver.get(url)
+    wait_for_page_load(driver)
+    time.sleep(PAGE_LOAD_DELAY)
+    record_page(driver, url)
+
+    if not store:
+        return None, extract_references(driver)
+    content = extract_content(driver)
+    if content is None or is_login_page(content["title"]):
+        return content, None
+    return content, extract_references(driver)
+
+
+class AsyncCrawlEngine:
+    """
+    여러 큐 항목을 동시에 처리하는 asyncio 크롤 엔진입니다.
+    브라우저는 드라이버 풀로 관리되며, 한 항목이 DB 저장이나 이미지 다운로드를 기다리는 동안
+    다른 항목이 같은 브라우저로 다음 페이지를 렌더링합니다.
+    """
+
+    def __init__(self, drivers: List[Any], key: str = START_KEY, concurrency: int = ASYNC_CONCURRENCY,
+                 io_workers: int = ASYNC_IO_WORKERS, max_retries: int = 3, retry_delay: float = 2):
+        self.drivers = drivers
+        self.key = key
+        self.concurrency = max(concurrency, len(drivers))
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.browser_executor = ThreadPoolExecutor(max_workers=len(drivers), thread_name_prefix="browser")
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        self.queue_manager: Optional[AsyncRedisQueueManager] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.driver_pool: Optional[asyncio.Queue] = None
+        self.registry: Optional[WorkerRegistry] = None
+        self.sync_queue_manager: Optional[RedisQueueManager] = None
+        self.image_triage = get_image_triage(key)
+        self.near_dup = get_near_duplicate_index(key)
+        self.analysis_pool = get_analysis_pool()
+        self.in_flight = 0
+
+    async def _run_io(self, func, *args, **kwargs):
+        """블로킹 DB/파일 작업을 I/O 스레드 풀에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, lambda: func(*args, **kwargs))
+
+    async def _throttle(self, url: str) -> None:
+        """해당 호스트의 공유 토큰을 얻을 때까지 이벤트 루프를 막지 않고 기다립니다."""
+        while True:
+            wait = await self._run_io(rate_limiter.reserve, url)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def _request_started(self, url: str) -> float:
+        await self._throttle(url)
+        return time.monotonic()
+
+    async def _record(self, url: str, started: float, status: Optional[int] = None,
+                      error: bool = False, retry_after: Optional[str] = None) -> None:
+        await self._run_io(rate_limiter.record, url, time.monotonic() - started, status, error, retry_after)
+
+    async def _seed(self, start_url: str) -> None:
+        """scraplist.json의 URL 목록과 시작 URL을 큐에 추가합니다."""
+        qm = self.queue_manager
+        print(f"큐 초기화: {await qm.get_queue_length(self.key)}")
+
+        scraplist = await self._run_io(load_json, SCRAPLIST_JSON)
+        urls = list(scraplist.get(self.key, []))
+        if urls:
+            print(f"START_KEY '{self.key}'에 해당하는 URL 목록을 큐에 추가합니다.")
+        urls.append(start_url)
+        pending = await qm.filter_unvisited(urls, self.key)
+        await qm.push_many([{"type": "page", "url": url} for url in pending], self.key)
+
+        print(f"큐 확인: {await qm.get_queue_length(self.key)}")
+
+    async def _is_file_download(self, url: str) -> bool:
+        """URL 응답이 파일 응답인지 HEAD 요청으로 판단합니다."""
+        started = await self._request_started(url)
+        try:
+            async with self.session.head(url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=5)) as r:
+                await self._record(url, started, r.status, retry_after=r.headers.get("Retry-After"))
+                content_type = r.headers.get("Content-Type", "").lower()
+                return not content_type.startswith("text/html") and not content_type.startswith("application/xhtml+xml")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            await self._record(url, started, error=True)
+            print(f"[에러] 요청 실패: {e}")
+            return False
+
+    async def _render_with_retry(self, url: str, store: bool):
+        """드라이버 풀에서 브라우저를 빌려 렌더링하고, 실패 시 재시도합니다. 모두 실패하면 None을 반환합니다."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries):
+            await self._throttle(url)
+            driver = await self.driver_pool.get()
+            started = time.monotonic()
+            try:
+                # 프로파일링 모드에서는 브라우저 스레드의 렌더링/추출 구간을 측정
+                result = await loop.run_in_executor(self.browser_executor, profile_call, _render, driver, url, store)
+                await self._record(url, started)
+                return result
+            except Exception as e:
+                await self._record(url, started, error=True)
+                print(f"ㄴ페이지 처리 중 오류 발생 (URL: {url}): {e}")
+            finally:
+                self.driver_pool.put_nowait(driver)
+
+            if attempt < self.max_retries - 1:
+                print(f"ㄴ재시도 중... ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(self.retry_delay)
+        print(f"ㄴ최대 재시도 횟수 초과 (URL: {url})")
+        return None
+
+    async def _process_page(self, url: str) -> None:
+        """페이지를 렌더링한 뒤 저장, 링크/이벤트 등록, 이미지 다운로드를 동시에 진행합니다."""
+        print(f"페이지 처리: {url}")
+        url = adjust_url(url)
+        if not is_valid_url(url):
+            print(f"ㄴ유효하지 않은 URL: {url}")
+            return
+
+        # 최초접속인 경우에만 데이터 저장 (본문 영역/통합인증 확인도 저장할 때만 수행)
+        store = not await self.queue_manager.is_visited(url, self.key)
+        rendered = await self._render_with_retry(url, store)
+        if rendered is None:
+            return
+        content, references = rendered
+        if store and content is None:
+            print(f"ㄴ컨텐츠 영역을 찾을 수 없음: {url}")
+            return
+        if store and references is None:
+            print(f"ㄴ통합인증 페이지 감지, 처리 중단: {url}")
+            return
+
+        analysis = await self._analyze(url, content["data"] if store else "", references["links"], references["events"], store)
+        if store and self.near_dup is not None:
+            # 이미 저장한 페이지와 본문이 거의 같으면 저장과 링크 탐색을 생략 (이미지는 그대로 처리)
+            original = await self._run_io(self.near_dup.check_fingerprint, url, analysis["fingerprint"])
+            if original:
+                print(f"ㄴ유사 중복 페이지, 저장 및 링크 탐색 생략 (원본: {original}): {url}")
+                await self._process_images(references["images"], url)
+                await self._run_io(mark_article_seen, url, self.sync_queue_manager.redis_client, self.key)
+                return
+
+        tasks = [
+            self._enqueue_references(url, analysis),
+            self._process_images(references["images"], url),
+        ]
+        if store:
+            print(f"ㄴ페이지 정보 저장: {url}")
+            tasks.append(self._store_page(url, content, analysis))
+        await asyncio.gather(*tasks)
+        if store:
+            # 크롤이 끝난 게시글은 다음 게시판 탐색에서 새 게시글로 보지 않음
+            await self._run_io(mark_article_seen, url, self.sync_queue_manager.redis_client, self.key)
+
+    async def _analyze(self, *args) -> Dict[str, Any]:
+        """CPU 작업(analyze_page)을 분석 프로세스 풀에서, 풀을 사용하지 않으면 I/O 스레드 풀에서 실행합니다."""
+        if self.analysis_pool is not None:
+            return await asyncio.wrap_future(self.analysis_pool.run(analyze_page, args))
+        return await self._run_io(analyze_page, *args)
+
+    async def _store_page(self, url: str, content: Dict[str, str], analysis: Dict[str, Any]) -> None:
+        await self._run_io(store_page, url, content["title"], content["data"],
+                           analysis["created_at"], analysis["categories"])
+        if self.near_dup is not None and analysis["fingerprint"] is not None:
+            await self._run_io(self.near_dup.add, analysis["fingerprint"], url)
+
+    async def _enqueue_references(self, parent_url: str, analysis: Dict[str, Any]) -> None:
+        """탐색 영역 내의 미방문 링크와 onClick 이벤트(analyze_page에서 정규화)를 한 번에 큐에 추가합니다."""
+        def _select_in_scope() -> Dict[str, Dict[str, Any]]:
+            # 쿼리 조합 함정 검사가 Redis를 조회하므로 I/O 스레드에서 실행
+            links = {}
+            for href in analysis["links"]:
+                if is_in_search_scope(href):
+                    links.setdefault(href, {"type": "link", "url": href, "parent": parent_url})
+            for onclick, identifier in analysis["events"]:
+                if is_in_search_scope(onclick):
+                    links.setdefault(onclick, {
+                        "type": "event",
+                        "url": onclick,
+                        "onClick": onclick,
+                        "identifier": identifier,
+                        "parent": parent_url
+                    })
+            return links
+
+        try:
+            links = await self._run_io(_select_in_scope)
+            pending = await self.queue_manager.filter_unvisited(list(links), self.key)
+            await self.queue_manager.push_many([links[url] for url in pending], self.key)
+        except Exception as e:
+            print(f"링크 처리 중 오류 발생: {e}")
+
+    async def _process_images(self, images: List[Tuple[str, Optional[int], Optional[int]]], parent_url: str) -> None:
+        """페이지 내 이미지를 동시에 다운로드합니다."""
+        targets = {}
+        for src, width, height in images:
+            image_url = adjust_url(src)
+            if is_valid_url(image_url) and is_in_image_scope(image_url):
+                targets.setdefault(image_url, (width, height))
+        await asyncio.gather(*[self._process_image(url, width, height) for url, (width, height) in targets.items()])
+
+    async def _process_image(self, url: str, width: Optional[int] = None, height: Optional[int] = None) -> Optional[int]:
+        """이미지 URL을 비동기로 다운로드하고 DB와 파일에 저장합니다. (선별/크기 제한/저장은 process_image와 같은 ImageDownload)"""
+        qm = self.queue_manager
+        triage = self.image_triage
+        image = ImageDownload(url, triage)
+        # 프로세스 내 캐시에 있으면 I/O 없이 바로 건너뜀
+        if triage is not None and (triage.local_decision(url) is not None or await self._run_io(image.is_decided)):
+            return None
+        reason = image.check_dimensions(width, height)
+        if reason:
+            await self._run_io(image.skip, reason)
+            return None
+
+        if await qm.is_visited(url, self.key) or await qm.is_processing(url, self.key):
+            print(f"ㄴ이미 처리 중이거나 방문한 이미지: {url}")
+            return None
+
+        print(f"ㄴ이미지 처리 시작: {url}")
+        await qm.mark_as_processing(url, self.key)
+        started = time.monotonic()
+        try:
+            started = await self._request_started(url)
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as r:
+                await self._record(url, started, r.status, retry_after=r.headers.get("Retry-After"))
+                r.raise_for_status()
+                reason = image.check_response(r.headers.get("Content-Type", ""), r.headers.get("Content-Length"))
+                if reason:
+                    await self._run_io(image.skip, reason)
+                    return None
+                async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    reason = image.feed(chunk)
+                    if reason:
+                        await self._run_io(image.skip, reason)
+                        return None
+
+            reason = await self._run_io(image.finish)
+            if reason:
+                await self._run_io(image.skip, reason)
+                return None
+            return await self._run_io(image.store)
+        except aiohttp.ClientResponseError as e:
+            # 응답 상태는 이미 속도 제한기에 기록됨
+            print(f"ㄴ이미지 다운로드 요청 오류 (URL: {url}): {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            await self._record(url, started, error=True)
+            print(f"ㄴ이미지 다운로드 요청 오류 (URL: {url}): {e}")
+        except Exception as e:
+            print(f"ㄴ이미지 처리 중 오류 발생 (URL: {url}): {e}")
+        finally:
+            await self._run_io(image.release)
+            await qm.mark_as_visited(url, self.key)  # 실패하더라도 재처리 방지
+        return None
+
+    async def _handle(self, item: Dict[str, Any]) -> None:
+        """큐 항목 하나를 처리합니다. (process_queue의 항목 처리와 동일한 규칙)"""
+        qm = self.queue_manager
+        url = item.get("url")
+        print(f"처리할 URL: {url}")
+
+        if not url:
+            print("URL이 없어 다음 항목으로 넘어갑니다.")
+            return
+        if await qm.is_visited(url, self.key):
+            print(f"이미 방문한 URL: {url}")
+            return
+        if await qm.is_processing(url, self.key):
+            print(f"이미 처리 중인 URL: {url}")
+            return
+
+        print(f"URL 처리 시작: {url}")
+        await qm.mark_as_processing(url, self.key)
+        try:
+            if await self._is_file_download(url):
+                print(f"파일 다운로드 처리: {url}")
+                await self._run_io(process_file_download, url, item.get("parent", ""), None, item.get("log_id"))
+            else:
+                enumerator = find_enumerator(url)
+                if enumerator and enumerator.is_list_url(url):
+                    # 게시판 목록은 HTTP로 직접 탐색하여 게시글 URL을 큐에 추가
+                    await self._run_io(enumerate_board, url, self.sync_queue_manager, self.key)
+                await self._process_page(url)
+                print(f"URL 처리 완료: {url}")
+            await qm.mark_as_visited(url, self.key)
+        except Exception as e:
+            print(f"URL 처리 중 오류 발생: {url}")
+            print(f"오류 내용: {str(e)}")
+            print("스택 트레이스:")
+            print(traceback.format_exc())
+            # 에러 발생 시 다시 큐에 추가
+            await qm.push(item, self.key)
+        finally:
+            if await qm.is_processing(url, self.key):
+                print(f"처리 중 상태 해제: {url}")
+                await qm.mark_as_visited(url, self.key)
+            await asyncio.sleep(PAGE_LOAD_DELAY)
+
+    async def _worker(self) -> None:
+        """클러스터 전체의 큐가 비고 모든 워커의 처리 중 항목이 없을 때까지 항목을 꺼내 처리합니다."""
+        registry = self.registry
+        while not registry.draining:
+            try:
+                claimed = await self.queue_manager.claim(self.key, registry.worker_id)
+                if not claimed:
+                    # 이 프로세스에서 처리 중인 항목이 새 링크를 추가할 수 있으므로 먼저 기다림
+                    if self.in_flight == 0:
+                        stolen = await self._run_io(registry.reap_dead_workers)
+                        if stolen == 0 and await self._run_io(registry.is_crawl_complete):
+                            return
+                    await asyncio.sleep(WORKER_IDLE_WAIT)
+                    continue
+
+                item, raw = claimed
+                self.in_flight += 1
+                try:
+                    await self._handle(item)
+                finally:
+                    self.in_flight -= 1
+                    await self.queue_manager.release(raw, self.key, registry.worker_id)
+            except Exception as e:
+                print(f"큐 처리 중 오류 발생: {str(e)}")
+                print("스택 트레이스:")
+                print(traceback.format_exc())
+                await asyncio.sleep(PAGE_LOAD_DELAY)
+
+    async def run(self, start_url: str) -> None:
+        """큐를 초기화하고 동시 워커들을 실행합니다."""
+        self.queue_manager = AsyncRedisQueueManager()
+        self.sync_queue_manager = RedisQueueManager()
+        self.registry = WorkerRegistry(self.sync_queue_manager, self.key)
+        self.driver_pool = asyncio.Queue()
+        for driver in self.drivers:
+            self.driver_pool.put_nowait(driver)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 4)
+        self.session = aiohttp.ClientSession(connector=connector)
+        try:
+            await self._seed(start_url)
+            self.registry.register()
+            self.registry.install_signal_handlers()
+            await asyncio.gather(*[self._worker() for _ in range(self.concurrency)])
+            if not self.registry.draining:
+                print("큐가 비어있고 처리 중인 워커가 없어 종료합니다.")
+        finally:
+            if self.analysis_pool is not None:
+                await self._run_io(shutdown_analysis_pool)
+            await self.queue_manager.flush_spill(self.key)
+            get_scope_rules(self.key).report(self.sync_queue_manager.redis_client)
+            if self.image_triage is not None:
+                self.image_triage.report()
+            if self.near_dup is not None:
+                self.near_dup.report()
+            self.registry.deregister()
+            await self.session.close()
+            await self.queue_manager.close()
+            self.browser_executor.shutdown(wait=False)
+            self.io_executor.shutdown(wait=True)
+
+
+def process_queue_async(drivers: List[Any], start_url: str) -> None:
+    """
+    process_queue의 asyncio 버전 진입점입니다.
+    drivers에 전달한 브라우저 수만큼 동시에 렌더링하며, 나머지 I/O는 ASYNC_CONCURRENCY만큼 겹쳐서 실행합니다.
+    """
+    try:
+        asyncio.run(AsyncCrawlEngine(drivers).run(start_url))
+    except Exception as e:
+        print(f"전체 프로세스 오류 발생: {str(e)}")
+        print("스택 트레이스:")
+        print(traceback.format_exc())
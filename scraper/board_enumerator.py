@@ -0,0 +1,196 @@
+# scraper/board_enumerator.py
+# 공지사항 같은 페이지형 게시판을 브라우저 없이 HTTP로 직접 탐색하는 모듈입니다.
+# 목록 페이지를 offset 파라미터로 넘기며 게시글 보기 URL을 추출해 바로 큐에 넣고,
+# 크롤이 끝난 게시글만 나오는 페이지가 BOARD_STOP_PAGES개 이어지면 탐색을 멈춥니다.
+
+import abc
+import html
+import re
+import time
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+import requests
+from utils.config import BOARD_ENUMERATOR_ENABLED, BOARD_URL_PATTERNS, BOARD_PAGE_SIZE, BOARD_MAX_PAGES, BOARD_STOP_PAGES
+from utils.queue_manager import RedisQueueManager
+from utils import rate_limiter
+
+HREF_REGEX = re.compile(r'href\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+class BoardEnumerator(abc.ABC):
+    """
+    게시판 탐색기의 기본 클래스입니다.
+    새 게시판 형식을 지원하려면 이 클래스를 상속하여 BOARD_ENUMERATORS에 추가합니다.
+    """
+
+    @abc.abstractmethod
+    def matches(self, url: str) -> bool:
+        """URL이 이 탐색기가 처리할 게시판(목록 또는 게시글)인지 판단합니다."""
+
+    @abc.abstractmethod
+    def is_list_url(self, url: str) -> bool:
+        """URL이 게시판 목록 페이지인지 판단합니다."""
+
+    @abc.abstractmethod
+    def canonicalize(self, url: str) -> str:
+        """목록 페이지는 게시판 기본 URL로, 게시글은 목록 위치와 무관한 고유 URL로 정규화합니다."""
+
+    @abc.abstractmethod
+    def list_page_url(self, board_url: str, page: int) -> str:
+        """게시판의 page번째(0부터) 목록 페이지 URL을 반환합니다."""
+
+    @abc.abstractmethod
+    def extract_article_urls(self, html_text: str, list_url: str) -> List[str]:
+        """목록 페이지 HTML에서 정규화된 게시글 URL 목록을 추출합니다."""
+
+
+class K2WebBoardEnumerator(BoardEnumerator):
+    """
+    아주대학교 홈페이지(*.do) 게시판 형식을 처리합니다.
+    목록: notice.do?mode=list&articleLimit=10&article.offset=20
+    게시글: notice.do?mode=view&articleNo=123456&article.offset=0&articleLimit=10
+    """
+
+    def __init__(self, patterns: List[str] = BOARD_URL_PATTERNS, page_size: int = BOARD_PAGE_SIZE):
+        self.patterns = [re.compile(p) for p in patterns]
+        self.page_size = page_size
+
+    def matches(self, url: str) -> bool:
+        path = urlparse(url).path
+        return any(p.search(path) for p in self.patterns)
+
+    def is_list_url(self, url: str) -> bool:
+        params = dict(parse_qsl(urlparse(url).query))
+        return self.matches(url) and params.get("mode", "list") == "list"
+
+    def canonicalize(self, url: str) -> str:
+        parsed = urlparse(url)
+        params = dict(parse_qsl(parsed.query))
+        if params.get("mode") == "view" and params.get("articleNo"):
+            query = urlencode({"mode": "view", "articleNo": params["articleNo"]})
+        elif params.get("mode", "list") == "list":
+            query = ""
+        else:
+            return url
+        return urlunparse(parsed._replace(query=query, fragment=""))
+
+    def list_page_url(self, board_url: str, page: int) -> str:
+        query = urlencode({
+            "mode": "list",
+            "articleLimit": self.page_size,
+            "article.offset": page * self.page_size,
+        })
+        return urlunparse(urlparse(board_url)._replace(query=query))
+
+    def extract_article_urls(self, html_text: str, list_url: str) -> List[str]:
+        board_path = urlparse(list_url).path
+        result = []
+        for href in HREF_REGEX.findall(html_text):
+            href = html.unescape(href)
+            if "articleNo=" not in href or "mode=view" not in href:
+                continue
+            url = urljoin(list_url, href)
+            if urlparse(url).path != board_path:
+                continue
+            url = self.canonicalize(url)
+            if url not in result:
+                result.append(url)
+        return result
+
+
+BOARD_ENUMERATORS: List[BoardEnumerator] = [K2WebBoardEnumerator()]
+
+
+def find_enumerator(url: str) -> Optional[BoardEnumerator]:
+    """URL을 처리할 수 있는 게시판 탐색기를 반환합니다. 없으면 None을 반환합니다."""
+    if not BOARD_ENUMERATOR_ENABLED:
+        return None
+    for enumerator in BOARD_ENUMERATORS:
+        if enumerator.matches(url):
+            return enumerator
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """게시판 URL이면 정규화된 URL을, 아니면 그대로 반환합니다. (목록 offset 변형이 중복으로 큐에 쌓이지 않도록 함)"""
+    enumerator = find_enumerator(url)
+    return enumerator.canonicalize(url) if enumerator else url
+
+
+def _fetch(session: requests.Session, url: str) -> Optional[str]:
+    rate_limiter.acquire(url)
+    started = time.monotonic()
+    try:
+        r = session.get(url, timeout=10)
+    except requests.RequestException as e:
+        rate_limiter.record(url, time.monotonic() - started, error=True)
+        print(f"ㄴ게시판 목록 요청 실패 (URL: {url}): {e}")
+        return None
+    rate_limiter.record(url, r.elapsed.total_seconds(), r.status_code, retry_after=r.headers.get("Retry-After"))
+    if r.status_code != 200:
+        print(f"ㄴ게시판 목록 응답 오류 {r.status_code} (URL: {url})")
+        return None
+    return r.text
+
+
+def get_board_seen_key(key: str) -> str:
+    """크롤이 끝난 게시글 URL을 기록하는 집합의 키를 반환합니다."""
+    return f"board_seen:{key}"
+
+
+def mark_article_seen(url: str, redis_client, key: str) -> None:
+    """
+    게시글 URL이면 board_seen:<key> 집합에 기록합니다.
+    게시글 크롤이 성공한 뒤에 호출하므로, 큐에 넣었지만 처리하지 못한 게시글은 다음 탐색에서 다시 큐에 추가됩니다.
+    """
+    enumerator = find_enumerator(url)
+    if enumerator is None or enumerator.is_list_url(url):
+        return
+    redis_client.sadd(get_board_seen_key(key), enumerator.canonicalize(url))
+
+
+def enumerate_board(url: str, queue_manager: RedisQueueManager, key: str, max_pages: int = BOARD_MAX_PAGES,
+                    stop_pages: int = BOARD_STOP_PAGES) -> int:
+    """
+    게시판 목록 페이지를 HTTP로 차례대로 요청하여 게시글 URL을 큐에 추가하고, 추가한 게시글 수를 반환합니다.
+    board_seen:<key>에 없는 게시글을 새 게시글로 보며, 새 게시글이 없는 페이지가 stop_pages개 이어지면 멈춥니다.
+    (상단 고정 공지는 매 페이지에 반복되므로 '모두 본 게시글'이 아니라 '새 게시글 없음'을 기준으로 판단하고,
+    중간에 크롤이 끝난 페이지가 끼어 있어도 그 뒤의 새 게시글을 놓치지 않도록 몇 페이지 더 확인)
+    """
+    enumerator = find_enumerator(url)
+    if enumerator is None or not enumerator.is_list_url(url):
+        return 0
+
+    board_url = enumerator.canonicalize(url)
+    seen_key = get_board_seen_key(key)
+    session = requests.Session()
+    queued = set()  # 이번 탐색에서 이미 큐에 넣은 게시글 (여러 페이지에 반복되는 고정 공지)
+    stale_pages = 0
+    pushed = 0
+
+    for page in range(max_pages):
+        list_url = enumerator.list_page_url(board_url, page)
+        html_text = _fetch(session, list_url)
+        if html_text is None:
+            break
+
+        articles = enumerator.extract_article_urls(html_text, list_url)
+        if not articles:
+            break
+
+        seen = queue_manager.redis_client.smismember(seen_key, articles)
+        new_articles = [a for a, is_seen in zip(articles, seen) if not is_seen]
+
+        for article_url in new_articles:
+            if article_url not in queued and not queue_manager.is_visited(article_url, key):
+                queue_manager.push({"type": "page", "url": article_url, "parent": board_url}, key)
+                queued.add(article_url)
+                pushed += 1
+
+        stale_pages = 0 if new_articles else stale_pages + 1
+        if stale_pages >= stop_pages:
+            print(f"ㄴ이미 수집한 게시글만 {stale_pages}페이지 이어져 게시판 탐색 종료 ({page + 1}페이지): {board_url}")
+            break
+
+    print(f"ㄴ게시판 탐색 완료: {board_url} (새 게시글 {pushed}개)")
+    return pushed
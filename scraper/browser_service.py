@@ -0,0 +1,123 @@
+# scraper/browser_service.py
+# 장기 실행 브라우저 서비스와 슬롯 할당을 담당합니다.
+# `python -m scraper.browser_service`로 슬롯 수만큼 Chrome을 DevTools 포트와 영구 프로필/디스크 캐시로 띄워두면,
+# 스크래퍼는 Chrome을 새로 실행하지 않고 BROWSER_MODE=devtools로 바로 연결하여 캐시가 데워진 상태로 시작합니다.
+
+import fcntl
+import os
+import signal
+import subprocess
+import time
+from typing import List, Optional, Tuple
+from utils.config import (
+    BROWSER_DEBUG_BASE_PORT,
+    BROWSER_DISK_CACHE_SIZE,
+    BROWSER_PROFILE_DIR,
+    BROWSER_SLOTS,
+    CHROME_BINARY,
+    CHROME_HEADLESS_OPTIONS,
+)
+
+# 이 프로세스가 점유한 슬롯의 잠금 파일 (프로세스가 끝나면 운영체제가 잠금을 해제)
+_slot_locks = {}
+
+
+def get_profile_dir(slot: int) -> str:
+    return os.path.join(BROWSER_PROFILE_DIR, f"slot-{slot}")
+
+
+def get_cache_dir(slot: int) -> str:
+    return os.path.join(BROWSER_PROFILE_DIR, f"slot-{slot}", "cache")
+
+
+def get_profile_options(slot: int) -> List[str]:
+    """슬롯의 영구 프로필과 디스크 캐시를 사용하도록 하는 Chrome 옵션을 반환합니다."""
+    if not BROWSER_PROFILE_DIR:
+        return []
+    return [
+        f"--user-data-dir={get_profile_dir(slot)}",
+        f"--disk-cache-dir={get_cache_dir(slot)}",
+        f"--disk-cache-size={BROWSER_DISK_CACHE_SIZE}",
+    ]
+
+
+def claim_slot(slots: int = BROWSER_SLOTS) -> Optional[int]:
+    """
+    다른 스크래퍼 프로세스(또는 같은 프로세스의 다른 드라이버)가 쓰지 않는 슬롯을 잠그고 번호를 반환합니다.
+    Chrome 프로필은 동시에 한 브라우저만 사용할 수 있으므로 슬롯 단위로 배타적으로 할당합니다.
+    """
+    lock_dir = BROWSER_PROFILE_DIR or "/tmp"
+    os.makedirs(lock_dir, exist_ok=True)
+    for slot in range(slots):
+        if slot in _slot_locks:
+            continue
+        f = open(os.path.join(lock_dir, f"slot-{slot}.lock"), "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot_locks[slot] = f
+        return slot
+    return None
+
+
+def release_slot(slot: Optional[int]) -> None:
+    """claim_slot으로 점유한 슬롯을 해제합니다."""
+    f = _slot_locks.pop(slot, None)
+    if f is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+
+def get_debugger_address(host: str, slot: int) -> str:
+    return f"{host}:{BROWSER_DEBUG_BASE_PORT + slot}"
+
+
+def _launch(slot: int) -> subprocess.Popen:
+    """슬롯의 Chrome을 DevTools 포트를 열고 실행합니다."""
+    args = [CHROME_BINARY, *CHROME_HEADLESS_OPTIONS, *get_profile_options(slot),
+            f"--remote-debugging-port={BROWSER_DEBUG_BASE_PORT + slot}",
+            "--no-first-run", "--no-default-browser-check", "about:blank"]
+    print(f"브라우저 슬롯 {slot} 실행: 포트 {BROWSER_DEBUG_BASE_PORT + slot}")
+    return subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run_service(slots: int = BROWSER_SLOTS, check_interval: float = 2.0) -> None:
+    """
+    슬롯 수만큼 Chrome을 띄우고, 종료된 브라우저는 다시 실행하며 계속 유지합니다.
+    SIGTERM/SIGINT를 받으면 모든 브라우저를 종료합니다.
+    """
+    if not BROWSER_PROFILE_DIR:
+        print("경고: BROWSER_PROFILE_DIR가 설정되지 않아 프로필과 캐시가 유지되지 않습니다.")
+
+    processes: List[Tuple[int, subprocess.Popen]] = [(slot, _launch(slot)) for slot in range(slots)]
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    try:
+        while not stopping:
+            time.sleep(check_interval)
+            for index, (slot, process) in enumerate(processes):
+                if process.poll() is not None and not stopping:
+                    print(f"브라우저 슬롯 {slot} 종료 감지 (코드 {process.returncode}), 다시 실행합니다.")
+                    processes[index] = (slot, _launch(slot))
+    finally:
+        print("브라우저 서비스 종료 중...")
+        for _, process in processes:
+            process.terminate()
+        for _, process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    run_service()
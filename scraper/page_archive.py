@@ -0,0 +1,369 @@
+# scraper/page_archive.py
+# 렌더링한 페이지를 로컬 아카이브에 기록하고, 브라우저/네트워크 없이 다시 처리(replay)하는 모듈입니다.
+#
+# - 기록: ARCHIVE_ENABLED=true이면 페이지를 렌더링할 때마다 URL, 최종 URL, 응답 정보, 렌더링된 HTML, 시각을
+#   프로세스별 gzip NDJSON 파일에 한 줄씩 추가합니다. (기록 중: .open, 닫힌 파일: .ndjson.gz)
+# - 재처리: `python -m scraper.page_archive [--skip-existing] [ARCHIVE_DIR]`로 실행하며, 아카이브의 HTML을 드라이버 대신
+#   ArchivedPage로 감싸 extract_content/extract_references/store_page를 그대로 실행합니다.
+#   추출 로직이나 cat_mapping.json을 바꾼 뒤 전체 사이트를 다시 크롤링하지 않고 디스크 속도로 재저장할 수 있습니다.
+#   기본은 URL의 기존 페이지 행을 새로 저장한 행으로 교체하며, --skip-existing이면 이미 저장된 URL은 건너뜁니다.
+
+import atexit
+import gzip
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException
+from selenium.webdriver.common.by import By
+from utils.config import ARCHIVE_DIR, ARCHIVE_ENABLED, ARCHIVE_SEGMENT_SIZE, MYSQL_ID_COLUMNS
+from utils.db_manager import ensure_index, get_connection
+from utils.exporter import check_export_schema, record_tombstones
+
+OPEN_SUFFIX = ".open"
+ARCHIVE_SUFFIX = ".ndjson.gz"
+
+# Selenium은 응답 헤더를 제공하지 않으므로 브라우저가 알고 있는 응답 정보를 대신 기록합니다.
+RESPONSE_INFO_SCRIPT = """
+var nav = (performance.getEntriesByType('navigation') || [])[0] || {};
+return {
+    "Content-Type": document.contentType,
+    "Last-Modified": document.lastModified,
+    "Content-Language": document.documentElement.lang || null,
+    "charset": document.characterSet,
+    "status": nav.responseStatus || null
+};
+"""
+
+# 종료 태그가 없는 요소
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class PageArchive:
+    """렌더링한 페이지를 프로세스별 아카이브 파일에 추가하는 기록기입니다. (스레드 안전)"""
+
+    def __init__(self, directory: str = ARCHIVE_DIR, segment_size: int = ARCHIVE_SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._file = None
+        self._raw = None
+        self._path = None
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.close)
+
+    def _open_file(self) -> None:
+        self._sequence += 1
+        name = f"{int(time.time() * 1000):013d}_{socket.gethostname()}_{os.getpid()}_{self._sequence:06d}{OPEN_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._raw = open(self._path, "ab")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab")
+
+    def _close_locked(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._raw.close()
+        os.replace(self._path, self._path[:-len(OPEN_SUFFIX)] + ARCHIVE_SUFFIX)
+        self._file = None
+        self._raw = None
+        self._path = None
+
+    def close(self) -> None:
+        """현재 아카이브 파일을 닫습니다."""
+        with self._lock:
+            self._close_locked()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        data = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self._open_file()
+            self._file.write(data)
+            # 기록마다 압축 블록을 내보내 비정상 종료 시에도 마지막 기록까지 읽을 수 있도록 함
+            self._file.flush()
+            if self._raw.tell() >= self.segment_size:
+                self._close_locked()
+
+    def record(self, driver, url: str) -> None:
+        """드라이버가 렌더링한 현재 페이지를 기록합니다."""
+        try:
+            headers = driver.execute_script(RESPONSE_INFO_SCRIPT) or {}
+        except Exception:
+            headers = {}
+        self.append({
+            "url": url,
+            "final_url": driver.current_url,
+            "headers": headers,
+            "html": driver.page_source,
+            "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+
+_archive: Optional[PageArchive] = None
+_archive_lock = threading.Lock()
+
+
+def record_page(driver, url: str) -> None:
+    """ARCHIVE_ENABLED이면 렌더링한 페이지를 아카이브에 기록합니다. 기록 실패는 크롤을 멈추지 않습니다."""
+    global _archive
+    if not ARCHIVE_ENABLED:
+        return
+    try:
+        if _archive is None:
+            with _archive_lock:
+                if _archive is None:
+                    _archive = PageArchive()
+        _archive.record(driver, url)
+    except Exception as e:
+        print(f"ㄴ페이지 아카이브 기록 중 오류 발생 (URL: {url}): {e}")
+
+
+def read_archive(directory: str = ARCHIVE_DIR) -> Iterator[Dict[str, Any]]:
+    """아카이브 파일을 생성 순서대로 읽어 기록을 반환합니다. 비정상 종료로 잘린 파일은 읽을 수 있는 곳까지만 읽습니다."""
+    names = sorted(name for name in os.listdir(directory) if name.endswith((ARCHIVE_SUFFIX, OPEN_SUFFIX)))
+    for name in names:
+        with gzip.open(os.path.join(directory, name), "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"경고: 손상된 아카이브 기록을 건너뜁니다 ({name})")
+            except (EOFError, OSError, zlib.error):
+                # 기록 중인 파일(.open)은 마지막 기록 이후가 아직 없는 것이 정상
+                if name.endswith(OPEN_SUFFIX):
+                    continue
+                print(f"경고: 아카이브 파일 끝이 잘려 있어 읽을 수 있는 곳까지만 사용합니다 ({name})")
+
+
+class _ArchivedElement:
+    """ArchivedPage에서 찾은 요소입니다. Selenium WebElement의 get_attribute만 지원합니다."""
+
+    def __init__(self, page: "ArchivedPage", tag: str, attrs: Dict[str, Optional[str]], start: int):
+        self.page = page
+        self.tag_name = tag
+        self.attrs = attrs
+        self.start = start
+        self.end = len(page.html)
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name == "outerHTML":
+            return self.page.html[self.start:self.end]
+        value = self.attrs.get(name)
+        if value is not None and name in ("href", "src"):
+            # WebDriver와 같이 절대 URL로 변환하여 반환
+            return urljoin(self.page.base_url, value.strip())
+        return value
+
+
+class _ElementCollector(HTMLParser):
+    def __init__(self, page: "ArchivedPage"):
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self.elements: List[_ArchivedElement] = []
+        self.title_parts: List[str] = []
+        self._stack: List[_ArchivedElement] = []
+        self._in_title = False
+        # getpos()의 (줄, 열)을 문자열 위치로 바꾸기 위한 줄 시작 위치 (HTMLParser는 "\n"만 줄바꿈으로 셈)
+        self._line_offsets = [0]
+        position = page.html.find("\n")
+        while position != -1:
+            self._line_offsets.append(position + 1)
+            position = page.html.find("\n", position + 1)
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def _add(self, tag: str, attrs, void: bool) -> None:
+        start = self._offset()
+        element = _ArchivedElement(self.page, tag, {k: (v if v is not None else "") for k, v in attrs}, start)
+        self.elements.append(element)
+        if tag == "base" and element.attrs.get("href") and self.page.base_url == self.page.current_url:
+            self.page.base_url = urljoin(self.page.current_url, element.attrs["href"])
+        if void:
+            element.end = start + len(self.get_starttag_text() or "")
+        else:
+            self._stack.append(element)
+
+    def handle_starttag(self, tag, attrs):
+        self._add(tag, attrs, tag in VOID_ELEMENTS)
+        if tag == "title":
+            self._in_title = True
+
+    def handle_startendtag(self, tag, attrs):
+        self._add(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        # 짝이 맞는 시작 태그까지 닫음 (생략된 종료 태그 처리). 짝이 없으면 무시
+        if not any(element.tag_name == tag for element in self._stack):
+            return
+        start = self._offset()
+        end = self.page.html.find(">", start)
+        end = end + 1 if end != -1 else len(self.page.html)
+        while self._stack:
+            element = self._stack.pop()
+            element.end = end
+            if element.tag_name == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+
+
+class ArchivedPage:
+    """
+    아카이브에 기록된 HTML을 WebDriver처럼 다룰 수 있게 하는 객체입니다.
+    extract_content/extract_references가 사용하는 find_element(s), title, current_url만 지원합니다.
+    """
+
+    def __init__(self, record: Dict[str, Any]):
+        self.html = record["html"]
+        self.current_url = record.get("final_url") or record["url"]
+        self.base_url = self.current_url
+        collector = _ElementCollector(self)
+        collector.feed(self.html)
+        collector.close()
+        self.elements = collector.elements
+        self.title = " ".join("".join(collector.title_parts).split())
+
+    def find_elements(self, by: str, value: str) -> List[_ArchivedElement]:
+        if by == By.TAG_NAME:
+            return [e for e in self.elements if e.tag_name == value.lower()]
+        if by == By.CLASS_NAME:
+            return [e for e in self.elements if value in (e.attrs.get("class") or "").split()]
+        if by == By.XPATH and value.startswith("//*[@") and value.endswith("]"):
+            name = value[len("//*[@"):-1]
+            return [e for e in self.elements if name in e.attrs]
+        raise InvalidSelectorException(f"아카이브 페이지에서 지원하지 않는 선택자입니다: {by}={value}")
+
+    def find_element(self, by: str, value: str) -> _ArchivedElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"요소를 찾을 수 없습니다: {by}={value}")
+        return elements[0]
+
+
+def find_stored_pages(cursor, url: str) -> List[int]:
+    """URL로 저장된 페이지(data_type=0)의 scrap_info id 목록을 반환합니다."""
+    cursor.execute(
+        f"SELECT {MYSQL_ID_COLUMNS['scrap_info']} FROM scrap_info WHERE scrap_url = %s AND data_type = 0", (url,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def delete_stored_pages(conn, log_ids: List[int]) -> None:
+    """페이지의 scrap_info/contents 행을 삭제합니다. 내보내기가 인덱서에 전달하도록 삭제 기록을 남깁니다."""
+    if not log_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(log_ids))
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT {MYSQL_ID_COLUMNS['contents']} FROM contents WHERE log_id IN ({placeholders})", log_ids)
+        content_ids = [row[0] for row in cursor.fetchall()]
+        record_tombstones(cursor, content_ids)
+        cursor.execute(f"DELETE FROM contents WHERE log_id IN ({placeholders})", log_ids)
+        cursor.execute(f"DELETE FROM scrap_info WHERE {MYSQL_ID_COLUMNS['scrap_info']} IN ({placeholders})", log_ids)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def replay_record(record: Dict[str, Any]) -> Tuple[Optional[int], Dict[str, int]]:
+    """
+    기록 하나에 대해 process_page와 같은 추출/저장 단계를 실행하고 (log_id, 참조 수)를 반환합니다.
+    링크/이벤트 큐 등록과 이미지 다운로드는 네트워크가 필요하므로 하지 않습니다.
+    """
+    # page_processor가 이 모듈의 record_page를 사용하므로 순환 import를 피하기 위해 함수 안에서 import
+    from scraper.page_processor import extract_content, extract_references, is_login_page, store_page
+
+    url = record["url"]
+    page = ArchivedPage(record)
+    content = extract_content(page)
+    if content is None:
+        print(f"ㄴ컨텐츠 영역을 찾을 수 없음: {url}")
+        return None, {}
+    if is_login_page(content["title"]):
+        print(f"ㄴ통합인증 페이지 감지, 처리 중단: {url}")
+        return None, {}
+    references = extract_references(page)
+    log_id = store_page(url, content["title"], content["data"])
+    return log_id, {name: len(values) for name, values in references.items()}
+
+
+def replay_archive(directory: str = ARCHIVE_DIR, skip_existing: bool = False) -> int:
+    """
+    아카이브의 페이지를 다시 처리하고 저장한 페이지 수를 반환합니다.
+    같은 URL이 여러 번 기록되었으면 가장 최근 기록만 처리합니다.
+    URL의 기존 페이지 행은 새 행을 저장한 뒤 삭제하므로(중간에 실패해도 본문을 잃지 않음) 여러 번 재처리해도 중복되지 않습니다.
+    skip_existing이면 이미 저장된 URL은 다시 처리하지 않습니다.
+    """
+    started = time.monotonic()
+    conn = get_connection()
+    cursor = conn.cursor()
+    ensure_index(cursor, "scrap_info", "scrap_url", "idx_scrap_info_scrap_url", length=255)
+    ensure_index(cursor, "contents", "log_id", "idx_contents_log_id")
+    check_export_schema(cursor)
+
+    # 1차: URL별 마지막 기록 위치 확인
+    latest: Dict[str, int] = {}
+    total = 0
+    for index, record in enumerate(read_archive(directory)):
+        latest[record["url"]] = index
+        total += 1
+    print(f"재처리 대상: 페이지 {len(latest)}개 (기록 {total}건 중 URL별 최신)")
+
+    # 2차: 최신 기록만 추출/저장
+    stored = 0
+    skipped = 0
+    try:
+        for index, record in enumerate(read_archive(directory)):
+            if latest.get(record["url"]) != index:
+                continue
+            try:
+                existing = find_stored_pages(cursor, record["url"])
+                conn.commit()  # 다음 조회가 최신 스냅샷을 보도록 읽기 트랜잭션 종료
+                if existing and skip_existing:
+                    skipped += 1
+                    continue
+                print(f"페이지 재처리: {record['url']} (기록 시각: {record.get('fetched_at')})")
+                log_id, counts = replay_record(record)
+                if log_id is not None:
+                    delete_stored_pages(conn, [old for old in existing if old != log_id])
+            except Exception as e:
+                print(f"ㄴ페이지 재처리 중 오류 발생 (URL: {record['url']}): {e}")
+                continue
+            if log_id is not None:
+                stored += 1
+                replaced = f", 기존 {len(existing)}건 교체" if existing else ""
+                print(f"ㄴ저장 완료 (log_id: {log_id}, 링크 {counts.get('links', 0)}개, "
+                      f"이벤트 {counts.get('events', 0)}개, 이미지 {counts.get('images', 0)}개{replaced})")
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"재처리 완료: {stored}페이지 저장, 이미 저장된 {skipped}페이지 건너뜀 ({time.monotonic() - started:.1f}초)")
+    return stored
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    replay_archive(args[0] if args else ARCHIVE_DIR, skip_existing="--skip-existing" in sys.argv)
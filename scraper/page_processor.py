@@ -1,7 +1,7 @@
 import time
 import re
-import os
-from typing import Optional
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
 import requests
 from datetime import datetime
 from urllib.parse import urlparse
@@ -14,14 +14,24 @@ from selenium.common.exceptions import (
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from utils.config import PAGE_LOAD_DELAY, VISIT_JSON, FILES_DIR, FILELIST_JSON, START_KEY
-from utils.file_manager import save_json, save_content, load_json
-from utils.db_manager import save_log
+from utils.config import PAGE_LOAD_DELAY, VISIT_JSON, FILELIST_JSON, START_KEY, IMAGE_SNIFF_BYTES, IMAGE_MAX_BYTES, NEAR_DUP_ENABLED
+from utils.file_manager import save_json, load_json, save_image_file
+from utils.db_manager import save_log, save_content
 from utils.url_manager import adjust_url
 from utils.queue_manager import RedisQueueManager
 from utils.url_matcher import get_categories_for_url
+from utils import rate_limiter
+from utils.scope_rules import get_scope_rules
+from utils.image_triage import KEEP, ImageTriage, get_image_triage
+from utils.near_duplicate import compute_fingerprint, get_near_duplicate_index
+from utils.analysis_pool import get_analysis_pool
+from utils.profiler import profile_call
+from scraper.board_enumerator import canonicalize_url, mark_article_seen
+from scraper.page_archive import record_page
 
 CREATED_BY_FIND_REGEX = re.compile('(([0-9]{2}|[0-9]{4})[-\.][0-9]{1,2}[-\.][0-9]{1,2})')
+# 이미지 원본 크기는 로딩이 끝나야 알 수 있으므로(naturalWidth) 로딩되지 않은 이미지는 0을 반환
+IMAGE_INFO_SCRIPT = "return Array.from(document.images).map(function (img) { return [img.src, img.naturalWidth, img.naturalHeight]; });"
 
 def is_valid_url(url: str) -> bool:
     """URL이 유효한지 검증합니다."""
@@ -32,25 +42,15 @@ def is_valid_url(url: str) -> bool:
         return False
 
 def is_in_search_scope(url: str) -> bool:
-    """현재 URL이 탐색영역 내에 있는 url인지 판단합니다."""
-    if not is_valid_url(url):
-        return False
-        
-    result = True
-    
-    # 영역제한: 아주대학교
-    result = result and ("ajou.ac.kr" in url)
-
-    # 영역제한: 공지사항
-    # result = result and ("notice" in url)
-
-    # 영역제한: 공홈 - 생활정보
-    # result = result and ("life" in url)
-
-    # 영역제한: 기숙사 홈페이지
-    # result = result and ("dorm" in url)
+    """
+    현재 URL이 탐색영역 내에 있는 url인지 판단합니다.
+    data/scope_rules.json의 허용/차단/통합인증 규칙과 크롤러 함정 휴리스틱을 적용합니다.
+    """
+    return get_scope_rules(START_KEY).allows(url)
 
-    return result
+def is_in_image_scope(url: str) -> bool:
+    """이미지 URL이 탐색영역 내에 있는지 판단합니다. 이미지는 쿼리 조합 함정 집계에 포함하지 않습니다."""
+    return get_scope_rules(START_KEY).allows(url, count_variants=False)
 
 def wait_for_page_load(driver, timeout=10):
     """페이지 로딩이 완료될 때까지 대기합니다."""
@@ -62,11 +62,94 @@ def wait_for_page_load(driver, timeout=10):
         print("페이지 로딩 시간 초과")
         raise
 
-def process_image(url: str, parent_url: str, queue_manager: RedisQueueManager) -> Optional[int]:
+class ImageDownload:
+    """
+    이미지 하나의 선별, 크기 제한, 저장 단계를 묶습니다. 동기/비동기 엔진은 HTTP 요청만 각자 수행합니다.
+    check_dimensions/check_response/feed는 I/O가 없고, is_decided/skip/finish/store/release는 Redis/DB/파일 I/O가 있으므로
+    비동기 엔진은 I/O 스레드 풀에서 호출합니다.
+    """
+
+    def __init__(self, url: str, triage: Optional[ImageTriage]):
+        self.url = url
+        self.triage = triage
+        self.data = bytearray()
+        self._checked = triage is None  # 앞부분(IMAGE_SNIFF_BYTES)의 형식/원본 크기 확인 여부
+        self._body = None  # 내용 해시를 선점한 본문 (저장하지 못하면 release에서 해제)
+
+    def is_decided(self) -> bool:
+        """이미 판정한 이미지인지 반환합니다. (판정한 이미지는 Redis 방문 기록 조회도 하지 않음)"""
+        return self.triage is not None and self.triage.cached_decision(self.url) is not None
+
+    def check_dimensions(self, width: Optional[int], height: Optional[int]) -> Optional[str]:
+        """DOM에 표시된 크기로 건너뛸 이유를 반환합니다."""
+        return self.triage.check_dimensions(width, height) if self.triage is not None else None
+
+    def check_response(self, content_type: str, content_length: Optional[str]) -> Optional[str]:
+        """응답 헤더의 Content-Type/Content-Length로 건너뛸 이유를 반환합니다."""
+        content_type = content_type.lower()
+        if not content_type.startswith("image/"):
+            print(f"ㄴURL은 이미지가 아닙니다: {self.url} (Content-Type: {content_type})")
+            return "not_image"
+        return self.triage.check_length(content_length) if self.triage is not None else None
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """받은 청크를 추가합니다. 앞부분만 먼저 받아 형식과 원본 크기를 확인하며, 건너뛸 이유가 생기면 반환합니다."""
+        self.data.extend(chunk)
+        if not self._checked and len(self.data) >= IMAGE_SNIFF_BYTES:
+            self._checked = True
+            reason = self.triage.check_head(bytes(self.data))
+            if reason:
+                return reason
+        if IMAGE_MAX_BYTES and len(self.data) > IMAGE_MAX_BYTES:
+            return "too_many_bytes"
+        return None
+
+    def skip(self, reason: str) -> None:
+        """건너뛴 이유를 출력하고 판정을 기록하여 같은 URL을 다시 받지 않도록 합니다."""
+        print(f"ㄴ이미지 건너뜀 ({reason}): {self.url}")
+        if self.triage is not None:
+            self.triage.remember(self.url, reason)
+
+    def finish(self) -> Optional[str]:
+        """다 받은 본문을 확인하고(중복 내용 해시 선점 포함) 건너뛸 이유를 반환합니다."""
+        if self.triage is None:
+            return None
+        body = bytes(self.data)
+        reason = (self.triage.check_head(body) if not self._checked else None) or self.triage.check_body(body)
+        if not reason:
+            self._body = body
+        return reason
+
+    def store(self) -> int:
+        """파일을 먼저 기록(fsync)한 뒤 DB에 커밋하고 content_id를 반환합니다. (data 컬럼은 비워둠, data_type 2는 이미지)"""
+        content_id = save_image_file(self.url, bytes(self.data))
+        if self.triage is not None:
+            self.triage.remember(self.url, KEEP)
+            self._body = None
+        print(f"ㄴ이미지 다운로드 및 저장 완료: {content_id} (출처: {self.url})")
+        return content_id
+
+    def release(self) -> None:
+        """저장하지 못한 이미지의 내용 해시를 해제하여 다른 URL로 다시 받을 수 있도록 합니다."""
+        if self._body is not None:
+            self.triage.release_body(self._body)
+            self._body = None
+
+def process_image(url: str, parent_url: str, queue_manager: RedisQueueManager,
+                  width: Optional[int] = None, height: Optional[int] = None) -> Optional[int]:
     """
     이미지 URL을 다운로드하고 파일 및 DB에 저장합니다.
+    아이콘, 간격용 이미지, 중복 이미지는 DOM 크기/Content-Length/첫 바이트/내용 해시 순으로 확인하여 건너뜁니다.
     성공 시 content_id를 반환합니다.
     """
+    image = ImageDownload(url, get_image_triage(START_KEY))
+    if image.is_decided():
+        return None
+    reason = image.check_dimensions(width, height)
+    if reason:
+        image.skip(reason)
+        return None
+
     if queue_manager.is_visited(url, START_KEY) or queue_manager.is_processing(url, START_KEY):
         print(f"ㄴ이미 처리 중이거나 방문한 이미지: {url}")
         return None
@@ -75,139 +158,262 @@ def process_image(url: str, parent_url: str, queue_manager: RedisQueueManager) -
     queue_manager.mark_as_processing(url, START_KEY)
 
     try:
-        r = requests.get(url, stream=True, timeout=10)
+        rate_limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            r = requests.get(url, stream=True, timeout=10)
+        except requests.exceptions.RequestException:
+            rate_limiter.record(url, time.monotonic() - started, error=True)
+            raise
+        rate_limiter.record(url, r.elapsed.total_seconds(), r.status_code, retry_after=r.headers.get("Retry-After"))
         r.raise_for_status() # HTTP 오류 발생 시 예외 발생
 
-        content_type = r.headers.get("Content-Type", "").lower()
-        if not content_type.startswith("image/"):
-            print(f"ㄴURL은 이미지가 아닙니다: {url} (Content-Type: {content_type})")
-            return None
-
-        # 파일 이름 및 확장자 추출
-        org_filename = os.path.basename(urlparse(url).path)
-        if not org_filename:
-             org_filename = "downloaded_image"
-        org_filename, org_ext = os.path.splitext(org_filename)
-        org_ext = org_ext.lstrip(".")
-
-        # DB에 메타데이터 저장 (data 컬럼은 비워둠)
-        # data_type 2는 이미지로 가정 (필요시 config에 정의)
-        log_id = save_log(url, org_filename + "." + org_ext, datetime.now().strftime("%Y-%m-%d"), data_type=2) # data_type=2 (이미지)
-        content_id = save_content(data="", category=None, log_id=log_id, data_type=2, org_filename=org_filename, org_ext=org_ext) # data 컬럼은 비워둠
-
-        if not content_id:
-            print(f"ㄴ이미지 메타데이터 DB 저장 실패: {url}")
-            return None
-
-        # 파일을 ./files/{content_id}.{ext} 형식으로 저장
-        filepath = os.path.join(FILES_DIR, f"{content_id}.{org_ext}")
-        with open(filepath, 'wb') as f:
+        with r:
+            reason = image.check_response(r.headers.get("Content-Type", ""), r.headers.get("Content-Length"))
+            if reason:
+                image.skip(reason)
+                return None
             for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-
-        # filelist.json 업데이트
-        # filelist = load_json(FILELIST_JSON)
-        # filelist[url] = {
-        #     "parent": parent_url,
-        #     "filename": org_filename,
-        #     "ext": org_ext,
-        #     "log_id": log_id
-        # }
-        # save_json(FILELIST_JSON, filelist)
-
-        # visit.json 업데이트
-        # visit_data = load_json(VISIT_JSON)
-        # visit_data[url] = {
-        #     "visited_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        #     "type": "image",
-        #     "parent": parent_url,
-        #     "filename": org_filename,
-        #     "ext": org_ext,
-        #     "log_id": log_id
-        # }
-        # save_json(VISIT_JSON, visit_data)
-
-        print(f"ㄴ이미지 다운로드 및 저장 완료: {filepath} (출처: {url})")
-
-        queue_manager.mark_as_visited(url, START_KEY) # 방문 상태로 표시
-        return content_id
+                reason = image.feed(chunk)
+                if reason:
+                    image.skip(reason)
+                    return None
+
+        reason = image.finish()
+        if reason:
+            image.skip(reason)
+            return None
+        return image.store()
 
     except requests.exceptions.RequestException as e:
         print(f"ㄴ이미지 다운로드 요청 오류 (URL: {url}): {e}")
     except Exception as e:
         print(f"ㄴ이미지 처리 중 오류 발생 (URL: {url}): {e}")
     finally:
+        image.release()
         queue_manager.mark_as_visited(url, START_KEY) # 실패하더라도 재처리 방지
 
     return None
 
-def process_page(driver, url: str, queue_manager: RedisQueueManager) -> None:
+def extract_content(driver) -> Optional[Dict[str, str]]:
+    """
+    렌더링된 페이지에서 제목과 본문 영역(outerHTML)을 추출합니다.
+    본문 영역을 찾을 수 없으면 None을 반환합니다.
+    """
+    content_area = None
+    try:
+        content_area = driver.find_element(By.CLASS_NAME, "content")
+    except NoSuchElementException:
+        try:
+            content_area = driver.find_element(By.TAG_NAME, "body")
+        except NoSuchElementException:
+            return None
+
+    return {
+        "title": driver.title,
+        "data": content_area.get_attribute("outerHTML"),
+    }
+
+def _to_dimension(value: Any) -> Optional[int]:
+    try:
+        return int(value) or None
+    except (TypeError, ValueError):
+        return None
+
+def extract_images(driver) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    페이지의 이미지를 (src, 원본 폭, 원본 높이) 목록으로 추출합니다. 크기를 모르면 None입니다.
+    브라우저에서는 스크립트 한 번으로 모든 이미지를 가져오고, 스크립트를 실행할 수 없으면(아카이브 재처리 등)
+    요소별 width/height 속성을 사용합니다.
+    """
+    images = []
+    try:
+        for src, width, height in driver.execute_script(IMAGE_INFO_SCRIPT):
+            if src:
+                images.append((src, _to_dimension(width), _to_dimension(height)))
+        return images
+    except (AttributeError, WebDriverException):
+        pass
+    for img in driver.find_elements(By.TAG_NAME, "img"):
+        src = img.get_attribute("src")
+        if src:
+            images.append((src, _to_dimension(img.get_attribute("width")), _to_dimension(img.get_attribute("height"))))
+    return images
+
+def extract_references(driver) -> Dict[str, List[Any]]:
+    """
+    렌더링된 페이지에서 링크(href), onClick 이벤트, 이미지(src, 폭, 높이) 목록을 추출합니다.
+    """
+    references = {"links": [], "events": [], "images": []}
+    try:
+        for a in driver.find_elements(By.TAG_NAME, "a"):
+            href = a.get_attribute("href")
+            if href:
+                references["links"].append(href)
+    except Exception as e:
+        print(f"링크 추출 중 오류 발생: {e}")
+
+    try:
+        for elem in driver.find_elements(By.XPATH, '//*[@onclick]'):
+            onclick = elem.get_attribute("onclick")
+            if onclick:
+                references["events"].append((onclick, elem.get_attribute("outerHTML")))
+    except Exception as e:
+        print(f"onClick 이벤트 추출 중 오류 발생: {e}")
+
+    try:
+        references["images"] = extract_images(driver)
+    except Exception as e:
+        print(f"ㄴ이미지 추출 중 오류 발생: {e}")
+
+    return references
+
+def is_login_page(title: str) -> bool:
+    """통합인증(SSO) 페이지인지 판단합니다."""
+    return '통합인증' in title
+
+def find_created_at(data: str) -> str:
+    """페이지 본문에서 처음 나오는 날짜를 생성일로 반환합니다. 없으면 오늘 날짜를 반환합니다."""
+    dates_list = CREATED_BY_FIND_REGEX.findall(data)
+    return dates_list[0][0] if dates_list else datetime.now().strftime("%Y-%m-%d")
+
+def store_page(url: str, title: str, data: str, created_at: Optional[str] = None,
+               categories: Optional[List[str]] = None) -> int:
+    """
+    페이지 본문에서 생성일을 찾고, URL에 해당하는 카테고리별로 DB에 저장합니다.
+    analyze_page에서 생성일과 카테고리를 미리 계산했으면 그대로 사용합니다. log_id를 반환합니다.
+    """
+    if created_at is None:
+        created_at = find_created_at(data)
+    print(f"ㄴ생성일: {created_at}")
+
+    # URL에 해당하는 모든 카테고리 가져오기
+    if categories is None:
+        categories = get_categories_for_url(url)
+    log_id = save_log(url, title, created_at, 0)
+    for category in categories:
+        save_content(data, category, log_id)
+    return log_id
+
+def _normalize_urls(urls: List[str]) -> List[str]:
+    normalized = []
+    seen = set()
+    for url in urls:
+        url = canonicalize_url(adjust_url(url))
+        if url not in seen:
+            seen.add(url)
+            normalized.append(url)
+    return normalized
+
+def analyze_page(url: str, data: str, links: List[str], events: List[Tuple[str, str]], store: bool) -> Dict[str, Any]:
+    """
+    브라우저가 넘겨준 본문과 참조 목록에서 CPU 작업만 수행하여 구조화된 결과를 반환합니다.
+    I/O가 없으므로 분석 프로세스(ANALYSIS_PROCESSES)에서 실행할 수 있습니다.
+    링크/이벤트 URL은 정규화하고 페이지 안에서 중복을 제거하며, 생성일/카테고리/지문은 저장할 페이지(store)만 계산합니다.
+    (탐색 영역 규칙은 함정 판정 상태를 워커 안에서 공유해야 하므로 process_links/process_onclick_events에서 적용)
+    """
+    identifiers = {}
+    for onclick, identifier in events:
+        identifiers.setdefault(canonicalize_url(adjust_url(onclick)), identifier)
+    analysis = {
+        "links": _normalize_urls(links),
+        "events": list(identifiers.items()),
+        "created_at": None,
+        "categories": [],
+        "fingerprint": None,
+    }
+    if store:
+        analysis["created_at"] = find_created_at(data)
+        analysis["categories"] = get_categories_for_url(url)
+        if NEAR_DUP_ENABLED:
+            analysis["fingerprint"] = compute_fingerprint(data)
+    return analysis
+
+def apply_analysis(url: str, content: Dict[str, str], images: List[Tuple[str, Optional[int], Optional[int]]],
+                   analysis: Dict[str, Any], queue_manager: RedisQueueManager, store: bool) -> None:
+    """analyze_page 결과로 유사 중복 확인, 저장, 이미지 처리, 링크/이벤트 등록 등 I/O 작업을 수행합니다."""
+    duplicate = False
+    if store:
+        # 이미 저장한 페이지와 본문이 거의 같으면 저장과 링크 탐색을 생략 (이미지는 그대로 처리)
+        near_dup = get_near_duplicate_index(START_KEY)
+        original = near_dup.check_fingerprint(url, analysis["fingerprint"]) if near_dup is not None else None
+        if original:
+            print(f"ㄴ유사 중복 페이지, 저장 및 링크 탐색 생략 (원본: {original}): {url}")
+            duplicate = True
+        else:
+            print(f"ㄴ페이지 정보 저장: {url}")
+            store_page(url, content["title"], content["data"], analysis["created_at"], analysis["categories"])
+            if near_dup is not None and analysis["fingerprint"] is not None:
+                near_dup.add(analysis["fingerprint"], url)
+
+    # 페이지 내 이미지 찾기 및 처리
+    process_images(images, url, queue_manager)
+    if not duplicate:
+        # 다음 접속정보 탐색
+        process_links(analysis["links"], url, queue_manager)
+        process_onclick_events(analysis["events"], url, queue_manager)
+
+    if store:
+        # 크롤이 끝난 게시글은 다음 게시판 탐색에서 새 게시글로 보지 않음
+        mark_article_seen(url, queue_manager.redis_client, START_KEY)
+
+def process_page(driver, url: str, queue_manager: RedisQueueManager) -> Optional[Future]:
     """
     Selenium을 이용하여 지정된 URL을 렌더링한 후, 페이지 내의 링크, onClick 이벤트, 이미지를 추출하여 queue 또는 파일로 처리합니다.
+    분석 프로세스 풀을 사용하면 분석과 저장은 풀에서 이어서 진행하고, 그 작업이 끝나면 완료되는 Future를 반환합니다.
     """
     print(f"페이지 처리: {url}")
     max_retries = 3
     retry_delay = 2
 
     for attempt in range(max_retries):
+        started = time.monotonic()
         try:
             url = adjust_url(url)
             if not is_valid_url(url):
                 print(f"ㄴ유효하지 않은 URL: {url}")
                 return
 
-            # 페이지 조회
+            # 페이지 조회 (호스트별 속도 제한 적용)
+            rate_limiter.acquire(url)
+            started = time.monotonic()
             driver.get(url)
             wait_for_page_load(driver)
+            rate_limiter.record(url, time.monotonic() - started)
             time.sleep(PAGE_LOAD_DELAY)
+            record_page(driver, url)  # ARCHIVE_ENABLED이면 오프라인 재처리용으로 기록
+
+            # 최초접속인 경우에만 데이터 저장 (본문 영역/통합인증 확인도 저장할 때만 수행)
+            store = not queue_manager.is_visited(url, START_KEY)
+            content = extract_content(driver) if store else None
+            if store and content is None:
+                print(f"ㄴ컨텐츠 영역을 찾을 수 없음: {url}")
+                return
+
+            # 통합인증 페이지인 경우 처리 중단
+            if store and is_login_page(content["title"]):
+                print(f"ㄴ통합인증 페이지 감지, 처리 중단: {url}")
+                return
 
-            # 최초접속인 경우에만 데이터 저장
-            if not queue_manager.is_visited(url, START_KEY):
-                print(f"ㄴ페이지 정보 저장: {url}")
-
-                # 페이지 내 정보저장
-                content_area = None
-                try:
-                    content_area = driver.find_element(By.CLASS_NAME, "content")
-                except NoSuchElementException:
-                    try:
-                        content_area = driver.find_element(By.TAG_NAME, "body")
-                    except NoSuchElementException:
-                        print(f"ㄴ컨텐츠 영역을 찾을 수 없음: {url}")
-                        return
-
-                data = content_area.get_attribute("outerHTML")
-                title = driver.title
-                
-                # 통합인증 페이지인 경우 처리 중단
-                if '통합인증' in title:
-                    print(f"ㄴ통합인증 페이지 감지, 처리 중단: {url}")
-                    return
-                
-                dates_list = CREATED_BY_FIND_REGEX.findall(data)
-                created_at = dates_list[0][0] if dates_list else datetime.now().strftime("%Y-%m-%d")
-                print(f"ㄴ생성일: {created_at}")
-
-                # URL에 해당하는 모든 카테고리 가져오기
-                categories = get_categories_for_url(url)
-                log_id = save_log(url, title, created_at, 0)
-                for category in categories:
-                    content_id = save_content(data, category, log_id)
-
-            # 페이지 내 이미지 찾기 및 처리
-            process_images(driver, url, queue_manager)
-
-            # 다음 접속정보 탐색
-            process_links(driver, url, queue_manager)
-            process_onclick_events(driver, url, queue_manager)
+            references = extract_references(driver)
+            args = (url, content["data"] if store else "", references["links"], references["events"], store)
+            pool = get_analysis_pool()
+            if pool is not None:
+                # 브라우저는 바로 다음 페이지로 넘어가고, 분석은 프로세스 풀에서, 저장은 저장 스레드에서 진행
+                # 저장 단계는 process_page의 프로파일에 포함되지 않으므로 저장 스레드에서 따로 표본 측정
+                return pool.submit(analyze_page, args, lambda analysis: profile_call(
+                    apply_analysis, url, content, references["images"], analysis, queue_manager, store))
+
+            apply_analysis(url, content, references["images"], analyze_page(*args), queue_manager, store)
             
             # 성공적으로 처리되면 종료
             return
 
         except TimeoutException as e:
+            rate_limiter.record(url, time.monotonic() - started, error=True)
             print(f"ㄴ페이지 로딩 시간 초과 (URL: {url}): {e}")
         except WebDriverException as e:
+            rate_limiter.record(url, time.monotonic() - started, error=True)
             print(f"ㄴ웹드라이버 오류 (URL: {url}): {e}")
         except Exception as e:
             print(f"ㄴ페이지 처리 중 오류 발생 (URL: {url}): {e}")
@@ -218,61 +424,48 @@ def process_page(driver, url: str, queue_manager: RedisQueueManager) -> None:
         else:
             print(f"ㄴ최대 재시도 횟수 초과 (URL: {url})")
 
-def process_links(driver, parent_url: str, queue_manager: RedisQueueManager) -> None:
+def process_links(links: List[str], parent_url: str, queue_manager: RedisQueueManager) -> None:
     """
-    페이지 내의 링크를 처리합니다.
+    페이지 내의 링크(analyze_page에서 정규화한 URL)를 처리합니다.
     파일 다운로드 URL의 경우 여기서 처리되지 않음 (큐에 넣지 않고 바로 is_file_download에서 처리)
     """
     try:
-        anchors = driver.find_elements(By.TAG_NAME, "a")
-        for a in anchors:
-            href = a.get_attribute("href")
-            if href:
-                href = adjust_url(href)
-                if is_in_search_scope(href) and not queue_manager.is_visited(href, START_KEY):
-                    queue_manager.push({
-                        "type": "link",
-                        "url": href,
-                        "parent": parent_url
-                    }, START_KEY)
+        for href in links:
+            if is_in_search_scope(href) and not queue_manager.is_visited(href, START_KEY):
+                queue_manager.push({
+                    "type": "link",
+                    "url": href,
+                    "parent": parent_url
+                }, START_KEY)
     except Exception as e:
         print(f"링크 처리 중 오류 발생: {e}")
 
-def process_onclick_events(driver, parent_url: str, queue_manager: RedisQueueManager) -> None:
+def process_onclick_events(events: List[Tuple[str, str]], parent_url: str, queue_manager: RedisQueueManager) -> None:
     """
-    onClick 이벤트가 있는 요소를 처리합니다.
+    onClick 이벤트가 있는 요소(analyze_page에서 정규화한 URL과 식별자)를 처리합니다.
     """
     try:
-        elements = driver.find_elements(By.XPATH, '//*[@onclick]')
-        for elem in elements:
-            onclick = elem.get_attribute("onclick")
-            identifier = elem.get_attribute("outerHTML")
-
-            if onclick:
-                onclick = adjust_url(onclick)
-                if is_in_search_scope(onclick) and not queue_manager.is_visited(onclick, START_KEY):
-                    queue_manager.push({
-                        "type": "event",
-                        "url": onclick,
-                        "onClick": onclick,
-                        "identifier": identifier,
-                        "parent": parent_url
-                    }, START_KEY)
+        for onclick, identifier in events:
+            if is_in_search_scope(onclick) and not queue_manager.is_visited(onclick, START_KEY):
+                queue_manager.push({
+                    "type": "event",
+                    "url": onclick,
+                    "onClick": onclick,
+                    "identifier": identifier,
+                    "parent": parent_url
+                }, START_KEY)
     except Exception as e:
         print(f"onClick 이벤트 처리 중 오류 발생: {e}")
 
-def process_images(driver, parent_url: str, queue_manager: RedisQueueManager) -> None:
+def process_images(images: List[Tuple[str, Optional[int], Optional[int]]], parent_url: str, queue_manager: RedisQueueManager) -> None:
     """
     페이지 내의 이미지를 찾아 처리합니다.
     """
     try:
-        images = driver.find_elements(By.TAG_NAME, "img")
-        for img in images:
-            src = img.get_attribute("src")
-            if src:
-                image_url = adjust_url(src) # URL 정규화 함수 사용
-                if is_valid_url(image_url) and is_in_search_scope(image_url):
-                    # 이미지는 큐에 넣지 않고 바로 다운로드 처리
-                    process_image(image_url, parent_url, queue_manager)
+        for src, width, height in images:
+            image_url = adjust_url(src) # URL 정규화 함수 사용
+            if is_valid_url(image_url) and is_in_image_scope(image_url):
+                # 이미지는 큐에 넣지 않고 바로 다운로드 처리
+                process_image(image_url, parent_url, queue_manager, width, height)
     except Exception as e:
-        print(f"ㄴ이미지 추출 중 오류 발생: {e}")
\ No newline at end of file
+        print(f"ㄴ이미지 처리 중 오류 발생: {e}")
@@ -1,12 +1,22 @@
 # scraper/queue_processor.py
 import requests
 from collections import deque
+from concurrent.futures import Future
+from typing import Optional
 from scraper.page_processor import process_page
 from scraper.event_processor import process_event
+from scraper.board_enumerator import enumerate_board, find_enumerator
 from utils.file_manager import process_file_download, load_json, save_json
-from utils.config import FILE_EXTENSIONS, VISIT_JSON, FILELIST_JSON, PAGE_LOAD_DELAY, START_KEY, SCRAPLIST_JSON
+from utils.config import FILE_EXTENSIONS, VISIT_JSON, FILELIST_JSON, PAGE_LOAD_DELAY, START_KEY, SCRAPLIST_JSON, WORKER_IDLE_WAIT, SCOPE_REPORT_INTERVAL, ANALYSIS_MAX_ATTEMPTS
 from selenium.webdriver.chrome.webdriver import WebDriver
 from utils.queue_manager import RedisQueueManager
+from utils.worker_registry import WorkerRegistry
+from utils import rate_limiter
+from utils.scope_rules import get_scope_rules
+from utils.profiler import profile_call
+from utils.image_triage import get_image_triage
+from utils.near_duplicate import get_near_duplicate_index
+from utils.analysis_pool import get_analysis_pool, shutdown_analysis_pool
 import time
 import traceback
 from datetime import datetime
@@ -15,8 +25,12 @@ def is_file_download(url):
     """
     URL응답에 따라 파일응답인지 여부를 판단합니다
     """
+    rate_limiter.acquire(url)
+    started = time.monotonic()
     try:
         response = requests.head(url, allow_redirects=True, timeout=5)
+        rate_limiter.record(url, response.elapsed.total_seconds(), response.status_code,
+                            retry_after=response.headers.get("Retry-After"))
         content_type = response.headers.get("Content-Type", "").lower()
 
         # HTML이 아닌 경우 = 파일 응답으로 간주
@@ -24,13 +38,94 @@ def is_file_download(url):
             return True
         return False
     except requests.RequestException as e:
+        rate_limiter.record(url, time.monotonic() - started, error=True)
         print(f"[에러] 요청 실패: {e}")
         return False    
 
+def process_item(driver: WebDriver, item: dict, queue_manager: RedisQueueManager) -> Optional[Future]:
+    """
+    큐 항목 하나를 처리합니다. 파일 다운로드인 경우 별도로 처리합니다.
+    페이지 분석과 저장이 분석 프로세스 풀에서 이어서 진행되면 그 작업의 Future를 반환합니다.
+    """
+    url = item.get("url")
+    print(f"처리할 URL: {url}")
+    
+    if not url:
+        print("URL이 없어 다음 항목으로 넘어갑니다.")
+        return
+
+    if queue_manager.is_visited(url, START_KEY):
+        print(f"이미 방문한 URL: {url}")
+        return
+
+    if queue_manager.is_processing(url, START_KEY):
+        print(f"이미 처리 중인 URL: {url}")
+        return
+
+    print(f"URL 처리 시작: {url}")
+    queue_manager.mark_as_processing(url, START_KEY)
+    pending = None
+    
+    try:
+        # 파일 다운로드인 경우 별도 처리
+        if is_file_download(url):
+            print(f"파일 다운로드 처리: {url}")
+            parent_url = item.get("parent", "")
+            log_id = item.get("log_id")
+            process_file_download(url, parent_url, None, log_id)
+            queue_manager.mark_as_visited(url, START_KEY)
+        else:
+            enumerator = find_enumerator(url)
+            if enumerator and enumerator.is_list_url(url):
+                # 게시판 목록은 브라우저 대신 HTTP로 직접 탐색하여 게시글 URL을 큐에 추가
+                enumerate_board(url, queue_manager, START_KEY)
+            # 프로파일링 모드(PROFILE_EVERY)이면 N번째 호출마다 CPU/메모리 할당을 측정
+            pending = profile_call(process_page, driver, url, queue_manager)
+            if pending is None:
+                print(f"URL 처리 완료: {url}")
+                queue_manager.mark_as_visited(url, START_KEY)
+            else:
+                # 분석/저장이 끝난 뒤에 방문 완료로 표시하고, 실패하면 다시 큐에 추가
+                pending.add_done_callback(lambda future: finish_analysis(future, item, queue_manager))
+    except Exception as e:
+        print(f"URL 처리 중 오류 발생: {url}")
+        print(f"오류 내용: {str(e)}")
+        print("스택 트레이스:")
+        print(traceback.format_exc())
+        # 에러 발생 시 다시 큐에 추가
+        queue_manager.push(item, START_KEY)
+    finally:
+        # 처리 중 상태 해제 (분석/저장이 진행 중이면 finish_analysis에서 해제)
+        if pending is None and queue_manager.is_processing(url, START_KEY):
+            print(f"처리 중 상태 해제: {url}")
+            queue_manager.mark_as_visited(url, START_KEY)
+        time.sleep(PAGE_LOAD_DELAY)
+    return pending
+
+def finish_analysis(future: Future, item: dict, queue_manager: RedisQueueManager) -> None:
+    """
+    분석 프로세스 풀에서 진행한 분석/저장이 끝나면 호출됩니다.
+    성공하면 방문 완료로 표시하고, 실패하면 처리 중 상태를 해제한 뒤 ANALYSIS_MAX_ATTEMPTS번까지 다시 큐에 추가합니다.
+    """
+    url = item.get("url")
+    if future.exception() is None:
+        print(f"URL 처리 완료: {url}")
+        queue_manager.mark_as_visited(url, START_KEY)
+        return
+
+    attempts = item.get("analysis_attempts", 0) + 1
+    if attempts < ANALYSIS_MAX_ATTEMPTS:
+        print(f"ㄴ분석/저장 실패, 다시 큐에 추가 ({attempts}/{ANALYSIS_MAX_ATTEMPTS}): {url}")
+        queue_manager.clear_processing(url, START_KEY)
+        queue_manager.push({**item, "analysis_attempts": attempts}, START_KEY)
+    else:
+        print(f"ㄴ분석/저장 최대 재시도 횟수 초과: {url}")
+        queue_manager.mark_as_visited(url, START_KEY)
+
 def process_queue(driver: WebDriver, start_url: str) -> None:
     """
     큐를 이용하여 onClick 이벤트와 링크 항목을 우선순위에 따라 처리합니다.
-    파일 다운로드인 경우 별도로 처리합니다.
+    자신의 큐가 비더라도 다른 워커가 처리 중인 항목이 있으면 기다리며, SIGTERM을 받으면 현재 항목까지 처리하고 종료합니다.
     """
     try:
         queue_manager = RedisQueueManager()
@@ -52,67 +147,63 @@ def process_queue(driver: WebDriver, start_url: str) -> None:
         
         print(f"큐 확인: {queue_manager.get_queue_length(START_KEY)}")
 
-        while True:
-            try:
-                # 큐에서 다음 작업 가져오기
-                item = queue_manager.pop(START_KEY)
-                if not item:
-                    # 큐가 비어있고 처리 중인 작업이 없으면 종료
-                    if queue_manager.get_queue_length(START_KEY) == 0:
-                        print("큐가 비어있어 종료합니다.")
-                        break
-                    print("큐가 비어있어 대기합니다...")
-                    time.sleep(PAGE_LOAD_DELAY)
-                    continue
-                
-                url = item.get("url")
-                print(f"처리할 URL: {url}")
-                
-                if not url:
-                    print("URL이 없어 다음 항목으로 넘어갑니다.")
-                    continue
-
-                if queue_manager.is_visited(url, START_KEY):
-                    print(f"이미 방문한 URL: {url}")
-                    continue
+        registry = WorkerRegistry(queue_manager, START_KEY)
+        registry.register()
+        registry.install_signal_handlers()
+        scope_rules = get_scope_rules(START_KEY)
+        image_triage = get_image_triage(START_KEY)
+        near_dup = get_near_duplicate_index(START_KEY)
+        analysis_pool = get_analysis_pool()
+        processed = 0
+        try:
+            while not registry.draining:
+                try:
+                    # 큐에서 다음 작업을 꺼내 이 워커의 처리 중 목록에 기록
+                    claimed = queue_manager.claim(START_KEY, registry.worker_id)
+                    if not claimed:
+                        # 응답 없는 워커의 항목을 가져오고, 모든 워커의 작업이 끝났을 때만 종료
+                        if registry.reap_dead_workers() == 0 and registry.is_crawl_complete():
+                            print("큐가 비어있고 처리 중인 워커가 없어 종료합니다.")
+                            break
+                        print("큐가 비어있어 다른 워커의 작업을 기다립니다...")
+                        time.sleep(WORKER_IDLE_WAIT)
+                        continue
 
-                if queue_manager.is_processing(url, START_KEY):
-                    print(f"이미 처리 중인 URL: {url}")
-                    continue
+                    item, raw = claimed
+                    pending = None
+                    try:
+                        pending = process_item(driver, item, queue_manager)
+                    finally:
+                        if pending is None:
+                            queue_manager.release(raw, START_KEY, registry.worker_id)
+                        else:
+                            # 분석/저장이 끝나 새 링크가 큐에 들어간 뒤에 처리 중 목록에서 제거 (종료 판정이 앞서지 않도록)
+                            pending.add_done_callback(
+                                lambda _, raw=raw: queue_manager.release(raw, START_KEY, registry.worker_id))
 
-                print(f"URL 처리 시작: {url}")
-                queue_manager.mark_as_processing(url, START_KEY)
-                
-                try:
-                    # 파일 다운로드인 경우 별도 처리
-                    if is_file_download(url):
-                        print(f"파일 다운로드 처리: {url}")
-                        parent_url = item.get("parent", "")
-                        log_id = item.get("log_id")
-                        process_file_download(url, parent_url, None, log_id)
-                        queue_manager.mark_as_visited(url, START_KEY)
-                    else:
-                        process_page(driver, url, queue_manager)
-                        print(f"URL 처리 완료: {url}")
-                        queue_manager.mark_as_visited(url, START_KEY)
+                    processed += 1
+                    if processed % SCOPE_REPORT_INTERVAL == 0:
+                        scope_rules.report(queue_manager.redis_client)
+                        if image_triage is not None:
+                            image_triage.report()
+                        if near_dup is not None:
+                            near_dup.report()
                 except Exception as e:
-                    print(f"URL 처리 중 오류 발생: {url}")
-                    print(f"오류 내용: {str(e)}")
+                    print(f"큐 처리 중 오류 발생: {str(e)}")
                     print("스택 트레이스:")
                     print(traceback.format_exc())
-                    # 에러 발생 시 다시 큐에 추가
-                    queue_manager.push(item, START_KEY)
-                finally:
-                    # 처리 중 상태 해제
-                    if queue_manager.is_processing(url, START_KEY):
-                        print(f"처리 중 상태 해제: {url}")
-                        queue_manager.mark_as_visited(url, START_KEY)
                     time.sleep(PAGE_LOAD_DELAY)
-            except Exception as e:
-                print(f"큐 처리 중 오류 발생: {str(e)}")
-                print("스택 트레이스:")
-                print(traceback.format_exc())
-                time.sleep(PAGE_LOAD_DELAY)
+        finally:
+            if analysis_pool is not None:
+                # 남은 페이지의 분석/저장과 방문 완료 표시를 마친 뒤 종료
+                shutdown_analysis_pool()
+            queue_manager.flush_spill(START_KEY)
+            scope_rules.report(queue_manager.redis_client)
+            if image_triage is not None:
+                image_triage.report()
+            if near_dup is not None:
+                near_dup.report()
+            registry.deregister()
     except Exception as e:
         print(f"전체 프로세스 오류 발생: {str(e)}")
         print("스택 트레이스:")
@@ -0,0 +1,119 @@
+# utils/analysis_pool.py
+# 브라우저 스레드에서 CPU 작업(정규식 날짜 검색, 카테고리 매칭, 링크 정규화, 지문 계산)을 떼어내는 2단계 파이프라인입니다.
+#
+#   브라우저 스레드 --submit--> [프로세스 풀: 분석 함수] --결과--> [저장 스레드: DB/Redis 작업] --> 완료 Future
+#
+# - 분석 함수는 HTML과 참조 목록을 받아 구조화된 결과만 반환하며, 별도 프로세스에서 실행되므로 GIL을 잡지 않습니다.
+# - 제출된 작업은 크기가 ANALYSIS_MAX_PENDING인 큐를 거쳐 저장 스레드가 꺼내 처리합니다.
+#   큐가 가득 차면 submit이 기다리므로 브라우저가 분석/저장보다 너무 앞서가지 않습니다.
+#   저장 스레드가 하나(ANALYSIS_SINK_THREADS=1)일 때만 제출 순서대로 반영되며, 여럿이면 순서가 바뀔 수 있습니다.
+# - sink에서 발생한 예외는 완료 Future에 담기므로, 호출한 쪽에서 재시도/다시 큐에 넣기를 처리해야 합니다.
+
+import atexit
+import multiprocessing
+import queue
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+from utils.config import ANALYSIS_PROCESSES, ANALYSIS_MAX_PENDING, ANALYSIS_SINK_THREADS
+
+
+class AnalysisPool:
+    """분석 프로세스 풀과 저장 스레드를 묶은 파이프라인입니다. (스레드 안전)"""
+
+    def __init__(self, processes: int = ANALYSIS_PROCESSES, max_pending: int = ANALYSIS_MAX_PENDING,
+                 sink_threads: int = ANALYSIS_SINK_THREADS):
+        self.processes = processes
+        # 브라우저/Redis 연결을 가진 스레드가 있는 프로세스를 fork하지 않도록 spawn 사용
+        self._context = multiprocessing.get_context("spawn")
+        self.executor = self._create_executor()
+        self._pending: "queue.Queue[Optional[Tuple[Future, Callable[[Any], Any], Future]]]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._threads = []
+        for i in range(max(sink_threads, 1)):
+            thread = threading.Thread(target=self._sink_loop, name=f"analysis-sink-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.shutdown)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=self._context)
+
+    def run(self, func: Callable, args: Tuple) -> Future:
+        """func(*args)를 분석 프로세스에서 실행하고 그 결과의 Future를 반환합니다. (저장 단계 없음)"""
+        with self._lock:
+            try:
+                return self.executor.submit(func, *args)
+            except BrokenProcessPool:
+                # 분석 프로세스가 비정상 종료하면 풀 전체가 사용할 수 없게 되므로 새로 만듦
+                print("분석 프로세스 풀이 중단되어 다시 생성합니다.")
+                self.executor = self._create_executor()
+                return self.executor.submit(func, *args)
+
+    def submit(self, func: Callable, args: Tuple, sink: Callable[[Any], Any]) -> Future:
+        """
+        func(*args)를 분석 프로세스에서 실행하고, 그 결과로 저장 스레드에서 sink(result)를 실행합니다.
+        sink까지 끝나면 완료되는 Future를 반환합니다. 처리 대기 중인 작업이 가득 차 있으면 자리가 날 때까지 기다립니다.
+        func와 args는 다른 프로세스로 전달되므로 pickle할 수 있어야 합니다.
+        """
+        done: Future = Future()
+        self._pending.put((self.run(func, args), sink, done))
+        return done
+
+    def _sink_loop(self) -> None:
+        while True:
+            entry = self._pending.get()
+            try:
+                if entry is None:
+                    return
+                future, sink, done = entry
+                try:
+                    done.set_result(sink(future.result()))
+                except Exception as e:
+                    print(f"페이지 분석 결과 처리 중 오류 발생: {e}")
+                    print(traceback.format_exc())
+                    done.set_exception(e)
+            finally:
+                self._pending.task_done()
+
+    def wait(self) -> None:
+        """제출된 모든 작업의 저장 단계가 끝날 때까지 기다립니다."""
+        self._pending.join()
+
+    def shutdown(self) -> None:
+        if not self._threads:
+            return
+        self.wait()
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.executor.shutdown(wait=True)
+
+
+_pool: Optional[AnalysisPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_analysis_pool() -> Optional[AnalysisPool]:
+    """분석 파이프라인을 반환합니다. ANALYSIS_PROCESSES가 0이면 None을 반환합니다. (브라우저 스레드에서 바로 분석)"""
+    global _pool
+    if ANALYSIS_PROCESSES <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisPool()
+    return _pool
+
+
+def shutdown_analysis_pool() -> None:
+    """남은 작업의 저장 단계까지 마친 뒤 분석 프로세스와 저장 스레드를 종료합니다."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
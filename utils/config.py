@@ -23,6 +23,20 @@ CHROME_HEADLESS_OPTIONS = [
     "--window-size=1920,1080",
 ]
 
+# 브라우저 연결 방식
+# "local": 매번 새 Chrome 실행 (기본값)
+# "remote": 장기 실행 중인 WebDriver 서버(chromedriver/Selenium)에 Remote WebDriver로 연결
+# "devtools": browser_service가 미리 띄워둔 Chrome에 DevTools 포트로 바로 연결
+BROWSER_MODE = os.environ.get("BROWSER_MODE", "local")
+BROWSER_REMOTE_URL = os.environ.get("BROWSER_REMOTE_URL", "http://localhost:9515")
+BROWSER_DEBUG_HOST = os.environ.get("BROWSER_DEBUG_HOST", "127.0.0.1")
+BROWSER_DEBUG_BASE_PORT = int(os.environ.get("BROWSER_DEBUG_BASE_PORT", 9222))  # 슬롯 i의 DevTools 포트 = 기본 포트 + i
+BROWSER_SLOTS = int(os.environ.get("BROWSER_SLOTS", 4))  # browser_service가 띄워둘 브라우저 수
+BROWSER_PROFILE_DIR = os.environ.get("BROWSER_PROFILE_DIR", "")  # 슬롯별 user-data-dir 상위 폴더 (비어있으면 임시 프로필 사용)
+BROWSER_DISK_CACHE_SIZE = int(os.environ.get("BROWSER_DISK_CACHE_SIZE", 512 * 1024 * 1024))  # 슬롯별 디스크 캐시 크기 (바이트)
+CHROME_BINARY = os.environ.get("CHROME_BINARY", "google-chrome")
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", "")  # 지정 시 Selenium Manager 탐색을 건너뜀
+
 # 페이지 로딩 및 이벤트 실행 후 대기 시간 (초)
 PAGE_LOAD_DELAY = float(os.environ.get("PAGE_LOAD_DELAY", "0.1"))
 
@@ -32,6 +46,7 @@ FILE_EXTENSIONS = ['.pdf', '.zip', '.doc', '.docx', '.xls', '.xlsx', '.png', '.j
 # 다운로드 파일 저장 폴더
 # FILES_DIR = "./files"
 FILES_DIR = os.environ.get("FILES_DIR", "/data/files")
+PARTIAL_DIR = os.path.join(FILES_DIR, ".partial")  # 다운로드 중인 임시 파일 폴더
 
 # JSON 파일 경로
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -39,6 +54,8 @@ FILELIST_JSON = os.path.join(BASE_DIR, "data", "filelist.json")
 VISIT_JSON = os.path.join(BASE_DIR, "data", "visit.json")
 CAT_MAPPING_JSON = os.path.join(BASE_DIR, "data", "cat_mapping.json")
 SCRAPLIST_JSON = os.path.join(BASE_DIR, "data", "scraplist.json")
+SCOPE_RULES_JSON = os.environ.get("SCOPE_RULES_JSON", os.path.join(BASE_DIR, "data", "scope_rules.json"))
+SCOPE_REPORT_INTERVAL = int(os.environ.get("SCOPE_REPORT_INTERVAL", 100))  # 몇 개 항목마다 탐색 영역 규칙 집계를 출력할지
 
 # Redis 설정
 REDIS_CONFIG = {
@@ -55,4 +72,117 @@ MYSQL_CONFIG = {
     "user": os.environ.get("MYSQL_USER", "your_username"),
     "password": os.environ.get("MYSQL_PASSWORD", "your_password"),
     "database": os.environ.get("MYSQL_DATABASE", "amate")
-}
\ No newline at end of file
+}
+
+# 파일 다운로드 설정
+DOWNLOAD_CHUNK_SIZE = int(os.environ.get("DOWNLOAD_CHUNK_SIZE", 64 * 1024))  # 스트리밍 청크 크기 (바이트)
+DOWNLOAD_MAX_SIZE = int(os.environ.get("DOWNLOAD_MAX_SIZE", 100 * 1024 * 1024))  # 최대 다운로드 크기 (바이트, 0이면 무제한)
+DOWNLOAD_TIMEOUT = float(os.environ.get("DOWNLOAD_TIMEOUT", "30"))  # 연결/읽기 타임아웃 (초)
+DOWNLOAD_MAX_RETRIES = int(os.environ.get("DOWNLOAD_MAX_RETRIES", 3))  # 중단 시 이어받기 재시도 횟수
+DOWNLOAD_PARALLEL_THRESHOLD = int(os.environ.get("DOWNLOAD_PARALLEL_THRESHOLD", 8 * 1024 * 1024))  # 병렬 구간 다운로드를 사용할 최소 크기
+DOWNLOAD_PARALLEL_WORKERS = int(os.environ.get("DOWNLOAD_PARALLEL_WORKERS", 4))  # 병렬 구간 다운로드 스레드 수
+DOWNLOAD_PARTIAL_MAX_AGE = int(os.environ.get("DOWNLOAD_PARTIAL_MAX_AGE", 86400))  # 이 시간(초) 동안 이어받지 않은 임시 파일은 시작 시 삭제
+
+# 크롤 엔진 선택: "sync"(기존 process_queue) 또는 "async"(asyncio 엔진)
+CRAWL_ENGINE = os.environ.get("CRAWL_ENGINE", "sync")
+ASYNC_CONCURRENCY = int(os.environ.get("ASYNC_CONCURRENCY", 8))  # 동시에 처리할 큐 항목 수
+ASYNC_BROWSER_COUNT = int(os.environ.get("ASYNC_BROWSER_COUNT", 1))  # asyncio 엔진이 사용할 브라우저 수
+ASYNC_IO_WORKERS = int(os.environ.get("ASYNC_IO_WORKERS", 8))  # DB/파일 작업용 스레드 수
+
+# 워커 레지스트리 / 하트비트 설정
+WORKER_HEARTBEAT_INTERVAL = float(os.environ.get("WORKER_HEARTBEAT_INTERVAL", "10"))  # 하트비트 갱신 주기 (초)
+WORKER_HEARTBEAT_TTL = int(os.environ.get("WORKER_HEARTBEAT_TTL", 30))  # 하트비트가 끊긴 워커를 죽은 것으로 판단하는 시간 (초)
+WORKER_IDLE_WAIT = float(os.environ.get("WORKER_IDLE_WAIT", "1.0"))  # 큐가 비었지만 크롤이 끝나지 않았을 때 대기 시간 (초)
+
+# 호스트별 요청 속도 제한 (Redis 토큰 버킷, 모든 워커가 공유)
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_INITIAL_RATE = float(os.environ.get("RATE_LIMIT_INITIAL_RATE", "2.0"))  # 호스트별 초기 허용 속도 (요청/초)
+RATE_LIMIT_MIN_RATE = float(os.environ.get("RATE_LIMIT_MIN_RATE", "0.2"))  # 최소 허용 속도
+RATE_LIMIT_MAX_RATE = float(os.environ.get("RATE_LIMIT_MAX_RATE", "20.0"))  # 최대 허용 속도
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "5"))  # 버킷 최대 토큰 수
+RATE_LIMIT_INCREASE = float(os.environ.get("RATE_LIMIT_INCREASE", "0.5"))  # 정상 응답 시 초당 증가량 (가산 증가)
+RATE_LIMIT_DECREASE = float(os.environ.get("RATE_LIMIT_DECREASE", "0.5"))  # 지연/오류/429 시 곱해지는 비율 (승산 감소)
+RATE_LIMIT_LATENCY_TARGET = float(os.environ.get("RATE_LIMIT_LATENCY_TARGET", "3.0"))  # 이 시간(초)을 넘는 응답은 과부하 신호로 간주
+RATE_LIMIT_DECREASE_COOLDOWN = float(os.environ.get("RATE_LIMIT_DECREASE_COOLDOWN", "5.0"))  # 연속 감소를 막는 최소 간격 (초)
+
+# 게시판 목록 직접 탐색 설정
+BOARD_ENUMERATOR_ENABLED = os.environ.get("BOARD_ENUMERATOR_ENABLED", "true").lower() == "true"
+# 게시판으로 인식할 URL 경로 정규식 목록 (쉼표로 구분)
+BOARD_URL_PATTERNS = [p for p in os.environ.get("BOARD_URL_PATTERNS", r"notice[^/]*\.do$,board[^/]*\.do$").split(",") if p]
+BOARD_PAGE_SIZE = int(os.environ.get("BOARD_PAGE_SIZE", 10))  # 목록 한 페이지당 게시글 수 (articleLimit)
+BOARD_MAX_PAGES = int(os.environ.get("BOARD_MAX_PAGES", 1000))  # 게시판 하나당 최대 탐색 페이지 수
+BOARD_STOP_PAGES = int(os.environ.get("BOARD_STOP_PAGES", 3))  # 새 게시글이 없는 페이지가 이만큼 이어지면 탐색 종료
+
+# 쓰기 지연(write-behind) 아웃박스 설정
+# 활성화하면 save_log/save_content가 MySQL 대신 로컬 세그먼트 로그에 기록하고, `python -m utils.outbox`가 MySQL로 일괄 적재합니다.
+OUTBOX_ENABLED = os.environ.get("OUTBOX_ENABLED", "false").lower() == "true"
+OUTBOX_DIR = os.environ.get("OUTBOX_DIR", "/data/outbox")
+OUTBOX_SEGMENT_SIZE = int(os.environ.get("OUTBOX_SEGMENT_SIZE", 16 * 1024 * 1024))  # 세그먼트 최대 크기 (바이트)
+OUTBOX_SEGMENT_MAX_AGE = float(os.environ.get("OUTBOX_SEGMENT_MAX_AGE", "5"))  # 세그먼트를 닫고 적재 대상으로 넘기는 최대 시간 (초)
+OUTBOX_FSYNC = os.environ.get("OUTBOX_FSYNC", "true").lower() == "true"  # 기록마다 fsync 여부
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 500))  # 삭제/중복 확인 한 번에 처리할 ID 수 (INSERT는 max_allowed_packet 기준으로 나눔)
+OUTBOX_ID_SAFETY_GAP = int(os.environ.get("OUTBOX_ID_SAFETY_GAP", 100000))  # ID 시퀀스 초기화 시 DB 최대값에 더할 여유분
+MYSQL_ID_COLUMNS = {
+    "scrap_info": os.environ.get("SCRAP_INFO_ID_COLUMN", "id"),
+    "contents": os.environ.get("CONTENTS_ID_COLUMN", "id"),
+}
+
+# 인덱서용 증분 내보내기 설정 (`python -m utils.exporter`)
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "/data/export")
+EXPORT_STATE_JSON = os.environ.get("EXPORT_STATE_JSON", os.path.join(BASE_DIR, "data", "export_state.json"))
+EXPORT_SHARD_ROWS = int(os.environ.get("EXPORT_SHARD_ROWS", 50000))  # 샤드 파일 하나당 최대 행 수
+EXPORT_FETCH_SIZE = int(os.environ.get("EXPORT_FETCH_SIZE", 1000))  # 서버 측 커서에서 한 번에 가져올 행 수
+EXPORT_SAFETY_LAG = int(os.environ.get("EXPORT_SAFETY_LAG", 60))  # 아직 저장 중일 수 있는 최근 행을 제외할 시간 (초)
+
+# 프로파일링 모드 설정 (PROFILE_EVERY가 0이면 비활성화)
+PROFILE_EVERY = int(os.environ.get("PROFILE_EVERY", 0))  # process_page N번 호출마다 한 번 프로파일링
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/data/profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))  # 보관할 최근 프로파일 덤프 수 (오래된 것부터 삭제)
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", 25))  # 요약 보고서에 표시할 함수/할당 위치 수
+PROFILE_TRACEMALLOC = os.environ.get("PROFILE_TRACEMALLOC", "true").lower() == "true"  # 메모리 할당 추적 여부
+PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get("PROFILE_TRACEMALLOC_FRAMES", 1))  # 할당마다 기록할 스택 깊이
+PROFILE_SUMMARY_INTERVAL = int(os.environ.get("PROFILE_SUMMARY_INTERVAL", 10))  # 프로파일 몇 개마다 요약 보고서를 갱신할지
+
+# 렌더링한 페이지 기록(아카이브) 및 오프라인 재처리 설정 (`python -m scraper.page_archive`)
+ARCHIVE_ENABLED = os.environ.get("ARCHIVE_ENABLED", "false").lower() == "true"
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "/data/archive")
+ARCHIVE_SEGMENT_SIZE = int(os.environ.get("ARCHIVE_SEGMENT_SIZE", 256 * 1024 * 1024))  # 아카이브 파일 하나의 최대 크기 (압축 후, 바이트)
+
+# 카테고리 재분류 작업 설정 (`python -m utils.recategorize`)
+CAT_MAPPING_APPLIED_JSON = os.environ.get("CAT_MAPPING_APPLIED_JSON", os.path.join(BASE_DIR, "data", "cat_mapping.applied.json"))  # 마지막으로 DB에 반영한 매핑
+RECATEGORIZE_BATCH_SIZE = int(os.environ.get("RECATEGORIZE_BATCH_SIZE", 500))  # 한 트랜잭션에서 처리할 scrap_info 행 수
+
+# 이미지 선별 설정 (아이콘, 간격용 이미지, 중복 배너 등 의미 없는 이미지 저장 생략)
+IMAGE_TRIAGE_ENABLED = os.environ.get("IMAGE_TRIAGE_ENABLED", "true").lower() == "true"
+IMAGE_MIN_WIDTH = int(os.environ.get("IMAGE_MIN_WIDTH", 64))  # 이보다 폭이 작은 이미지는 건너뜀 (px)
+IMAGE_MIN_HEIGHT = int(os.environ.get("IMAGE_MIN_HEIGHT", 64))  # 이보다 높이가 작은 이미지는 건너뜀 (px)
+IMAGE_MIN_BYTES = int(os.environ.get("IMAGE_MIN_BYTES", 2048))  # 이보다 작은 파일은 건너뜀 (바이트)
+IMAGE_MAX_BYTES = int(os.environ.get("IMAGE_MAX_BYTES", 20 * 1024 * 1024))  # 이보다 큰 파일은 건너뜀 (바이트)
+IMAGE_SNIFF_BYTES = int(os.environ.get("IMAGE_SNIFF_BYTES", 32 * 1024))  # 형식과 크기를 판별하기 위해 먼저 읽을 바이트 수
+IMAGE_DECISION_CACHE_SIZE = int(os.environ.get("IMAGE_DECISION_CACHE_SIZE", 50000))  # 프로세스 내에 기억할 URL별 판정 수
+
+# 큐 항목 인코딩: "compact"(부모 URL ID 치환, 식별자 해시) 또는 "json"(기존 형식)
+# 두 형식 모두 읽을 수 있으므로, 이전 버전 스크래퍼와 함께 실행하는 동안에만 "json"으로 설정합니다.
+QUEUE_ENCODING = os.environ.get("QUEUE_ENCODING", "compact")
+
+# 디스크 스필 프런티어 설정 (큐가 길어지면 넘치는 항목을 세그먼트 파일로 내보내 Redis 메모리 사용량을 제한)
+FRONTIER_SPILL_ENABLED = os.environ.get("FRONTIER_SPILL_ENABLED", "false").lower() == "true"
+FRONTIER_SPILL_DIR = os.environ.get("FRONTIER_SPILL_DIR", "/data/frontier")
+# 모든 워커가 같은 디렉터리(NFS 등, 워커가 한 호스트에만 있으면 로컬 디스크)를 보는지 여부. false이면 스필을 사용하지 않음
+FRONTIER_SPILL_SHARED = os.environ.get("FRONTIER_SPILL_SHARED", "false").lower() == "true"
+FRONTIER_HIGH_WATERMARK = int(os.environ.get("FRONTIER_HIGH_WATERMARK", 200000))  # 큐 길이가 이 이상이면 새 항목을 디스크에 기록
+FRONTIER_LOW_WATERMARK = int(os.environ.get("FRONTIER_LOW_WATERMARK", 50000))  # 큐 길이가 이보다 작으면 디스크의 항목을 큐로 되돌림
+FRONTIER_SEGMENT_ITEMS = int(os.environ.get("FRONTIER_SEGMENT_ITEMS", 10000))  # 세그먼트 파일 하나당 최대 항목 수
+FRONTIER_SEGMENT_MAX_AGE = float(os.environ.get("FRONTIER_SEGMENT_MAX_AGE", "5"))  # 세그먼트를 닫고 다른 워커에게 보이게 하는 최대 시간 (초)
+
+# 유사 중복 페이지 판정 설정 (본문 SimHash 지문이 이미 저장한 페이지와 가까우면 저장과 링크 탐색 생략)
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "false").lower() == "true"
+NEAR_DUP_MAX_DISTANCE = int(os.environ.get("NEAR_DUP_MAX_DISTANCE", 3))  # 유사 중복으로 볼 최대 해밍 거리 (64비트 중)
+NEAR_DUP_MIN_TOKENS = int(os.environ.get("NEAR_DUP_MIN_TOKENS", 50))  # 본문 단어가 이보다 적은 페이지는 판정하지 않음
+NEAR_DUP_SHINGLE_SIZE = int(os.environ.get("NEAR_DUP_SHINGLE_SIZE", 3))  # 지문 계산에 사용할 연속 단어 수
+
+# 페이지 분석 프로세스 풀 설정 (브라우저 스레드 대신 별도 프로세스에서 날짜/카테고리/링크/지문 계산)
+ANALYSIS_PROCESSES = int(os.environ.get("ANALYSIS_PROCESSES", 0))  # 분석 프로세스 수 (0이면 브라우저 스레드에서 바로 분석)
+ANALYSIS_MAX_PENDING = int(os.environ.get("ANALYSIS_MAX_PENDING", 8))  # 분석/저장을 기다릴 수 있는 최대 페이지 수 (가득 차면 브라우저가 대기)
+ANALYSIS_SINK_THREADS = int(os.environ.get("ANALYSIS_SINK_THREADS", 1))  # 분석 결과를 DB/Redis에 반영하는 스레드 수 (2 이상이면 반영 순서가 바뀔 수 있음)
+ANALYSIS_MAX_ATTEMPTS = int(os.environ.get("ANALYSIS_MAX_ATTEMPTS", 3))  # 분석/저장에 실패한 페이지를 다시 큐에 넣는 최대 횟수
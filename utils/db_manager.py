@@ -1,8 +1,9 @@
 # utils/db_manager.py
 from datetime import datetime
 import re
+from typing import Callable, Optional
 import mysql.connector
-from utils.config import MYSQL_CONFIG
+from utils.config import MYSQL_CONFIG, OUTBOX_ENABLED
 
 def get_connection():
     return mysql.connector.connect(
@@ -13,6 +14,17 @@ def get_connection():
         database=MYSQL_CONFIG["database"]
     )
 
+def ensure_index(cursor, table: str, column: str, name: str, length: Optional[int] = None) -> None:
+    """column을 첫 번째 열로 하는 인덱스가 없으면 생성합니다."""
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s AND seq_in_index = 1",
+        (table, column))
+    if cursor.fetchone()[0]:
+        return
+    print(f"인덱스 생성: {table}.{column} ({name})")
+    cursor.execute(f"CREATE INDEX {name} ON {table} ({column}{f'({length})' if length else ''})")
+
 def is_visited(url: str) -> bool:
     """
     주어진 URL에 대한 접속이력이 있는지 확인합니다
@@ -33,16 +45,26 @@ def is_visited(url: str) -> bool:
         cursor.close()
         conn.close()
     
+def _format_created_at(created_at: str) -> str:
+    created_at = re.sub(r"\.", "-", created_at)
+    return datetime.strptime(created_at, '%Y-%m-%d').strftime('%Y-%m-%d %H:%M:%S')
+
 def save_log(scrap_url, url_title, created_at, data_type = 0):
     """
     방문한 URL과 부모 정보를 MySQL DB의 scrap_info 테이블에 삽입하고, log_id를 반환합니다.
     """
+    created_at = _format_created_at(created_at)
+
+    if OUTBOX_ENABLED:
+        # MySQL 대신 로컬 아웃박스에 기록 (utils.outbox 적재기가 일괄 반영)
+        from utils import outbox
+        return outbox.insert("scrap_info", {
+            "scrap_url": scrap_url, "url_title": url_title, "created_at": created_at, "data_type": data_type
+        })
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    created_at = re.sub(r"\.", "-", created_at)
-    created_at = datetime.strptime(created_at, '%Y-%m-%d').strftime('%Y-%m-%d %H:%M:%S')
-
     try:
         query = "INSERT INTO scrap_info (scrap_url, url_title, created_at, data_type) VALUES (%s, %s, %s, %s)"
         cursor.execute(query, (scrap_url, url_title, created_at, data_type))
@@ -60,6 +82,13 @@ def save_content(data: str, category: str = None, log_id: int = None, data_type:
     """
     본문(HTML 등) 데이터를 content 테이블에 저장하고 id를 반환합니다.
     """
+    if OUTBOX_ENABLED:
+        from utils import outbox
+        return outbox.insert("contents", {
+            "data_type": data_type, "data": data, "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "category": category, "log_id": log_id, "org_file_name": org_filename, "org_file_ext": org_ext
+        })
+
     conn = get_connection()
     try:
         cursor = conn.cursor()
@@ -77,4 +106,60 @@ def save_content(data: str, category: str = None, log_id: int = None, data_type:
         raise
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def save_file(scrap_url: str, url_title: str, log_id: Optional[int], org_filename: str, org_ext: str,
+              place_file: Callable[[int], None], data_type: int = 1) -> int:
+    """
+    다운로드한 파일(data_type 1) 또는 이미지(data_type 2)의 scrap_info(log_id가 없을 때)와 contents 행을 저장하고 content_id를 반환합니다.
+    행 ID를 먼저 얻은 뒤 place_file(content_id)로 파일을 최종 경로에 기록하고, 그 다음에 커밋합니다.
+    place_file이나 커밋이 실패하면 두 행 모두 기록되지 않습니다. (파일 정리는 호출자가 처리)
+    """
+    created_at = _format_created_at(datetime.now().strftime("%Y-%m-%d"))
+
+    if OUTBOX_ENABLED:
+        from utils import outbox
+        new_log = log_id is None
+        if new_log:
+            log_id = outbox.allocate_id("scrap_info")
+        content_id = outbox.allocate_id("contents")
+        place_file(content_id)
+        if new_log:
+            outbox.insert("scrap_info", {
+                "scrap_url": scrap_url, "url_title": url_title, "created_at": created_at, "data_type": data_type
+            }, row_id=log_id)
+        try:
+            outbox.insert("contents", {
+                "data_type": data_type, "data": "", "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "category": None, "log_id": log_id, "org_file_name": org_filename, "org_file_ext": org_ext
+            }, row_id=content_id)
+        except Exception:
+            if new_log:
+                outbox.delete("scrap_info", log_id)
+            raise
+        return content_id
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if log_id is None:
+            cursor.execute(
+                "INSERT INTO scrap_info (scrap_url, url_title, created_at, data_type) VALUES (%s, %s, %s, %s)",
+                (scrap_url, url_title, created_at, data_type))
+            log_id = cursor.lastrowid
+        cursor.execute("""
+            INSERT INTO contents (
+                data_type, data, created_at, category, log_id, org_file_name, org_file_ext
+            ) VALUES (%s, '', NOW(), NULL, %s, %s, %s)
+        """, (data_type, log_id, org_filename, org_ext))
+        content_id = cursor.lastrowid
+        place_file(content_id)
+        conn.commit()
+        return content_id
+    except Exception as e:
+        print(f"파일 정보 저장 중 오류 발생: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,291 @@
+# utils/download_manager.py
+# 크기 제한, 이어받기(Range), 병렬 구간 다운로드를 지원하는 스트리밍 다운로더입니다.
+# 다운로드는 PARTIAL_DIR의 임시 파일에 기록되며, 완료된 뒤에만 최종 경로로 원자적으로 이동합니다.
+
+import os
+import glob
+import hashlib
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from utils.config import (
+    PARTIAL_DIR,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_MAX_SIZE,
+    DOWNLOAD_TIMEOUT,
+    DOWNLOAD_MAX_RETRIES,
+    DOWNLOAD_PARALLEL_THRESHOLD,
+    DOWNLOAD_PARALLEL_WORKERS,
+    DOWNLOAD_PARTIAL_MAX_AGE,
+)
+from utils import rate_limiter
+
+
+class DownloadError(Exception):
+    """다운로드 실패 시 발생하는 예외입니다."""
+
+
+class DownloadTooLargeError(DownloadError):
+    """다운로드 크기가 제한을 초과한 경우 발생하는 예외입니다."""
+
+
+class DownloadResult:
+    """완료된 다운로드의 임시 파일 경로, 크기, 응답 헤더를 담습니다."""
+
+    def __init__(self, url: str, temp_path: str, size: int, headers: CaseInsensitiveDict):
+        self.url = url
+        self.temp_path = temp_path
+        self.size = size
+        self.headers = headers
+
+    def commit(self, dest_path: str) -> str:
+        """임시 파일을 최종 경로로 원자적으로 이동하고, 이동이 디스크에 기록되도록 디렉터리를 fsync합니다."""
+        os.replace(self.temp_path, dest_path)
+        self.temp_path = None
+        _fsync_dir(os.path.dirname(dest_path))
+        return dest_path
+
+    def discard(self) -> None:
+        """커밋하지 않은 임시 파일을 삭제합니다."""
+        if self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self.temp_path = None
+
+
+def get_partial_path(url: str) -> str:
+    """URL별로 고정된 임시 파일 경로를 반환합니다. (중단 후 이어받기에 사용)"""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(PARTIAL_DIR, f"{digest}.part")
+
+
+def _check_size(size: int, max_size: int, url: str) -> None:
+    if max_size and size > max_size:
+        raise DownloadTooLargeError(f"다운로드 크기 제한 초과: {size} > {max_size} (URL: {url})")
+
+
+def _probe(session: requests.Session, url: str, timeout: float) -> Tuple[Optional[int], bool, CaseInsensitiveDict]:
+    """HEAD 요청으로 전체 크기와 Range 지원 여부를 확인합니다."""
+    rate_limiter.acquire(url)
+    started = time.monotonic()
+    try:
+        r = session.head(url, allow_redirects=True, timeout=timeout)
+        rate_limiter.record(url, r.elapsed.total_seconds(), r.status_code, retry_after=r.headers.get("Retry-After"))
+        if r.status_code >= 400:
+            return None, False, CaseInsensitiveDict()
+        length = r.headers.get("Content-Length")
+        total = int(length) if length and length.isdigit() else None
+        accepts_ranges = r.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return total, accepts_ranges, CaseInsensitiveDict(r.headers)
+    except requests.RequestException:
+        rate_limiter.record(url, time.monotonic() - started, error=True)
+        return None, False, CaseInsensitiveDict()
+
+
+def _fsync_file(path: str) -> None:
+    with open(path, "rb+") as f:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_file(dest_path: str, body: bytes) -> str:
+    """내용을 임시 파일에 기록하고 fsync한 뒤 최종 경로로 원자적으로 이동합니다. (이미 받아 둔 이미지 저장용)"""
+    temp_path = f"{dest_path}.part"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, dest_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_dir(os.path.dirname(dest_path))
+    return dest_path
+
+
+def sweep_partial_files(max_age: int = DOWNLOAD_PARTIAL_MAX_AGE) -> int:
+    """max_age초 동안 이어받지 않은 임시 파일(중단된 다운로드의 잔여물)을 삭제하고 삭제한 수를 반환합니다."""
+    if not os.path.isdir(PARTIAL_DIR):
+        return 0
+    removed = 0
+    threshold = time.time() - max_age
+    for name in os.listdir(PARTIAL_DIR):
+        path = os.path.join(PARTIAL_DIR, name)
+        try:
+            if os.path.getmtime(path) < threshold:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        print(f"오래된 다운로드 임시 파일 {removed}개를 삭제했습니다.")
+    return removed
+
+
+def _stream_to_file(session, url, path, start, end, chunk_size, max_size, timeout, headers_out=None):
+    """
+    [start, end] 구간을 path에 이어서 기록합니다. end가 None이면 끝까지 받습니다.
+    이미 기록된 바이트는 건너뛰고 Range 요청으로 이어받습니다. 기록된 전체 바이트 수를 반환합니다.
+    """
+    written = os.path.getsize(path) if os.path.exists(path) else 0
+    expected = None if end is None else end - start + 1
+    if expected is not None and written >= expected:
+        return written
+
+    req_headers = {}
+    if start + written > 0 or end is not None:
+        range_end = "" if end is None else str(end)
+        req_headers["Range"] = f"bytes={start + written}-{range_end}"
+
+    rate_limiter.acquire(url)
+    started = time.monotonic()
+    try:
+        r = session.get(url, headers=req_headers, stream=True, timeout=timeout)
+    except requests.RequestException:
+        rate_limiter.record(url, time.monotonic() - started, error=True)
+        raise
+    rate_limiter.record(url, r.elapsed.total_seconds(), r.status_code, retry_after=r.headers.get("Retry-After"))
+
+    with r:
+        if r.status_code == 416 and written > 0 and end is None:
+            # 요청한 시작 위치가 파일 끝 이후: 이전 시도에서 이미 끝까지 받음
+            return written
+        r.raise_for_status()
+        if headers_out is not None:
+            headers_out.update(r.headers)
+
+        mode = "ab"
+        if req_headers and r.status_code != 206:
+            # 서버가 Range를 무시하고 전체 본문을 보낸 경우 처음부터 다시 기록
+            if start > 0:
+                raise DownloadError(f"서버가 구간 요청을 지원하지 않습니다 (URL: {url})")
+            mode = "wb"
+            written = 0
+
+        with open(path, mode) as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                if expected is not None and written + len(chunk) > expected:
+                    chunk = chunk[:expected - written]
+                f.write(chunk)
+                written += len(chunk)
+                _check_size(start + written, max_size, url)
+                if expected is not None and written >= expected:
+                    break
+    return written
+
+
+def _download_single(session, url, path, total, chunk_size, max_size, timeout, max_retries, headers_out):
+    """단일 스트림으로 다운로드하며, 중단 시 이어받기를 재시도합니다."""
+    last_error = None
+    for attempt in range(max_retries):
+        try:
+            _stream_to_file(session, url, path, 0, None, chunk_size, max_size, timeout, headers_out)
+            size = os.path.getsize(path)
+            if total is not None and size < total:
+                raise DownloadError(f"수신 크기 부족: {size}/{total} (URL: {url})")
+            return size
+        except DownloadTooLargeError:
+            raise
+        except (requests.RequestException, DownloadError) as e:
+            last_error = e
+            print(f"ㄴ다운로드 중단, 이어받기 재시도 {attempt + 1}/{max_retries} (URL: {url}): {e}")
+            time.sleep(min(2 ** attempt, 10))
+    raise DownloadError(f"다운로드 실패 (URL: {url}): {last_error}")
+
+
+def _download_parallel(session, url, path, total, chunk_size, max_size, timeout, max_retries, workers, headers_out):
+    """전체 크기를 구간으로 나누어 병렬로 받은 뒤 하나의 파일로 합칩니다."""
+    segment_size = -(-total // workers)
+    ranges = [(i, start, min(start + segment_size, total) - 1)
+              for i, start in enumerate(range(0, total, segment_size))]
+
+    def fetch(segment):
+        index, start, end = segment
+        segment_path = f"{path}.{index}"
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                written = _stream_to_file(session, url, segment_path, start, end, chunk_size, max_size, timeout)
+                if written == end - start + 1:
+                    return segment_path
+                raise DownloadError(f"구간 {index} 수신 크기 부족: {written}/{end - start + 1}")
+            except DownloadTooLargeError:
+                raise
+            except (requests.RequestException, DownloadError) as e:
+                last_error = e
+                time.sleep(min(2 ** attempt, 10))
+        raise DownloadError(f"구간 {index} 다운로드 실패 (URL: {url}): {last_error}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        segment_paths = list(executor.map(fetch, ranges))
+
+    with open(path, "wb") as out:
+        for segment_path in segment_paths:
+            with open(segment_path, "rb") as seg:
+                while True:
+                    block = seg.read(chunk_size)
+                    if not block:
+                        break
+                    out.write(block)
+    for segment_path in segment_paths:
+        os.remove(segment_path)
+    return os.path.getsize(path)
+
+
+def download_file(
+    url: str,
+    session: Optional[requests.Session] = None,
+    max_size: int = DOWNLOAD_MAX_SIZE,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    timeout: float = DOWNLOAD_TIMEOUT,
+    max_retries: int = DOWNLOAD_MAX_RETRIES,
+    parallel_threshold: int = DOWNLOAD_PARALLEL_THRESHOLD,
+    parallel_workers: int = DOWNLOAD_PARALLEL_WORKERS,
+) -> DownloadResult:
+    """
+    URL을 임시 파일로 다운로드하고 DownloadResult를 반환합니다.
+    호출자는 후속 처리(DB 저장 등)가 끝난 뒤 commit()으로 최종 경로에 이동하거나 discard()로 폐기해야 합니다.
+    """
+    os.makedirs(PARTIAL_DIR, exist_ok=True)
+    session = session or requests.Session()
+    path = get_partial_path(url)
+
+    total, accepts_ranges, headers = _probe(session, url, timeout)
+    if total is not None:
+        _check_size(total, max_size, url)
+
+    try:
+        use_parallel = (
+            accepts_ranges and total is not None and parallel_workers > 1
+            and parallel_threshold and total >= parallel_threshold
+        )
+        if use_parallel:
+            print(f"ㄴ병렬 구간 다운로드 ({parallel_workers}개, {total} 바이트): {url}")
+            size = _download_parallel(session, url, path, total, chunk_size, max_size,
+                                      timeout, max_retries, parallel_workers, headers)
+        else:
+            if not accepts_ranges and os.path.exists(path):
+                # 이어받기가 불가능하면 남은 임시 파일을 버리고 처음부터 받음
+                os.remove(path)
+            size = _download_single(session, url, path, total, chunk_size, max_size,
+                                    timeout, max_retries, headers)
+    except DownloadTooLargeError:
+        for leftover in [path] + glob.glob(f"{glob.escape(path)}.*"):
+            os.remove(leftover)
+        raise
+
+    _fsync_file(path)
+    return DownloadResult(url, path, size, headers)
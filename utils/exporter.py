@@ -0,0 +1,268 @@
+# utils/exporter.py
+# 챗봇 인덱서를 위해 contents/scrap_info를 증분으로 내보내는 명령입니다. (`python -m utils.exporter`)
+#
+# 워터마크는 DB가 행을 적재한 시각(contents.loaded_at, 기본값 CURRENT_TIMESTAMP(6))과 id의 쌍입니다.
+# loaded_at 열과 삭제 기록 테이블은 `python -m utils.migrate`로 먼저 추가해야 하며, 없으면 내보내기가 실패합니다.
+# content_id는 아웃박스가 미리 발급하므로 적재 순서와 다를 수 있고 created_at은 크롤러 시각이므로,
+# 둘 다 워터마크로 쓰면 늦게 적재된 작은 id의 행을 건너뛰게 됩니다.
+# EXPORT_SAFETY_LAG보다 최근에 적재된 행은 아직 커밋 중일 수 있으므로 다음 실행으로 미룹니다.
+#
+# 워터마크 이후의 행을 서버 측 커서로 스트리밍하여 카테고리와 출처 URL을 붙인 줄 단위 JSON을 gzip 샤드 파일로 기록하고,
+# 재분류(utils/recategorize.py)로 삭제되거나 카테고리가 지워진 행은 contents_tombstones를 통해 삭제 레코드로 내보냅니다.
+# 샤드는 임시 파일에 쓴 뒤 완료 시 이름을 바꾸고 그때 워터마크를 전진시키므로,
+# 중간에 중단되면 마지막 완료 샤드 이후부터 다시 시작합니다.
+
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+from utils.config import (
+    EXPORT_DIR,
+    EXPORT_STATE_JSON,
+    EXPORT_SHARD_ROWS,
+    EXPORT_FETCH_SIZE,
+    EXPORT_SAFETY_LAG,
+    MYSQL_ID_COLUMNS,
+)
+from utils.db_manager import get_connection
+from utils.migrate import MigrationRequiredError, require_migrations
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+EPOCH = "1970-01-01 00:00:00.000000"
+
+EXPORT_QUERY = """
+    SELECT
+        c.{content_id} AS content_id, c.log_id, c.category, c.data_type, c.data,
+        c.org_file_name, c.org_file_ext, c.created_at AS saved_at, c.loaded_at,
+        s.scrap_url AS source_url, s.url_title AS title, s.created_at
+    FROM contents c
+    LEFT JOIN scrap_info s ON s.{log_id} = c.log_id
+    WHERE (c.loaded_at > %s OR (c.loaded_at = %s AND c.{content_id} > %s))
+      AND c.loaded_at <= %s
+    ORDER BY c.loaded_at, c.{content_id}
+"""
+
+TOMBSTONE_QUERY = """
+    SELECT seq, content_id, log_id, deleted_at
+    FROM contents_tombstones
+    WHERE (deleted_at > %s OR (deleted_at = %s AND seq > %s))
+      AND deleted_at <= %s
+    ORDER BY deleted_at, seq
+"""
+
+
+# 내보내기와 삭제 기록에 필요한 스키마 변경 (utils/migrate.py로 적용)
+EXPORT_MIGRATIONS = ["export_watermark", "contents_tombstones"]
+
+
+def check_export_schema(cursor) -> None:
+    """내보내기 워터마크 열(contents.loaded_at)과 삭제 기록 테이블이 없으면 MigrationRequiredError를 발생시킵니다."""
+    require_migrations(cursor, EXPORT_MIGRATIONS)
+
+
+def record_tombstones(cursor, content_ids: List[int]) -> None:
+    """인덱서에서 지워야 할 contents 행을 삭제 기록 테이블에 남깁니다. (행을 삭제/변경하는 트랜잭션 안에서 먼저 호출)"""
+    if not content_ids:
+        return
+    content_id_column = MYSQL_ID_COLUMNS["contents"]
+    cursor.execute(
+        f"INSERT INTO contents_tombstones (content_id, log_id) "
+        f"SELECT {content_id_column}, log_id FROM contents "
+        f"WHERE {content_id_column} IN ({', '.join(['%s'] * len(content_ids))})",
+        content_ids)
+
+
+def load_state(path: str = EXPORT_STATE_JSON) -> Dict[str, Any]:
+    """내보내기 워터마크 상태를 로드합니다."""
+    if not os.path.exists(path):
+        return {"last_loaded_at": EPOCH, "last_content_id": 0, "last_log_id": 0, "last_created_at": None,
+                "last_deleted_at": EPOCH, "last_tombstone_seq": 0, "shard_seq": 0}
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    state.setdefault("last_deleted_at", EPOCH)
+    state.setdefault("last_tombstone_seq", 0)
+    return state
+
+
+def save_state(state: Dict[str, Any], path: str = EXPORT_STATE_JSON) -> None:
+    """워터마크 상태를 임시 파일에 쓴 뒤 원자적으로 교체합니다."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _serialize(row: Dict[str, Any]) -> str:
+    for key, value in row.items():
+        if key in ("loaded_at", "deleted_at") and isinstance(value, datetime):
+            row[key] = value.strftime(TIMESTAMP_FORMAT)
+        elif isinstance(value, datetime):
+            row[key] = value.strftime("%Y-%m-%d %H:%M:%S")
+        elif isinstance(value, (bytes, bytearray)):
+            row[key] = value.decode("utf-8", errors="replace")
+    return json.dumps(row, ensure_ascii=False)
+
+
+class ShardWriter:
+    """행과 삭제 레코드를 gzip 압축 NDJSON 샤드에 기록하고, 샤드가 완료될 때마다 워터마크를 저장합니다."""
+
+    def __init__(self, output_dir: str, state: Dict[str, Any], shard_rows: int):
+        self.output_dir = output_dir
+        self.state = state
+        self.shard_rows = shard_rows
+        self._file = None
+        self._temp_path = None
+        self._final_path = None
+        self._rows = 0
+        self._tombstones = 0
+        self._first_id = None
+        self._last_id = None
+        self._watermark: Dict[str, Any] = {}
+        self.total_rows = 0
+        self.total_tombstones = 0
+
+    def _open(self) -> None:
+        self.state["shard_seq"] += 1
+        name = f"contents-{self.state['shard_seq']:08d}.ndjson.gz"
+        self._final_path = os.path.join(self.output_dir, name)
+        self._temp_path = f"{self._final_path}.tmp"
+        self._file = gzip.open(self._temp_path, "wt", encoding="utf-8")
+        self._rows = 0
+        self._tombstones = 0
+        self._first_id = None
+        self._last_id = None
+        self._watermark = {}
+
+    def _write_line(self, line: str) -> None:
+        self._file.write(line + "\n")
+        if self._rows + self._tombstones >= self.shard_rows:
+            self.close_shard()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._open()
+        line = _serialize(row)
+        self._watermark.update(last_loaded_at=row["loaded_at"], last_content_id=row["content_id"],
+                               last_log_id=row["log_id"], last_created_at=row["created_at"])
+        if self._first_id is None:
+            self._first_id = row["content_id"]
+        self._last_id = row["content_id"]
+        self._rows += 1
+        self.total_rows += 1
+        self._write_line(line)
+
+    def write_tombstone(self, row: Dict[str, Any]) -> None:
+        """인덱서가 content_id의 문서를 지우도록 삭제 레코드를 기록합니다."""
+        if self._file is None:
+            self._open()
+        record = {"content_id": row["content_id"], "log_id": row["log_id"], "deleted": True, "deleted_at": row["deleted_at"]}
+        line = _serialize(record)
+        self._watermark.update(last_deleted_at=record["deleted_at"], last_tombstone_seq=row["seq"])
+        self._tombstones += 1
+        self.total_tombstones += 1
+        self._write_line(line)
+
+    def close_shard(self) -> None:
+        """현재 샤드를 완료하고 매니페스트와 워터마크를 갱신합니다."""
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._temp_path, self._final_path)
+
+        with open(os.path.join(self.output_dir, "manifest.ndjson"), "a", encoding="utf-8") as manifest:
+            manifest.write(json.dumps({
+                "shard": os.path.basename(self._final_path),
+                "rows": self._rows,
+                "tombstones": self._tombstones,
+                "first_content_id": self._first_id,
+                "last_content_id": self._last_id,
+                "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }, ensure_ascii=False) + "\n")
+
+        self.state.update(self._watermark)
+        save_state(self.state)
+        print(f"샤드 완료: {os.path.basename(self._final_path)} ({self._rows}행, 삭제 {self._tombstones}건)")
+        self._file = None
+
+
+def _cleanup_partial_shards(output_dir: str) -> None:
+    """이전 실행이 중단되며 남긴 미완료 샤드를 삭제합니다."""
+    for name in os.listdir(output_dir):
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(output_dir, name))
+            print(f"미완료 샤드 삭제: {name}")
+
+
+def _start_watermark(cursor, state: Dict[str, Any]) -> None:
+    """loaded_at 워터마크가 없는 이전 형식의 상태를 변환합니다. (열을 추가할 때 있던 행은 모두 같은 loaded_at을 가짐)"""
+    if "last_loaded_at" in state:
+        return
+    cursor.execute("SELECT MIN(loaded_at) FROM contents")
+    oldest = cursor.fetchone()[0]
+    state["last_loaded_at"] = oldest.strftime(TIMESTAMP_FORMAT) if oldest else EPOCH
+
+
+def _stream(cursor, query: str, params, fetch_size: int, write) -> None:
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            break
+        for row in rows:
+            write(row)
+
+
+def export_contents(output_dir: str = EXPORT_DIR, shard_rows: int = EXPORT_SHARD_ROWS,
+                    fetch_size: int = EXPORT_FETCH_SIZE, safety_lag: int = EXPORT_SAFETY_LAG) -> int:
+    """워터마크 이후의 contents 행과 삭제 기록을 샤드 파일로 내보내고 내보낸 행 수를 반환합니다."""
+    os.makedirs(output_dir, exist_ok=True)
+    _cleanup_partial_shards(output_dir)
+
+    state = load_state()
+    started = time.monotonic()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        check_export_schema(cursor)
+        _start_watermark(cursor, state)
+        # 한 번 정한 기준 시각 이후에 적재된 행은 이번 실행에서 제외
+        cursor.execute("SELECT NOW(6) - INTERVAL %s SECOND", (safety_lag,))
+        cutoff = cursor.fetchone()[0].strftime(TIMESTAMP_FORMAT)
+        conn.commit()
+    finally:
+        cursor.close()
+    print(f"내보내기 시작: (loaded_at, content_id) > ({state['last_loaded_at']}, {state['last_content_id']}), "
+          f"기준 시각 {cutoff}")
+
+    writer = ShardWriter(output_dir, state, shard_rows)
+    # buffered=False: 결과 전체를 클라이언트 메모리에 올리지 않고 서버에서 스트리밍
+    cursor = conn.cursor(buffered=False, dictionary=True)
+    try:
+        _stream(cursor,
+                EXPORT_QUERY.format(content_id=MYSQL_ID_COLUMNS["contents"], log_id=MYSQL_ID_COLUMNS["scrap_info"]),
+                (state["last_loaded_at"], state["last_loaded_at"], state["last_content_id"], cutoff),
+                fetch_size, writer.write)
+        _stream(cursor, TOMBSTONE_QUERY,
+                (state["last_deleted_at"], state["last_deleted_at"], state["last_tombstone_seq"], cutoff),
+                fetch_size, writer.write_tombstone)
+        writer.close_shard()
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"내보내기 완료: {writer.total_rows}행, 삭제 {writer.total_tombstones}건 ({time.monotonic() - started:.1f}초)")
+    return writer.total_rows
+
+
+if __name__ == "__main__":
+    try:
+        export_contents(output_dir=sys.argv[1] if len(sys.argv) > 1 else EXPORT_DIR)
+    except MigrationRequiredError as e:
+        print(f"내보내기 중단: {e}")
+        sys.exit(1)
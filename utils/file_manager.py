@@ -2,9 +2,10 @@
 import os
 import json
 import re
-import requests
 from utils.config import FILES_DIR, FILELIST_JSON, VISIT_JSON
-from utils.db_manager import save_content
+from utils.db_manager import save_file
+from utils.download_manager import download_file, sweep_partial_files, write_file, DownloadTooLargeError
+from urllib.parse import urlparse
 from datetime import datetime
 
 def initialize_files():
@@ -19,6 +20,8 @@ def initialize_files():
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump({}, f, ensure_ascii=False, indent=4)
 
+    sweep_partial_files()
+
 def load_json(filename):    
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
@@ -27,60 +30,79 @@ def save_json(filename, data):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
 
+def get_download_filename(url, content_disposition):
+    """
+    Content-Disposition 헤더 또는 URL 경로에서 원본 파일명과 확장자를 추출합니다.
+    """
+    org_filename = None
+    if "filename=" in content_disposition:
+        filename_match = re.search(r'filename="?([^\";]+)"?', content_disposition)
+        if filename_match:
+            org_filename = filename_match.group(1)
+
+    if not org_filename:
+        org_filename = os.path.basename(url.split("?")[0])
+
+    org_filename, org_ext = os.path.splitext(org_filename)
+    return org_filename, org_ext.lstrip(".")
+
 def process_file_download(url, parent, filelist, log_id=None):
     """
-    파일 다운로드 응답인 경우, 파일을 FILES_DIR 폴더에 저장하고 filelist.json을 업데이트합니다.
+    파일 다운로드 응답인 경우, 파일을 임시 파일로 끝까지 받아 FILES_DIR 폴더로 원자적으로 이동(fsync)한 뒤 DB에 커밋합니다.
+    다운로드나 저장이 실패하면 DB에는 아무것도 기록되지 않으며, 임시 파일은 다음 시도에서 이어받기에 사용됩니다.
+    오류는 출력만 하고 None을 반환합니다.
     """
-    # if url in filelist:
-    #     return filelist
     try:
-        r = requests.get(url, stream=True)
-        content_disposition = r.headers.get("Content-Disposition", "")
-
-        if r.status_code == 200:
+        result = download_file(url)
+    except DownloadTooLargeError as e:
+        print(f"파일 크기 제한으로 다운로드 건너뜀: {e}")
+        return None
+    except Exception as e:
+        print(f"파일 다운로드 중 오류 발생 (URL: {url}): {e}")
+        return None
 
-            org_filename = None
-            if "filename=" in content_disposition:
-                filename_match = re.search(r'filename="?([^\";]+)"?', content_disposition)
-                if filename_match:
-                    org_filename = filename_match.group(1)
-            
-            if not org_filename:
-                org_filename = os.path.basename(url.split("?")[0])
-            
-            org_filename, org_ext = os.path.splitext(org_filename)
-            org_ext = org_ext.lstrip(".")
+    placed = []
 
-            content_id = save_content("", org_filename, org_ext, org_filename=org_filename, org_ext=org_ext)
-            filepath = os.path.join(FILES_DIR, content_id)
+    def place_file(content_id):
+        # DB 커밋 전에 파일을 최종 경로에 기록
+        filepath = os.path.join(FILES_DIR, f"{content_id}.{org_ext}" if org_ext else str(content_id))
+        result.commit(filepath)
+        placed.append(filepath)
 
-            with open(filepath, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+    try:
+        org_filename, org_ext = get_download_filename(url, result.headers.get("Content-Disposition", ""))
+        content_id = save_file(url, f"{org_filename}.{org_ext}", log_id, org_filename, org_ext, place_file)
+        print(f"파일 다운로드 완료: {placed[0]} ({result.size} 바이트, 출처: {url})")
+        return content_id
+    except Exception as e:
+        print(f"파일 저장 중 오류 발생 (URL: {url}): {e}")
+        for filepath in placed:
+            # 커밋되지 않은 행을 가리키는 파일을 남기지 않음
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        result.discard()
+        return None
 
-            
-            # filelist[url] = {
-            #     "parent": parent, 
-            #     "filename": org_filename,
-            #     "ext": org_ext,
-            #     "log_id": log_id
-            # }
-            # save_json(FILELIST_JSON, filelist)
+def save_image_file(url, body):
+    """
+    받아 둔 이미지를 FILES_DIR 폴더에 기록(fsync)한 뒤 DB에 커밋하고 content_id를 반환합니다.
+    파일 기록이나 DB 저장이 실패하면 행과 파일 모두 남기지 않고 예외를 다시 발생시킵니다.
+    """
+    org_filename = os.path.basename(urlparse(url).path) or "downloaded_image"
+    org_filename, org_ext = os.path.splitext(org_filename)
+    org_ext = org_ext.lstrip(".")
+    placed = []
 
-            # visit.json 업데이트
-            # visit_data = load_json(VISIT_JSON)
-            # visit_data[url] = {
-            #     "visited_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            #     "type": "file",
-            #     "parent": parent,
-            #     "filename": org_filename,
-            #     "ext": org_ext,
-            #     "log_id": log_id
-            # }
-            # save_json(VISIT_JSON, visit_data)
+    def place_file(content_id):
+        # 파일을 ./files/{content_id}.{ext} 형식으로 DB 커밋 전에 기록
+        filepath = write_file(os.path.join(FILES_DIR, f"{content_id}.{org_ext}"), body)
+        placed.append(filepath)
 
-            print(f"파일 다운로드 완료: {content_id} (출처: {url})")
-    except Exception as e:
-        print(f"파일 다운로드 중 오류 발생 (URL: {url}): {e}")
-    # return filelist
\ No newline at end of file
+    try:
+        return save_file(url, f"{org_filename}.{org_ext}", None, org_filename, org_ext, place_file, data_type=2)
+    except Exception:
+        for filepath in placed:
+            # 커밋되지 않은 행을 가리키는 파일을 남기지 않음
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        raise
@@ -0,0 +1,265 @@
+# utils/frontier_spill.py
+# 큐(url_queue:<key>)가 너무 길어질 때 넘치는 항목을 디스크 세그먼트 파일로 내보내는 계층형 프런티어입니다.
+#
+# - Redis 큐 길이가 FRONTIER_HIGH_WATERMARK 이상이 되면 이후 추가되는 항목은 Redis 대신 세그먼트 파일에 기록합니다.
+#   (기록 중: .open, 닫힌 파일: .seg) 닫힌 세그먼트는 frontier_segments:<key> 목록에 순서대로 등록됩니다.
+# - 큐 길이가 FRONTIER_LOW_WATERMARK 아래로 내려가면 가장 오래된 세그먼트부터 큐 뒤쪽으로 다시 넣습니다.
+#   넘긴 항목이 남아있는 동안에는 새 항목도 디스크로 보내므로, 먼저 추가된 항목이 대체로 먼저 처리됩니다.
+# - 워커 사이의 순서는 최선 노력(best-effort)입니다. 디스크 기록 여부(active)는 워커별 상태이고, 다른 워커의 아직 닫히지
+#   않은 .open 세그먼트 항목은 frontier_spilled:<key>에 포함되지 않으므로, 그 사이 active가 아닌 워커가 더 나중 항목을
+#   Redis 큐에 먼저 넣을 수 있습니다. (열린 세그먼트는 FRONTIER_SEGMENT_MAX_AGE가 지나면 닫혀 등록되므로 역전은 대체로 그 시간 안의 항목으로 한정)
+# - 어느 워커든 세그먼트를 되돌릴 수 있어야 하므로 FRONTIER_SPILL_DIR은 모든 워커가 보는 디렉터리(NFS 등, 단일 호스트면
+#   로컬 디스크)여야 하며, FRONTIER_SPILL_SHARED=true로 이를 확인한 경우에만 동작합니다.
+# - 워커가 비정상 종료하면 그 워커의 열린 세그먼트는 응답 없는 워커를 정리하는 워커(reap_dead_workers)가 닫아 등록합니다.
+#
+# 동기 Redis 클라이언트로 동작하며, RedisQueueManager는 직접, AsyncRedisQueueManager는 스레드 풀에서 호출합니다.
+
+import json
+import os
+import socket
+import threading
+import time
+from typing import List, Optional, Tuple
+from utils.config import (
+    FRONTIER_SPILL_DIR,
+    FRONTIER_SPILL_ENABLED,
+    FRONTIER_SPILL_SHARED,
+    FRONTIER_HIGH_WATERMARK,
+    FRONTIER_LOW_WATERMARK,
+    FRONTIER_SEGMENT_ITEMS,
+    FRONTIER_SEGMENT_MAX_AGE,
+)
+
+OPEN_SUFFIX = ".open"
+SEGMENT_SUFFIX = ".seg"
+# 세그먼트를 큐로 되돌리는 동안 다른 워커가 같은 세그먼트를 되돌리지 않도록 잡는 락의 타임아웃 (초)
+REFILL_LOCK_TIMEOUT = 60
+
+
+def get_spilled_key(key: str) -> str:
+    """디스크에 넘겨 아직 큐로 돌아오지 않은 항목 수를 기록하는 키를 반환합니다. (종료 판정에 사용)"""
+    return f"frontier_spilled:{key}"
+
+
+def is_spill_enabled() -> bool:
+    """디스크 스필을 사용할 수 있는지 반환합니다. 디렉터리를 공유하지 않으면 사용하지 않습니다."""
+    return FRONTIER_SPILL_ENABLED and FRONTIER_SPILL_SHARED
+
+
+if FRONTIER_SPILL_ENABLED and not FRONTIER_SPILL_SHARED:
+    print("경고: FRONTIER_SPILL_DIR을 모든 워커가 공유한다고 설정(FRONTIER_SPILL_SHARED=true)하지 않아 디스크 스필을 사용하지 않습니다.")
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FrontierSpill:
+    """
+    키별 디스크 스필 프런티어입니다. (스레드 안전)
+    세그먼트 파일은 한 줄에 하나씩 인코딩된 큐 항목을 JSON 문자열로 기록하며, 기록마다 flush합니다.
+    """
+
+    def __init__(self, key: str, redis_client, queue_key: str, directory: str = FRONTIER_SPILL_DIR,
+                 segment_items: int = FRONTIER_SEGMENT_ITEMS, segment_max_age: float = FRONTIER_SEGMENT_MAX_AGE):
+        self.key = key
+        self.redis_client = redis_client
+        self.queue_key = queue_key
+        self.host = socket.gethostname()
+        self.directory = os.path.join(directory, key)
+        self.segment_items = segment_items
+        self.segment_max_age = segment_max_age
+        self.segments_key = f"frontier_segments:{key}"
+        self.refill_lock_key = f"frontier_refill_lock:{key}"
+        self.spilled_key = get_spilled_key(key)
+        self.active = False  # True이면 새 항목을 Redis 대신 디스크에 기록
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._count = 0
+        self._opened_at = 0.0
+        self._sequence = 0
+        os.makedirs(self.directory, exist_ok=True)
+        # 같은 호스트에서 비정상 종료한 프로세스가 남긴 세그먼트 (다음 refill에서 등록)
+        self._orphans = self._close_open_segments(
+            lambda host, pid: host == self.host and pid != os.getpid() and not _is_process_alive(pid))
+
+    @property
+    def pending(self) -> int:
+        """아직 닫히지 않은(다른 워커가 볼 수 없는) 세그먼트의 항목 수"""
+        return self._count
+
+    def _open_file(self) -> None:
+        self._sequence += 1
+        name = f"{int(time.time() * 1000):013d}_{self.host}_{os.getpid()}_{self._sequence:06d}{OPEN_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._count = 0
+        self._opened_at = time.monotonic()
+
+    def _close_locked(self) -> Optional[Tuple[str, int]]:
+        if self._file is None:
+            return None
+        self._file.close()
+        path = self._path[:-len(OPEN_SUFFIX)] + SEGMENT_SUFFIX
+        os.replace(self._path, path)
+        entry = (path, self._count)
+        self._file = None
+        self._path = None
+        self._count = 0
+        return entry
+
+    def _register(self, entry: Optional[Tuple[str, int]]) -> None:
+        """닫힌 세그먼트를 목록 끝에 등록하여 다른 워커가 큐로 되돌릴 수 있게 합니다."""
+        if entry is None:
+            return
+        path, count = entry
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.rpush(self.segments_key, path)
+        pipe.incrby(self.spilled_key, count)
+        pipe.execute()
+
+    def _close_open_segments(self, is_orphan) -> List[Tuple[str, int]]:
+        """is_orphan(host, pid)가 참인 프로세스의 .open 세그먼트를 닫고 (경로, 항목 수) 목록을 반환합니다."""
+        recovered = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(OPEN_SUFFIX):
+                continue
+            try:
+                _, host, pid, _ = name[:-len(OPEN_SUFFIX)].rsplit("_", 3)
+                pid = int(pid)
+            except ValueError:
+                continue
+            if not is_orphan(host, pid):
+                continue
+            open_path = os.path.join(self.directory, name)
+            path = open_path[:-len(OPEN_SUFFIX)] + SEGMENT_SUFFIX
+            try:
+                os.replace(open_path, path)
+            except FileNotFoundError:
+                continue  # 다른 워커가 먼저 복구함
+            recovered.append((path, len(self.read_segment(path))))
+            print(f"종료된 프로세스의 세그먼트를 복구했습니다: {path}")
+        return recovered
+
+    def spill(self, raws: List[str]) -> bool:
+        """디스크에 기록 중이면 항목을 세그먼트에 추가하고 True를, 아니면 아무것도 하지 않고 False를 반환합니다."""
+        if not self.active:
+            return False
+        for raw in raws:
+            with self._lock:
+                if self._file is None:
+                    self._open_file()
+                self._file.write(json.dumps(raw) + "\n")
+                self._file.flush()
+                self._count += 1
+                entry = self._close_locked() if self._count >= self.segment_items else None
+            self._register(entry)
+        return True
+
+    def observe_length(self, length: int) -> None:
+        """RPUSH 후의 큐 길이가 FRONTIER_HIGH_WATERMARK 이상이면 이후 항목을 디스크에 기록합니다."""
+        if not self.active and length >= FRONTIER_HIGH_WATERMARK:
+            self.active = True
+            print(f"큐 길이가 {length}개에 도달하여 이후 항목을 디스크에 기록합니다: {self.directory}")
+
+    def flush(self) -> None:
+        """열려 있는 세그먼트를 닫고 등록합니다."""
+        with self._lock:
+            entry = self._close_locked()
+        self._register(entry)
+
+    def flush_if_idle(self) -> None:
+        """
+        큐가 FRONTIER_LOW_WATERMARK보다 짧으면 열린 세그먼트를 닫고 등록합니다.
+        항목 처리를 마칠 때마다 호출하여, 큐가 빈 것처럼 보이는 동안 항목이 열린 세그먼트에 숨어 있지 않도록 합니다.
+        """
+        if self.pending and self.redis_client.llen(self.queue_key) < FRONTIER_LOW_WATERMARK:
+            self.flush()
+
+    def _register_orphans(self) -> None:
+        while self._orphans:
+            self._register(self._orphans[0])
+            self._orphans.pop(0)
+
+    def adopt(self, host: str, pid: int) -> int:
+        """응답 없는 워커(host, pid)의 열린 세그먼트를 닫아 등록하고 항목 수를 반환합니다."""
+        self._register_orphans()
+        entries = self._close_open_segments(lambda h, p: h == host and p == pid)
+        for entry in entries:
+            self._register(entry)
+        return sum(count for _, count in entries)
+
+    def refill(self) -> None:
+        """
+        큐 길이가 FRONTIER_LOW_WATERMARK보다 작으면 가장 오래된 세그먼트부터 큐 뒤쪽으로 되돌립니다.
+        넘긴 항목이 모두 돌아오면 새 항목을 다시 Redis에 직접 추가합니다.
+        """
+        self._register_orphans()
+        if self._file is not None and (
+                self._count >= self.segment_items or time.monotonic() - self._opened_at >= self.segment_max_age):
+            self.flush()
+        else:
+            self.flush_if_idle()
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.llen(self.queue_key)
+        pipe.get(self.spilled_key)
+        hot, spilled = pipe.execute()
+        spilled = int(spilled or 0)
+        if spilled > 0:
+            # 디스크에 남은 항목보다 새 항목이 먼저 처리되지 않도록 함
+            self.active = True
+        elif self.active and not self.pending and hot < FRONTIER_LOW_WATERMARK:
+            self.active = False
+            print(f"디스크에 넘긴 큐 항목이 모두 돌아와 Redis 큐를 다시 사용합니다. (큐 길이: {hot})")
+        if hot >= FRONTIER_LOW_WATERMARK or not spilled:
+            return
+        if not self.redis_client.set(self.refill_lock_key, os.getpid(), nx=True, ex=REFILL_LOCK_TIMEOUT):
+            return
+
+        moved = 0
+        try:
+            while hot < FRONTIER_LOW_WATERMARK:
+                path = self.redis_client.lindex(self.segments_key, 0)
+                if path is None:
+                    break
+                items = self.read_segment(path) if os.path.exists(path) else []
+                pipe = self.redis_client.pipeline(transaction=True)
+                if items:
+                    pipe.rpush(self.queue_key, *items)
+                pipe.lpop(self.segments_key)
+                pipe.decrby(self.spilled_key, len(items))
+                pipe.execute()
+                self.remove_segment(path)
+                hot += len(items)
+                moved += len(items)
+        finally:
+            self.redis_client.delete(self.refill_lock_key)
+        if moved:
+            print(f"디스크에 넘긴 큐 항목 {moved}개를 큐로 되돌렸습니다. (큐 길이: {hot})")
+
+    @staticmethod
+    def read_segment(path: str) -> List[str]:
+        """세그먼트의 항목을 기록된 순서대로 반환합니다. 비정상 종료로 잘린 마지막 줄은 건너뜁니다."""
+        items = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    print(f"세그먼트의 손상된 줄을 건너뜁니다: {path}")
+        return items
+
+    @staticmethod
+    def remove_segment(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
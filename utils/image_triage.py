@@ -0,0 +1,226 @@
+# utils/image_triage.py
+# 이미지를 다운로드/저장하기 전에 값싼 정보부터 차례로 확인하여 의미 없는 이미지를 걸러냅니다.
+#
+# 1. URL별 판정 기억: 이미 판정한 URL은 프로세스 내 캐시(없으면 Redis 해시)에서 바로 결과를 얻습니다.
+# 2. DOM 크기: 브라우저가 알려준 이미지 원본 크기가 기준보다 작으면 요청하지 않습니다.
+# 3. Content-Length: 응답 헤더의 크기가 기준보다 작거나 크면 본문을 받지 않습니다.
+# 4. 첫 바이트: 매직 바이트로 형식과 원본 크기를 읽어 이미지가 아니거나 작으면 중단합니다.
+# 5. 내용 중복: 본문 해시를 image_hashes:<key> 집합에 기록하여 URL만 다른 같은 이미지(배너 등)를 건너뜁니다.
+
+import hashlib
+import struct
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+import redis
+from utils.config import (
+    REDIS_CONFIG,
+    IMAGE_TRIAGE_ENABLED,
+    IMAGE_MIN_WIDTH,
+    IMAGE_MIN_HEIGHT,
+    IMAGE_MIN_BYTES,
+    IMAGE_MAX_BYTES,
+    IMAGE_DECISION_CACHE_SIZE,
+)
+
+KEEP = "keep"
+
+# JPEG에서 이미지 크기를 담고 있는 SOF 마커 (C4/C8/CC는 SOF가 아님)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    i = 2
+    while i + 9 <= len(head):
+        if head[i] != 0xFF:
+            i += 1
+            continue
+        marker = head[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", head[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", head[i + 2:i + 4])[0]
+    return None
+
+
+def sniff_image(head: bytes) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """
+    파일 앞부분의 매직 바이트로 (형식, 폭, 높이)를 반환합니다.
+    이미지 형식이 아니면 형식이 None이고, 크기를 알 수 없으면 폭/높이가 None입니다.
+    """
+    try:
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+            width, height = struct.unpack(">II", head[16:24])
+            return "png", width, height
+        if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+            width, height = struct.unpack("<HH", head[6:10])
+            return "gif", width, height
+        if head.startswith(b"\xff\xd8"):
+            size = _jpeg_size(head)
+            return ("jpeg", *size) if size else ("jpeg", None, None)
+        if head.startswith(b"RIFF") and head[8:12] == b"WEBP" and len(head) >= 30:
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", head[26:30])
+                return "webp", width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                b0, b1, b2, b3 = head[21:25]
+                return "webp", 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+            if chunk == b"VP8X":
+                return "webp", 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+            return "webp", None, None
+        if head.startswith(b"BM") and len(head) >= 26:
+            width, height = struct.unpack("<ii", head[18:26])
+            return "bmp", abs(width), abs(height)
+        if head.startswith(b"\x00\x00\x01\x00") and len(head) >= 8:
+            return "ico", head[6] or 256, head[7] or 256
+        if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis", b"heic", b"heix", b"mif1"):
+            return head[8:12].decode(), None, None
+        text = head[:1024].lstrip().lower()
+        if text.startswith((b"<?xml", b"<svg")) and b"<svg" in text:
+            return "svg", None, None
+    except (struct.error, ValueError):
+        pass
+    return None, None, None
+
+
+class ImageTriage:
+    """
+    키별 이미지 선별기입니다. (스레드 안전)
+    URL별 판정은 프로세스 내 LRU 캐시와 Redis 해시(image_decisions:<key>)에 기록하여 다른 워커와 공유합니다.
+    """
+
+    def __init__(self, key: str, redis_client=None, cache_size: int = IMAGE_DECISION_CACHE_SIZE):
+        self.key = key
+        self.redis_client = redis_client or redis.Redis(
+            host=REDIS_CONFIG["host"],
+            port=REDIS_CONFIG["port"],
+            password=REDIS_CONFIG["password"],
+            db=REDIS_CONFIG["db"],
+            decode_responses=True
+        )
+        self.cache_size = cache_size
+        self.decisions_key = f"image_decisions:{key}"
+        self.hashes_key = f"image_hashes:{key}"
+        self.stats = Counter()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember_local(self, url: str, decision: str) -> None:
+        with self._lock:
+            self._cache[url] = decision
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def local_decision(self, url: str) -> Optional[str]:
+        """프로세스 내 캐시에 기억된 판정을 반환합니다. (Redis 조회 없음)"""
+        with self._lock:
+            decision = self._cache.get(url)
+            if decision is not None:
+                self._cache.move_to_end(url)
+                self.stats["cached"] += 1
+            return decision
+
+    def cached_decision(self, url: str) -> Optional[str]:
+        """URL에 대해 이미 내려진 판정(KEEP 또는 건너뛴 이유)을 반환합니다. 처음 보는 URL이면 None을 반환합니다."""
+        decision = self.local_decision(url)
+        if decision is not None:
+            return decision
+        try:
+            decision = self.redis_client.hget(self.decisions_key, url)
+        except redis.RedisError as e:
+            print(f"이미지 판정 조회 중 오류 발생: {e}")
+            return None
+        if decision is not None:
+            self._remember_local(url, decision)
+            with self._lock:
+                self.stats["cached"] += 1
+        return decision
+
+    def remember(self, url: str, decision: str) -> None:
+        """URL의 판정을 기록합니다."""
+        self._remember_local(url, decision)
+        with self._lock:
+            self.stats[decision] += 1
+        try:
+            self.redis_client.hset(self.decisions_key, url, decision)
+        except redis.RedisError as e:
+            print(f"이미지 판정 기록 중 오류 발생: {e}")
+
+    def check_dimensions(self, width: Optional[int], height: Optional[int]) -> Optional[str]:
+        """폭/높이가 기준보다 작으면 건너뛸 이유를 반환합니다. 크기를 모르면 통과시킵니다."""
+        if (width and width < IMAGE_MIN_WIDTH) or (height and height < IMAGE_MIN_HEIGHT):
+            return "too_small"
+        return None
+
+    def check_length(self, content_length: Optional[str]) -> Optional[str]:
+        """응답 헤더의 Content-Length로 판단합니다."""
+        try:
+            length = int(content_length)
+        except (TypeError, ValueError):
+            return None
+        if length < IMAGE_MIN_BYTES:
+            return "too_few_bytes"
+        if IMAGE_MAX_BYTES and length > IMAGE_MAX_BYTES:
+            return "too_many_bytes"
+        return None
+
+    def check_head(self, head: bytes) -> Optional[str]:
+        """파일 앞부분의 형식과 원본 크기로 판단합니다."""
+        image_format, width, height = sniff_image(head)
+        if image_format is None:
+            return "not_image"
+        if image_format == "ico":
+            return "icon"
+        return self.check_dimensions(width, height)
+
+    def check_body(self, body: bytes) -> Optional[str]:
+        """
+        받은 본문의 크기와 내용 중복 여부로 판단합니다.
+        통과한 본문의 해시는 기록되므로, 저장에 실패하면 release_body로 해제해야 합니다.
+        """
+        if len(body) < IMAGE_MIN_BYTES:
+            return "too_few_bytes"
+        try:
+            if not self.redis_client.sadd(self.hashes_key, hashlib.sha1(body).hexdigest()):
+                return "duplicate"
+        except redis.RedisError as e:
+            print(f"이미지 중복 확인 중 오류 발생: {e}")
+        return None
+
+    def release_body(self, body: bytes) -> None:
+        try:
+            self.redis_client.srem(self.hashes_key, hashlib.sha1(body).hexdigest())
+        except redis.RedisError as e:
+            print(f"이미지 해시 해제 중 오류 발생: {e}")
+
+    def report(self) -> Dict[str, int]:
+        """판정별 이미지 수를 출력합니다."""
+        with self._lock:
+            stats = dict(self.stats)
+            self.stats.clear()
+        if stats:
+            print("이미지 선별 집계: " + ", ".join(f"{name}={count}" for name, count in sorted(stats.items())))
+        return stats
+
+
+_triages: Dict[str, ImageTriage] = {}
+_triages_lock = threading.Lock()
+
+
+def get_image_triage(key: str) -> Optional[ImageTriage]:
+    """키에 해당하는 이미지 선별기를 반환합니다. IMAGE_TRIAGE_ENABLED가 아니면 None을 반환합니다."""
+    if not IMAGE_TRIAGE_ENABLED:
+        return None
+    if key not in _triages:
+        with _triages_lock:
+            if key not in _triages:
+                _triages[key] = ImageTriage(key)
+    return _triages[key]
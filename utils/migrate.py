@@ -0,0 +1,97 @@
+# utils/migrate.py
+# 크롤러 부가 기능이 필요로 하는 스키마 변경을 명시적으로 적용하는 명령입니다.
+#
+#   python -m utils.migrate          적용되지 않은 변경을 순서대로 적용
+#   python -m utils.migrate --check  적용 여부만 출력 (변경 없음)
+#
+# 운영 테이블을 변경하므로(큰 contents 테이블의 ALTER TABLE은 오래 걸릴 수 있음) 점검 시간에 직접 실행합니다.
+# 내보내기(utils/exporter.py), 재분류(utils/recategorize.py), 아카이브 재처리(scraper/page_archive.py)는
+# 스키마를 변경하지 않으며, 필요한 변경이 적용되지 않았으면 이 명령을 안내하고 실패합니다.
+#
+# - export_watermark: contents.loaded_at 열과 인덱스 (내보내기 워터마크, 기존 행은 열을 추가한 시각을 가짐)
+# - contents_tombstones: 재분류/재처리로 지우거나 카테고리를 비운 행을 인덱서에 전달하는 삭제 기록 테이블
+
+import sys
+from typing import Callable, List, Tuple
+from utils.db_manager import get_connection
+
+
+class MigrationRequiredError(Exception):
+    """필요한 스키마 변경이 적용되지 않은 경우 발생하는 예외입니다."""
+
+
+def _has_column(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s", (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def _has_table(cursor, table: str) -> bool:
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", (table,))
+    return cursor.fetchone()[0] > 0
+
+
+# (이름, 적용 여부 확인 함수, 적용할 SQL 목록)
+MIGRATIONS: List[Tuple[str, Callable, List[str]]] = [
+    ("export_watermark", lambda cursor: _has_column(cursor, "contents", "loaded_at"), [
+        "ALTER TABLE contents ADD COLUMN loaded_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)",
+        "CREATE INDEX idx_contents_loaded_at ON contents (loaded_at)",
+    ]),
+    ("contents_tombstones", lambda cursor: _has_table(cursor, "contents_tombstones"), [
+        """
+        CREATE TABLE contents_tombstones (
+            seq BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            content_id BIGINT NOT NULL,
+            log_id BIGINT NULL,
+            deleted_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            KEY idx_contents_tombstones_deleted_at (deleted_at)
+        )
+        """,
+    ]),
+]
+
+
+def pending_migrations(cursor) -> List[str]:
+    """적용되지 않은 스키마 변경의 이름 목록을 반환합니다."""
+    return [name for name, is_applied, _ in MIGRATIONS if not is_applied(cursor)]
+
+
+def require_migrations(cursor, names: List[str]) -> None:
+    """names 중 적용되지 않은 변경이 있으면 MigrationRequiredError를 발생시킵니다."""
+    missing = [name for name in pending_migrations(cursor) if name in names]
+    if missing:
+        raise MigrationRequiredError(
+            f"스키마 변경이 적용되지 않았습니다: {', '.join(missing)} "
+            f"(`python -m utils.migrate`로 먼저 적용하세요)")
+
+
+def migrate(check_only: bool = False) -> List[str]:
+    """적용되지 않은 스키마 변경을 순서대로 적용하고 적용한(check_only이면 적용할) 이름 목록을 반환합니다."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    applied = []
+    try:
+        for name, is_applied, statements in MIGRATIONS:
+            if is_applied(cursor):
+                print(f"적용됨: {name}")
+                continue
+            applied.append(name)
+            if check_only:
+                print(f"적용 필요: {name}")
+                continue
+            print(f"적용 중: {name}")
+            for statement in statements:
+                cursor.execute(statement)
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    return applied
+
+
+if __name__ == "__main__":
+    pending = migrate(check_only="--check" in sys.argv)
+    if "--check" in sys.argv and pending:
+        sys.exit(1)
@@ -0,0 +1,231 @@
+# utils/near_duplicate.py
+# 날짜 위젯, 방문자 수, 페이지 번호 영역 등만 다른 유사 중복 페이지를 SimHash 지문으로 찾아냅니다.
+#
+# - 지문: 본문 영역의 텍스트(스크립트/스타일 제외)를 단어 3개 단위(shingle)로 나누어
+#   64비트 SimHash를 계산합니다. 내용이 조금만 다르면 지문도 몇 비트만 다릅니다.
+#   숫자는 날짜/조회수/방문자 수 위젯으로 보이는 요소(class/id가 NORMALIZED_ELEMENT_REGEX와 일치) 안에서만 0으로 바꿉니다.
+#   본문의 숫자까지 바꾸면 연도나 회차만 다른 공지(올해/작년 공고 등)가 같은 페이지로 판정되기 때문입니다.
+# - 색인: 지문을 (NEAR_DUP_MAX_DISTANCE + 1)개 구간으로 나누어 구간 값별 Redis 집합(simhash:<key>:<구간>:<값>)에
+#   기록합니다. 해밍 거리가 NEAR_DUP_MAX_DISTANCE 이하인 두 지문은 적어도 한 구간이 반드시 같으므로,
+#   구간 집합 몇 개만 조회하여 후보를 찾고 실제 거리를 계산합니다.
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+import redis
+from utils.config import (
+    REDIS_CONFIG,
+    NEAR_DUP_ENABLED,
+    NEAR_DUP_MAX_DISTANCE,
+    NEAR_DUP_MIN_TOKENS,
+    NEAR_DUP_SHINGLE_SIZE,
+)
+
+FINGERPRINT_BITS = 64
+# 텍스트로 취급하지 않는 요소
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+# 닫는 태그가 없는 요소 (숫자 정규화 범위 계산에서 제외)
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# 같은 태그가 다시 열리면 닫는 태그 없이도 닫히는 요소
+IMPLIED_END_TAGS = {"li", "p", "dt", "dd", "tr", "td", "th", "option"}
+# 숫자를 0으로 바꿀 날짜/카운터 요소의 class/id
+NORMALIZED_ELEMENT_REGEX = re.compile(r"date|time|hit|count|cnt|visit|view", re.IGNORECASE)
+DIGITS_REGEX = re.compile(r"\d+")
+TOKEN_REGEX = re.compile(r"\w+")
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+        self._open_tags: List[Tuple[str, bool]] = []  # 열린 요소별 (태그, 날짜/카운터 요소 여부)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        if tag in VOID_TAGS:
+            return
+        if tag in IMPLIED_END_TAGS and self._open_tags and self._open_tags[-1][0] == tag:
+            # 닫는 태그를 생략한 <li>, <p> 등은 같은 태그가 다시 열리면 닫힌 것으로 봄
+            self._open_tags.pop()
+        names = " ".join(value or "" for name, value in attrs if name in ("class", "id"))
+        self._open_tags.append((tag, bool(names) and NORMALIZED_ELEMENT_REGEX.search(names) is not None))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        # 같은 이름의 열린 요소까지 닫음 (그 안에서 닫는 태그를 생략한 요소도 함께 닫힘), 짝이 없는 닫는 태그는 무시
+        for i in range(len(self._open_tags) - 1, -1, -1):
+            if self._open_tags[i][0] == tag:
+                del self._open_tags[i:]
+                break
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if any(normalized for _, normalized in self._open_tags):
+            data = DIGITS_REGEX.sub("0", data)
+        self.parts.append(data)
+
+
+def extract_tokens(html: str) -> List[str]:
+    """HTML에서 텍스트 단어 목록을 추출합니다. 날짜/카운터 요소 안의 숫자만 0으로 바꿉니다."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return TOKEN_REGEX.findall(" ".join(parser.parts).lower())
+
+
+def simhash(tokens: List[str], shingle_size: int = NEAR_DUP_SHINGLE_SIZE) -> int:
+    """단어 목록의 64비트 SimHash 지문을 계산합니다."""
+    if len(tokens) <= shingle_size:
+        shingles = Counter([" ".join(tokens)])
+    else:
+        shingles = Counter(" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def compute_fingerprint(html: str, min_tokens: int = NEAR_DUP_MIN_TOKENS) -> Optional[int]:
+    """본문 HTML의 지문을 반환합니다. 텍스트가 min_tokens보다 적으면 판단하지 않고 None을 반환합니다. (I/O 없음)"""
+    tokens = extract_tokens(html)
+    if len(tokens) < min_tokens:
+        return None
+    return simhash(tokens)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    키별 SimHash 색인입니다. (스레드 안전)
+    저장한 페이지의 지문을 Redis에 기록하여 모든 워커가 같은 색인으로 유사 중복을 판단합니다.
+    """
+
+    def __init__(self, key: str, redis_client=None, max_distance: int = NEAR_DUP_MAX_DISTANCE,
+                 min_tokens: int = NEAR_DUP_MIN_TOKENS):
+        self.key = key
+        self.redis_client = redis_client or redis.Redis(
+            host=REDIS_CONFIG["host"],
+            port=REDIS_CONFIG["port"],
+            password=REDIS_CONFIG["password"],
+            db=REDIS_CONFIG["db"],
+            decode_responses=True
+        )
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self.band_key_prefix = f"simhash:{key}:"
+        self.urls_key = f"simhash_urls:{key}"
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint: int) -> List[str]:
+        keys = []
+        for band in range(self.bands):
+            # 나누어 떨어지지 않는 나머지 비트는 마지막 구간에 포함
+            start = band * self.band_bits
+            end = FINGERPRINT_BITS if band == self.bands - 1 else start + self.band_bits
+            value = fingerprint >> start & ((1 << (end - start)) - 1)
+            keys.append(f"{self.band_key_prefix}{band}:{value:x}")
+        return keys
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def find(self, fingerprint: int, url: str) -> Optional[str]:
+        """지문과 해밍 거리가 NEAR_DUP_MAX_DISTANCE 이하인, 다른 URL로 저장된 페이지의 URL을 반환합니다."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for band_key in self._band_keys(fingerprint):
+            pipe.smembers(band_key)
+        candidates = set()
+        for members in pipe.execute():
+            candidates.update(members)
+
+        best: Optional[Tuple[int, str]] = None
+        for candidate in candidates:
+            distance = hamming_distance(fingerprint, int(candidate, 16))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        if best is None:
+            return None
+        original = self.redis_client.hget(self.urls_key, best[1])
+        return original if original != url else None
+
+    def add(self, fingerprint: int, url: str) -> None:
+        """저장한 페이지의 지문을 색인에 기록합니다."""
+        member = f"{fingerprint:016x}"
+        pipe = self.redis_client.pipeline(transaction=False)
+        for band_key in self._band_keys(fingerprint):
+            pipe.sadd(band_key, member)
+        pipe.hsetnx(self.urls_key, member, url)
+        try:
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"유사 중복 색인 기록 중 오류 발생: {e}")
+
+    def check_fingerprint(self, url: str, fingerprint: Optional[int]) -> Optional[str]:
+        """
+        지문(compute_fingerprint 결과)으로 유사 중복 원본 URL을 찾아 반환합니다.
+        원본이 없으면 None을 반환하며, 페이지를 저장한 뒤 add를 호출해야 합니다. 색인 조회에 실패하면 중복이 아닌 것으로 처리합니다.
+        """
+        if fingerprint is None:
+            self._count("too_short")
+            return None
+        try:
+            original = self.find(fingerprint, url)
+        except redis.RedisError as e:
+            print(f"유사 중복 확인 중 오류 발생: {e}")
+            return None
+        self._count("duplicate" if original else "unique")
+        return original
+
+    def check(self, url: str, html: str) -> Tuple[Optional[int], Optional[str]]:
+        """페이지의 (지문, 유사 중복 원본 URL)을 반환합니다."""
+        fingerprint = compute_fingerprint(html, self.min_tokens)
+        return fingerprint, self.check_fingerprint(url, fingerprint)
+
+    def report(self) -> Dict[str, int]:
+        """판정별 페이지 수를 출력합니다."""
+        with self._lock:
+            stats = dict(self.stats)
+            self.stats.clear()
+        if stats:
+            print("유사 중복 판정 집계: " + ", ".join(f"{name}={count}" for name, count in sorted(stats.items())))
+        return stats
+
+
+_indexes: Dict[str, NearDuplicateIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_near_duplicate_index(key: str) -> Optional[NearDuplicateIndex]:
+    """키에 해당하는 유사 중복 색인을 반환합니다. NEAR_DUP_ENABLED가 아니면 None을 반환합니다."""
+    if not NEAR_DUP_ENABLED:
+        return None
+    if key not in _indexes:
+        with _indexes_lock:
+            if key not in _indexes:
+                _indexes[key] = NearDuplicateIndex(key)
+    return _indexes[key]
@@ -0,0 +1,435 @@
+# utils/outbox.py
+# MySQL 쓰기를 크롤 경로에서 분리하는 로컬 아웃박스(write-behind 로그)와 일괄 적재기입니다.
+#
+# - 크롤러: save_log/save_content 호출이 세그먼트 파일에 한 줄씩 추가되고 fsync된 뒤 바로 반환됩니다.
+#   행 ID는 Redis 시퀀스로 미리 발급하므로 호출자는 기존과 같이 log_id/content_id를 즉시 받습니다.
+# - 적재기: `python -m utils.outbox`로 실행하며, 닫힌 세그먼트를 순서대로 읽어 다중 행 INSERT로 적재합니다.
+#   ID가 고정되어 있어 같은 세그먼트를 다시 적재해도 이미 같은 내용으로 적재된 행은 건너뛰므로 재실행에 안전합니다.
+#   같은 ID에 다른 내용의 행이 있으면(ID 충돌) OutboxConflictError로 적재를 멈춥니다.
+#
+# 세그먼트 파일 상태: <이름>.open (기록 중) -> <이름>.ready (적재 대기) -> 적재 후 삭제
+
+import atexit
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import redis
+from utils.config import (
+    OUTBOX_DIR,
+    OUTBOX_SEGMENT_SIZE,
+    OUTBOX_SEGMENT_MAX_AGE,
+    OUTBOX_FSYNC,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_ID_SAFETY_GAP,
+    MYSQL_ID_COLUMNS,
+    REDIS_CONFIG,
+)
+from utils.db_manager import get_connection
+
+OPEN_SUFFIX = ".open"
+READY_SUFFIX = ".ready"
+# 발급한 ID를 기록해 두는 파일 (MySQL에 접속할 수 없을 때 시퀀스 초기값으로 사용)
+HIGH_WATER_FILE = "id_high_water.json"
+HIGH_WATER_INTERVAL = 1.0  # 기록 주기 (초)
+# 다중 행 INSERT의 행별 SQL 구문 여유분 (바이트)
+ROW_OVERHEAD = 64
+
+
+class OutboxConflictError(Exception):
+    """아웃박스의 행과 ID는 같지만 내용이 다른 행이 이미 DB에 있는 경우 발생하는 예외입니다."""
+
+
+# 외래키 순서: contents.log_id가 scrap_info를 참조하므로 scrap_info를 먼저 적재
+TABLE_ORDER = ["scrap_info", "contents"]
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n".encode("utf-8")
+
+
+def _decode_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """CRC가 맞는 줄만 레코드로 반환합니다. (비정상 종료로 잘린 마지막 줄은 None)"""
+    try:
+        text = line.decode("utf-8").rstrip("\n")
+        crc, payload = text.split(" ", 1)
+        if int(crc, 16) != zlib.crc32(payload.encode("utf-8")):
+            return None
+        return json.loads(payload)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def recover_stale_segments(directory: str = OUTBOX_DIR) -> int:
+    """이 호스트에서 비정상 종료된 프로세스가 남긴 .open 세그먼트를 .ready로 넘깁니다."""
+    if not os.path.isdir(directory):
+        return 0
+    hostname = socket.gethostname()
+    recovered = 0
+    for name in os.listdir(directory):
+        if not name.endswith(OPEN_SUFFIX):
+            continue
+        prefix, pid, _ = name[:-len(OPEN_SUFFIX)].rsplit("_", 2)
+        if prefix.split("_", 1)[1] != hostname or _is_process_alive(int(pid)):
+            continue
+        path = os.path.join(directory, name)
+        os.replace(path, path[:-len(OPEN_SUFFIX)] + READY_SUFFIX)
+        recovered += 1
+    if recovered:
+        print(f"비정상 종료된 아웃박스 세그먼트 {recovered}개를 적재 대상으로 넘겼습니다.")
+    return recovered
+
+
+class Outbox:
+    """
+    프로세스별 세그먼트 파일에 레코드를 추가하는 기록기입니다. (스레드 안전)
+    세그먼트가 OUTBOX_SEGMENT_SIZE를 넘거나 OUTBOX_SEGMENT_MAX_AGE가 지나면 닫고 적재 대상으로 넘깁니다.
+    """
+
+    def __init__(self, directory: str = OUTBOX_DIR, segment_size: int = OUTBOX_SEGMENT_SIZE,
+                 max_age: float = OUTBOX_SEGMENT_MAX_AGE, fsync: bool = OUTBOX_FSYNC):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_age = max_age
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+        recover_stale_segments(directory)
+        threading.Thread(target=self._seal_loop, name="outbox-sealer", daemon=True).start()
+        atexit.register(self.seal)
+
+    def _open_segment(self) -> None:
+        self._sequence += 1
+        name = f"{int(time.time() * 1000):013d}_{socket.gethostname()}_{os.getpid()}_{self._sequence:06d}{OPEN_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "ab")
+        self._opened_at = time.monotonic()
+
+    def _seal_locked(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._path, self._path[:-len(OPEN_SUFFIX)] + READY_SUFFIX)
+        # 이름 변경(적재 대상 전환)이 비정상 종료 후에도 남도록 디렉터리를 fsync
+        _fsync_dir(self.directory)
+        self._file = None
+        self._path = None
+
+    def seal(self) -> None:
+        """현재 세그먼트를 닫고 적재 대상으로 넘깁니다."""
+        with self._lock:
+            self._seal_locked()
+
+    def _seal_loop(self) -> None:
+        while True:
+            time.sleep(max(self.max_age / 2, 0.5))
+            with self._lock:
+                if self._file is not None and time.monotonic() - self._opened_at >= self.max_age:
+                    self._seal_locked()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """레코드를 현재 세그먼트에 추가하고 디스크에 기록될 때까지 기다립니다."""
+        data = _encode_record(record)
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            if self._file.tell() >= self.segment_size:
+                self._seal_locked()
+
+
+class IdAllocator:
+    """
+    Redis 시퀀스(id_seq:<table>)로 행 ID를 미리 발급합니다.
+    시퀀스가 없으면 DB의 최대 ID에 OUTBOX_ID_SAFETY_GAP을 더한 값에서 시작하여,
+    Redis가 초기화되더라도 아직 적재되지 않은 아웃박스의 ID와 겹치지 않도록 합니다.
+    MySQL에 접속할 수 없으면 이 호스트가 마지막으로 발급한 ID(HIGH_WATER_FILE)를 대신 사용하므로,
+    DB 장애 중에도 크롤러를 시작할 수 있습니다. (모든 워커가 같은 시퀀스를 쓰므로 여유분 안에서 안전)
+    """
+
+    def __init__(self, redis_client=None, directory: str = OUTBOX_DIR):
+        self.redis_client = redis_client or redis.Redis(
+            host=REDIS_CONFIG["host"],
+            port=REDIS_CONFIG["port"],
+            password=REDIS_CONFIG["password"],
+            db=REDIS_CONFIG["db"],
+            decode_responses=True
+        )
+        os.makedirs(directory, exist_ok=True)
+        self.high_water_path = os.path.join(directory, HIGH_WATER_FILE)
+        self._high_water = self._load_high_water()
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        atexit.register(self._save_high_water)
+
+    def _load_high_water(self) -> Dict[str, int]:
+        try:
+            with open(self.high_water_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_high_water(self) -> None:
+        with self._lock:
+            data = dict(self._high_water)
+            self._saved_at = time.monotonic()
+        temp_path = f"{self.high_water_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.high_water_path)
+
+    def _initialize(self, table: str) -> None:
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT COALESCE(MAX({MYSQL_ID_COLUMNS[table]}), 0) FROM {table}")
+                max_id = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            max_id = self._high_water.get(table)
+            if max_id is None:
+                raise Exception(f"ID 시퀀스를 초기화할 수 없습니다 ({table}): MySQL 접속 실패, 기록된 발급 ID 없음: {e}")
+            print(f"경고: MySQL에 접속할 수 없어 마지막으로 발급한 ID({max_id})로 {table} 시퀀스를 초기화합니다: {e}")
+        self.redis_client.set(f"id_seq:{table}", int(max_id) + OUTBOX_ID_SAFETY_GAP, nx=True)
+
+    def next_id(self, table: str) -> int:
+        key = f"id_seq:{table}"
+        if not self.redis_client.exists(key):
+            self._initialize(table)
+        row_id = int(self.redis_client.incr(key))
+        with self._lock:
+            self._high_water[table] = max(self._high_water.get(table, 0), row_id)
+            due = time.monotonic() - self._saved_at >= HIGH_WATER_INTERVAL
+        if due:
+            self._save_high_water()
+        return row_id
+
+
+_outbox = None
+_allocator = None
+_init_lock = threading.Lock()
+
+
+def _get_outbox():
+    global _outbox, _allocator
+    if _outbox is None:
+        with _init_lock:
+            if _outbox is None:
+                _allocator = IdAllocator()
+                _outbox = Outbox()
+    return _outbox, _allocator
+
+
+def allocate_id(table: str) -> int:
+    """행을 기록하기 전에 ID만 미리 발급합니다. (파일을 먼저 기록해야 하는 경우)"""
+    _, allocator = _get_outbox()
+    return allocator.next_id(table)
+
+
+def insert(table: str, row: Dict[str, Any], row_id: Optional[int] = None) -> int:
+    """ID를 발급하여(row_id가 주어지면 그 ID로) 행을 아웃박스에 기록하고 ID를 반환합니다."""
+    outbox, allocator = _get_outbox()
+    if row_id is None:
+        row_id = allocator.next_id(table)
+    outbox.append({"op": "insert", "table": table, "row": {MYSQL_ID_COLUMNS[table]: row_id, **row}})
+    return row_id
+
+
+def delete(table: str, row_id: int) -> None:
+    """행 삭제를 아웃박스에 기록합니다."""
+    outbox, _ = _get_outbox()
+    outbox.append({"op": "delete", "table": table, "id": row_id})
+
+
+def read_segment(path: str) -> List[Dict[str, Any]]:
+    """세그먼트 파일의 레코드를 읽습니다. CRC가 맞지 않는 줄은 건너뜁니다."""
+    records = []
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            record = _decode_line(line)
+            if record is None:
+                print(f"경고: 손상된 아웃박스 레코드를 건너뜁니다 ({os.path.basename(path)}:{number})")
+                continue
+            records.append(record)
+    return records
+
+
+def _same_value(stored: Any, value: Any) -> bool:
+    if isinstance(stored, datetime):
+        stored = stored.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(stored, (bytes, bytearray)):
+        stored = stored.decode("utf-8", errors="replace")
+    if stored is None or value is None:
+        return stored is None and value is None
+    return str(stored) == str(value)
+
+
+def _drop_loaded_rows(cursor, table: str, rows: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
+    """
+    이미 DB에 같은 내용으로 있는 행(이전 적재가 커밋된 뒤 세그먼트 삭제 전에 중단된 경우)을 제외한 행을 반환합니다.
+    같은 ID에 다른 내용의 행이 있으면 OutboxConflictError를 발생시킵니다.
+    """
+    id_column = MYSQL_ID_COLUMNS[table]
+    existing: Dict[int, Dict[str, Any]] = {}
+    columns = sorted({column for row in rows for column in row})
+    for start in range(0, len(rows), batch_size):
+        ids = [row[id_column] for row in rows[start:start + batch_size]]
+        cursor.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {id_column} IN ({', '.join(['%s'] * len(ids))})", ids)
+        for values in cursor.fetchall():
+            stored = dict(zip(columns, values))
+            existing[stored[id_column]] = stored
+
+    remaining = []
+    for row in rows:
+        stored = existing.get(row[id_column])
+        if stored is None:
+            remaining.append(row)
+            continue
+        different = [column for column, value in row.items() if not _same_value(stored.get(column), value)]
+        if different:
+            raise OutboxConflictError(
+                f"{table}.{id_column}={row[id_column]}에 다른 내용의 행이 이미 있습니다 (다른 열: {', '.join(different)})")
+    return remaining
+
+
+def _get_max_statement_bytes(cursor) -> int:
+    """한 번에 보낼 INSERT 문의 크기 상한입니다. 이스케이프로 늘어나는 크기를 고려해 max_allowed_packet의 절반을 사용합니다."""
+    cursor.execute("SELECT @@max_allowed_packet")
+    return int(cursor.fetchone()[0]) // 2
+
+
+def _split_by_bytes(rows: List[Dict[str, Any]], max_bytes: int) -> List[List[Dict[str, Any]]]:
+    """행의 대략적인 SQL 크기 합이 max_bytes를 넘지 않도록 나눕니다. (상한보다 큰 행은 단독으로 전송)"""
+    batches = []
+    batch: List[Dict[str, Any]] = []
+    size = 0
+    for row in rows:
+        row_size = ROW_OVERHEAD + sum(len(str(value).encode("utf-8")) + 4 for value in row.values())
+        if batch and size + row_size > max_bytes:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(row)
+        size += row_size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def load_segment(path: str, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    세그먼트 하나를 한 트랜잭션으로 MySQL에 적재하고 적재한 레코드 수를 반환합니다.
+    이미 같은 내용으로 적재된 행은 건너뛰므로 재적재해도 중복되지 않으며, 다중 행 INSERT는
+    max_allowed_packet을 넘지 않도록 크기 기준으로 나눕니다.
+    """
+    records = read_segment(path)
+    inserts: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLE_ORDER}
+    deletes: Dict[str, List[int]] = {table: [] for table in TABLE_ORDER}
+    for record in records:
+        if record["op"] == "insert":
+            inserts[record["table"]].append(record["row"])
+        elif record["op"] == "delete":
+            deletes[record["table"]].append(record["id"])
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        max_bytes = _get_max_statement_bytes(cursor)
+        for table in TABLE_ORDER:
+            rows = _drop_loaded_rows(cursor, table, inserts[table], batch_size) if inserts[table] else []
+            for batch in _split_by_bytes(rows, max_bytes):
+                columns = sorted({column for row in batch for column in row})
+                placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(batch))
+                # 중복 키는 무시하지 않음: 위에서 확인한 뒤 같은 ID가 생겼다면 충돌이므로 적재 실패로 처리
+                sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders}"
+                cursor.execute(sql, [row.get(column) for row in batch for column in columns])
+
+        # 삭제는 삽입 이후에 반영 (같은 세그먼트 안에서 저장 후 보상 삭제된 행 처리)
+        for table in reversed(TABLE_ORDER):
+            ids = deletes[table]
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {MYSQL_ID_COLUMNS[table]} IN ({', '.join(['%s'] * len(batch))})",
+                    batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    os.remove(path)
+    return len(records)
+
+
+def run_loader(directory: str = OUTBOX_DIR, poll_interval: float = 1.0, once: bool = False) -> None:
+    """
+    적재 대기 세그먼트를 생성 순서대로 MySQL에 적재합니다.
+    적재에 실패하면 순서를 지키기 위해 뒤의 세그먼트로 넘어가지 않고 잠시 후 같은 세그먼트부터 재시도합니다.
+    ID 충돌(OutboxConflictError)은 재시도하지 않고 예외를 발생시켜 멈춥니다.
+    """
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        recover_stale_segments(directory)
+        segments = sorted(name for name in os.listdir(directory) if name.endswith(READY_SUFFIX))
+        for name in segments:
+            path = os.path.join(directory, name)
+            try:
+                started = time.monotonic()
+                count = load_segment(path)
+                print(f"아웃박스 적재 완료: {name} ({count}건, {time.monotonic() - started:.2f}초)")
+            except OutboxConflictError as e:
+                # 재시도해도 해결되지 않으므로 적재기를 멈추고 확인을 요구
+                print(f"아웃박스 적재 중단 ({name}): {e}")
+                raise
+            except Exception as e:
+                print(f"아웃박스 적재 중 오류 발생 ({name}): {e}")
+                if once:
+                    raise
+                break
+        else:
+            if once:
+                return
+        time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    run_loader(once="--once" in sys.argv)
@@ -0,0 +1,265 @@
+# utils/profiler.py
+# 운영 중에도 켜둘 수 있는 표본 프로파일링 모드입니다. (PROFILE_EVERY=N)
+#
+# process_page를 N번 호출할 때마다 한 번만 cProfile과 tracemalloc을 켜서 측정하므로,
+# 나머지 호출에는 오버헤드가 없습니다. 분석 프로세스 풀(ANALYSIS_PROCESSES)을 사용하면 process_page는 렌더링과
+# 풀 제출까지만 포함하므로, 저장 스레드의 저장 단계(apply_analysis)를 별도 표본으로 측정합니다.
+# 분석 프로세스 안의 analyze_page는 측정하지 않습니다. 측정 결과는 PROFILE_DIR에 덤프(.prof/.alloc.txt)로 남기고
+# 최근 PROFILE_KEEP개만 유지하며, 누적 결과를 영역별(WebDriver/정규식/JSON/DB/Redis) 요약 보고서로 기록합니다.
+# 여러 워커가 남긴 덤프는 `python -m utils.profiler [PROFILE_DIR]`로 합쳐서 볼 수 있습니다.
+
+import cProfile
+import glob
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from utils.config import (
+    PROFILE_EVERY,
+    PROFILE_DIR,
+    PROFILE_KEEP,
+    PROFILE_TOP_N,
+    PROFILE_TRACEMALLOC,
+    PROFILE_TRACEMALLOC_FRAMES,
+    PROFILE_SUMMARY_INTERVAL,
+)
+
+# 함수가 정의된 파일 경로 또는 이름으로 시간이 쓰인 영역을 구분합니다. (위에서부터 먼저 일치하는 영역)
+CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("webdriver", ("selenium",)),
+    ("db", ("mysql",)),
+    ("redis", ("redis",)),
+    ("http", ("requests/",)),
+    ("regex", ("re.Pattern", "/re/", "sre_", "/re.py")),
+    ("json", ("/json/", "_json")),
+    ("network", ("socket", "ssl", "http/client", "urllib3", "select")),
+]
+# 여러 라이브러리가 함께 쓰는 영역으로, 시간을 호출한 쪽의 영역으로 넘깁니다. (Redis/MySQL의 소켓 대기 등)
+SHARED_CATEGORY = "network"
+# 호출한 쪽을 거슬러 올라가는 최대 깊이
+MAX_CALLER_DEPTH = 8
+
+
+def categorize(filename: str, function: str) -> str:
+    """pstats 항목의 파일 경로/함수 이름으로 영역을 반환합니다."""
+    target = f"{filename} {function}"
+    for name, markers in CATEGORIES:
+        if any(marker in target for marker in markers):
+            return name
+    return "other"
+
+
+def _attribute(stats: pstats.Stats, func: Tuple, seconds: float, by_category: Counter, depth: int = 0) -> None:
+    """
+    함수의 자체 시간을 영역에 더합니다. 공용 영역(소켓 등)이면 호출한 함수들에게
+    그 경로로 쓰인 누적 시간 비율대로 나누어, 처음 만나는 다른 영역에 더합니다.
+    """
+    filename, _, function = func
+    category = categorize(filename, function)
+    callers = stats.stats[func][4] if func in stats.stats else {}
+    weights = {caller: edge[3] for caller, edge in callers.items() if caller in stats.stats}
+    total = sum(weights.values())
+    if category != SHARED_CATEGORY or depth >= MAX_CALLER_DEPTH or not total:
+        by_category[category] += seconds
+        return
+    for caller, weight in weights.items():
+        _attribute(stats, caller, seconds * weight / total, by_category, depth + 1)
+
+
+def summarize_stats(stats: pstats.Stats, top_n: int = PROFILE_TOP_N) -> str:
+    """영역별 자체 시간과 누적 시간 상위 함수를 보고서 문자열로 만듭니다."""
+    by_category = Counter()
+    total = 0.0
+    for func, (_, _, self_time, _, _) in stats.stats.items():
+        _attribute(stats, func, self_time, by_category)
+        total += self_time
+
+    lines = [f"총 CPU 시간: {total:.3f}초"]
+    for name, seconds in by_category.most_common():
+        share = seconds / total * 100 if total else 0
+        lines.append(f"  {name:<10} {seconds:9.3f}초 ({share:5.1f}%)")
+
+    output = io.StringIO()
+    stats.stream = output
+    stats.sort_stats("cumulative").print_stats(top_n)
+    stats.sort_stats("tottime").print_stats(top_n)
+    lines.append(output.getvalue())
+    return "\n".join(lines)
+
+
+def summarize_allocations(allocations: Counter, counts: Counter, top_n: int = PROFILE_TOP_N) -> str:
+    lines = ["메모리 할당 상위 위치 (측정 구간 종료 시점에 남아 있던 크기의 합):"]
+    for location, size in allocations.most_common(top_n):
+        lines.append(f"  {size / 1024:10.1f} KiB  {counts[location]:8d}개  {location}")
+    return "\n".join(lines)
+
+
+class PageProfiler:
+    """
+    every번째 호출마다 함수를 프로파일링합니다. (스레드 안전, 동시에 하나의 호출만 측정)
+    tracemalloc은 측정 구간에만 켜므로, 측정하지 않는 호출의 할당에는 비용이 들지 않습니다.
+    """
+
+    def __init__(self, every: int = PROFILE_EVERY, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP,
+                 top_n: int = PROFILE_TOP_N, trace_allocations: bool = PROFILE_TRACEMALLOC,
+                 summary_interval: int = PROFILE_SUMMARY_INTERVAL):
+        self.every = every
+        self.directory = directory
+        self.keep = keep
+        self.top_n = top_n
+        self.trace_allocations = trace_allocations
+        self.summary_interval = summary_interval
+        self.calls = 0
+        self.samples = 0
+        self.sampled_seconds = 0.0
+        self.peak_memory = 0
+        self._aggregate: Optional[pstats.Stats] = None
+        self._allocations = Counter()
+        self._allocation_counts = Counter()
+        self._label_calls = Counter()
+        self._lock = threading.Lock()
+        self._active = False
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.every > 0
+
+    def _should_sample(self, label: str) -> bool:
+        with self._lock:
+            self.calls += 1
+            # 함수별로 세어, 렌더링과 저장 단계가 번갈아 호출되어도 각각 every번째마다 측정
+            self._label_calls[label] += 1
+            if self._active or self._label_calls[label] % self.every != 0:
+                return False
+            self._active = True
+            return True
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """func를 실행하고, 표본 차례이면 프로파일링하여 결과를 기록합니다."""
+        label = getattr(func, "__name__", "call")
+        if not self.enabled or not self._should_sample(label):
+            return func(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        started_tracemalloc = False
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            started_tracemalloc = True
+
+        started = time.monotonic()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.monotonic() - started
+            snapshot = None
+            peak = 0
+            if started_tracemalloc:
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            try:
+                self._record(label, profile, snapshot, peak, elapsed)
+            except Exception as e:
+                print(f"프로파일 기록 중 오류 발생: {e}")
+            finally:
+                with self._lock:
+                    self._active = False
+
+    def _record(self, label: str, profile: cProfile.Profile, snapshot: Optional[tracemalloc.Snapshot],
+                peak: int, elapsed: float) -> None:
+        self.samples += 1
+        self.sampled_seconds += elapsed
+        self.peak_memory = max(self.peak_memory, peak)
+
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.samples:06d}-{label}"
+        profile.dump_stats(os.path.join(self.directory, f"{name}.prof"))
+
+        stats = pstats.Stats(profile)
+        if self._aggregate is None:
+            self._aggregate = stats
+        else:
+            self._aggregate.add(profile)
+
+        if snapshot is not None:
+            top = snapshot.statistics("lineno")
+            with open(os.path.join(self.directory, f"{name}.alloc.txt"), "w", encoding="utf-8") as f:
+                f.write(f"소요 시간 {elapsed:.3f}초, 최대 추적 메모리 {peak / 1024:.1f} KiB\n")
+                for stat in top[:self.top_n]:
+                    f.write(f"{stat}\n")
+            for stat in top:
+                location = str(stat.traceback[0])
+                self._allocations[location] += stat.size
+                self._allocation_counts[location] += stat.count
+
+        print(f"프로파일 저장: {name} ({elapsed:.2f}초)")
+        self._rotate()
+        if self.samples % self.summary_interval == 0:
+            self.write_summary()
+
+    def _rotate(self) -> None:
+        """최근 keep개의 덤프만 남기고 오래된 덤프를 삭제합니다."""
+        dumps = sorted(glob.glob(os.path.join(self.directory, f"*-{os.getpid()}-*.prof")))
+        for path in dumps[:max(len(dumps) - self.keep, 0)]:
+            for stale in (path, path[:-len(".prof")] + ".alloc.txt"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+    def write_summary(self) -> Optional[str]:
+        """누적된 프로파일의 요약 보고서를 summary-<pid>.txt에 기록하고 경로를 반환합니다."""
+        if self._aggregate is None:
+            return None
+        path = os.path.join(self.directory, f"summary-{os.getpid()}.txt")
+        header = (f"생성 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                  f"표본 {self.samples}개 / 전체 호출 {self.calls}회 (매 {self.every}회마다), "
+                  f"표본 평균 {self.sampled_seconds / self.samples:.3f}초, "
+                  f"최대 추적 메모리 {self.peak_memory / 1024:.1f} KiB\n")
+        body = summarize_stats(self._aggregate, self.top_n)
+        if self._allocations:
+            body += "\n" + summarize_allocations(self._allocations, self._allocation_counts, self.top_n)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(header + "\n" + body + "\n")
+        os.replace(f"{path}.tmp", path)
+        print(f"프로파일 요약 보고서 갱신: {path}")
+        return path
+
+
+_profiler: Optional[PageProfiler] = None
+
+
+def get_profiler() -> PageProfiler:
+    """프로세스 전역 프로파일러를 반환합니다."""
+    global _profiler
+    if _profiler is None:
+        _profiler = PageProfiler()
+    return _profiler
+
+
+def profile_call(func: Callable, *args, **kwargs) -> Any:
+    """프로파일링 모드가 꺼져 있으면 func를 그대로 실행합니다."""
+    if PROFILE_EVERY <= 0:
+        return func(*args, **kwargs)
+    return get_profiler().call(func, *args, **kwargs)
+
+
+def report_directory(directory: str = PROFILE_DIR, top_n: int = PROFILE_TOP_N) -> str:
+    """디렉토리의 모든 덤프(여러 워커)를 합친 요약 보고서를 반환합니다."""
+    dumps = sorted(glob.glob(os.path.join(directory, "*.prof")))
+    if not dumps:
+        return f"{directory}에 프로파일 덤프가 없습니다."
+    stats = pstats.Stats(dumps[0])
+    for path in dumps[1:]:
+        stats.add(path)
+    return f"프로파일 덤프 {len(dumps)}개\n" + summarize_stats(stats, top_n)
+
+
+if __name__ == "__main__":
+    print(report_directory(sys.argv[1] if len(sys.argv) > 1 else PROFILE_DIR))
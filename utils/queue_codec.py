@@ -0,0 +1,137 @@
+# utils/queue_codec.py
+# Redis 큐 항목의 압축 인코딩입니다.
+#
+# 기존 항목은 {"type": ..., "url": ..., "parent": ..., "identifier": <outerHTML>} 형태의 JSON이어서
+# 모든 항목이 부모 URL 전체와 요소 HTML을 반복해 저장했습니다. 압축 형식(버전 1)은
+#   "\x01" + 유형코드 + "\x1f" + URL + "\x1f" + 부모ID + "\x1f" + 식별자 해시 + "\x1f" + 나머지 필드(JSON)
+# 로 저장하며, 부모 URL은 키별 ID 테이블(parent_ids:<key>/parent_urls:<key>)로 한 번만 저장하고
+# 식별자(outerHTML)는 짧은 해시로 대체합니다. 첫 글자로 형식을 구분하므로 기존 JSON 항목도 그대로 읽습니다.
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from utils.config import QUEUE_ENCODING
+
+VERSION_1 = "\x01"
+SEPARATOR = "\x1f"
+TYPE_CODES = {"page": "p", "link": "l", "event": "e"}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+IDENTIFIER_HASH_PREFIX = "sha1:"
+IDENTIFIER_HASH_LENGTH = 16
+# 압축 형식에서 별도 칸으로 저장하는 필드 (나머지는 JSON으로 저장)
+ENCODED_FIELDS = ("type", "url", "parent", "identifier", "onClick")
+
+# 부모 URL의 ID를 조회하고, 없으면 새로 발급합니다. (여러 워커가 동시에 호출해도 같은 ID를 받음)
+# KEYS[1]: URL -> ID 해시, KEYS[2]: ID -> URL 해시, KEYS[3]: ID 시퀀스
+INTERN_SCRIPT = """
+local id = redis.call('HGET', KEYS[1], ARGV[1])
+if id then
+    return id
+end
+id = redis.call('INCR', KEYS[3])
+redis.call('HSET', KEYS[1], ARGV[1], id)
+redis.call('HSET', KEYS[2], id, ARGV[1])
+return id
+"""
+
+
+def get_intern_keys(key: str):
+    """부모 URL ID 테이블의 (URL -> ID, ID -> URL, 시퀀스) 키를 반환합니다."""
+    return f"parent_ids:{key}", f"parent_urls:{key}", f"parent_seq:{key}"
+
+
+def hash_identifier(identifier: str) -> str:
+    """요소 식별자(outerHTML)를 짧은 해시로 바꿉니다. 이미 해시이면 그대로 반환합니다."""
+    if identifier.startswith(IDENTIFIER_HASH_PREFIX):
+        return identifier
+    digest = hashlib.sha1(identifier.encode("utf-8")).hexdigest()[:IDENTIFIER_HASH_LENGTH]
+    return f"{IDENTIFIER_HASH_PREFIX}{digest}"
+
+
+def is_compact_encodable(item: Dict[str, Any]) -> bool:
+    """압축 형식으로 표현할 수 있는 항목인지 판단합니다. (알 수 없는 유형이나 구분자를 포함한 값은 JSON으로 저장)"""
+    if QUEUE_ENCODING != "compact" or item.get("type") not in TYPE_CODES:
+        return False
+    return all(SEPARATOR not in (item.get(field) or "") for field in ("url", "parent"))
+
+
+def encode_item(item: Dict[str, Any], parent_id: Optional[int] = None) -> str:
+    """
+    큐 항목을 문자열로 인코딩합니다.
+    압축 형식으로 표현할 수 있으면 parent_id(부모 URL의 ID)를 사용하고, 아니면 기존 JSON으로 인코딩합니다.
+    """
+    if not is_compact_encodable(item):
+        return json.dumps(item)
+
+    url = item.get("url") or ""
+    extra = {k: v for k, v in item.items() if k not in ENCODED_FIELDS}
+    if item.get("onClick") is not None and item["onClick"] != url:
+        extra["onClick"] = item["onClick"]
+    identifier = item.get("identifier")
+    return SEPARATOR.join([
+        f"{VERSION_1}{TYPE_CODES[item['type']]}",
+        url,
+        str(parent_id) if parent_id is not None else "",
+        hash_identifier(identifier) if identifier else "",
+        json.dumps(extra, separators=(",", ":")) if extra else "",
+    ])
+
+
+def decode_item(raw: str, resolve_parent: Callable[[int], Optional[str]]) -> Dict[str, Any]:
+    """인코딩된 항목을 딕셔너리로 되돌립니다. 기존 JSON 항목도 읽을 수 있습니다."""
+    if raw.startswith(VERSION_1):
+        type_code, url, parent_id, identifier, extra = raw[1:].split(SEPARATOR, 4)
+        item: Dict[str, Any] = {"type": TYPE_NAMES[type_code], "url": url}
+        if type_code == TYPE_CODES["event"]:
+            item["onClick"] = url
+        if extra:
+            item.update(json.loads(extra))
+        if identifier:
+            item["identifier"] = identifier
+        if parent_id:
+            item["parent"] = resolve_parent(int(parent_id)) or ""
+        return item
+    return json.loads(raw)
+
+
+def peek_parent_id(raw: str) -> Optional[int]:
+    """인코딩된 항목의 부모 URL ID를 반환합니다. (비동기 조회를 먼저 하기 위해 사용)"""
+    if raw.startswith(VERSION_1):
+        parent_id = raw.split(SEPARATOR, 3)[2]
+        return int(parent_id) if parent_id else None
+    return None
+
+
+def peek_url(raw: str) -> Optional[str]:
+    """부모 URL 조회 없이 인코딩된 항목의 URL만 꺼냅니다."""
+    if raw.startswith(VERSION_1):
+        return raw.split(SEPARATOR, 2)[1]
+    return json.loads(raw).get("url")
+
+
+class InternCache:
+    """
+    부모 URL <-> ID 매핑의 프로세스 내 캐시입니다. (스레드 안전)
+    한 페이지의 링크들은 같은 부모를 가지므로 대부분의 조회가 Redis 왕복 없이 끝납니다.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._ids: Dict[str, int] = {}
+        self._urls: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get_id(self, url: str) -> Optional[int]:
+        return self._ids.get(url)
+
+    def get_url(self, parent_id: int) -> Optional[str]:
+        return self._urls.get(parent_id)
+
+    def put(self, url: str, parent_id: int) -> None:
+        with self._lock:
+            if len(self._ids) >= self.max_size:
+                self._ids.clear()
+                self._urls.clear()
+            self._ids[url] = parent_id
+            self._urls[parent_id] = url
@@ -1,28 +1,115 @@
+import abc
 import json
 import redis
-from typing import Dict, Any, Optional
+import redis.asyncio as aioredis
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 import time
 from redis.exceptions import ConnectionError, RedisError
 from utils.config import REDIS_CONFIG
+from utils.frontier_spill import FrontierSpill, is_spill_enabled
+from utils.queue_codec import (
+    INTERN_SCRIPT,
+    InternCache,
+    decode_item,
+    encode_item,
+    get_intern_keys,
+    is_compact_encodable,
+    peek_parent_id,
+)
 
 load_dotenv()
 
-class RedisQueueManager:
-    def __init__(self, max_retries=3, retry_delay=1):
-        self.redis_client = redis.Redis(
-            host=REDIS_CONFIG["host"],
-            port=REDIS_CONFIG["port"],
-            password=REDIS_CONFIG["password"],
-            db=REDIS_CONFIG["db"],
-            decode_responses=True
-        )
+# 큐에서 항목을 꺼내 워커의 처리 중 목록으로 옮기는 스크립트
+# 꺼낸 항목이 항상 큐 또는 처리 중 목록 중 하나에 존재하므로 종료 판정에 빈틈이 생기지 않습니다.
+CLAIM_SCRIPT = """
+local raw = redis.call('LPOP', KEYS[1])
+if raw then
+    redis.call('RPUSH', KEYS[2], raw)
+end
+return raw
+"""
+
+
+def _redis_options() -> Dict[str, Any]:
+    """동기/비동기 Redis 클라이언트 생성 옵션을 반환합니다."""
+    return dict(
+        host=REDIS_CONFIG["host"],
+        port=REDIS_CONFIG["port"],
+        password=REDIS_CONFIG["password"],
+        db=REDIS_CONFIG["db"],
+        decode_responses=True
+    )
+
+
+class _QueueKeys(abc.ABC):
+    """
+    RedisQueueManager와 AsyncRedisQueueManager가 공유하는 키 구조, 부모 URL ID 캐시, 스필 프런티어입니다.
+    두 매니저는 Redis 호출 방식(동기/비동기)만 다르고 같은 키와 인코딩을 사용하므로 같은 큐를 공유할 수 있습니다.
+    """
+
+    def __init__(self, max_retries: int, retry_delay: float):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.queue_key_prefix = "url_queue:"  # 큐 키 접두사
         self.processing_key_prefix = "processing_urls:"  # 처리 중인 URL 키 접두사
         self.visited_key_prefix = "visited_urls:"  # 방문한 URL 키 접두사
+        self.inflight_key_prefix = "inflight_items:"  # 워커별로 꺼내 처리 중인 항목 키 접두사
+        self.intern_caches: Dict[str, InternCache] = {}  # 키별 부모 URL ID 캐시
+        self.spills: Dict[str, FrontierSpill] = {}  # 키별 디스크 스필 프런티어 (FRONTIER_SPILL_ENABLED)
+
+    def _get_queue_key(self, key: str) -> str:
+        """키에 해당하는 큐 키를 반환합니다."""
+        return f"{self.queue_key_prefix}{key}"
+
+    def _get_processing_key(self, key: str) -> str:
+        """키에 해당하는 처리 중인 URL 키를 반환합니다."""
+        return f"{self.processing_key_prefix}{key}"
+
+    def _get_visited_key(self, key: str) -> str:
+        """키에 해당하는 방문한 URL 키를 반환합니다."""
+        return f"{self.visited_key_prefix}{key}"
+
+    def _get_inflight_key(self, key: str, worker_id: str) -> str:
+        """워커가 꺼내 처리 중인 항목 목록 키를 반환합니다."""
+        return f"{self.inflight_key_prefix}{key}:{worker_id}"
+
+    def _get_intern_cache(self, key: str) -> InternCache:
+        if key not in self.intern_caches:
+            self.intern_caches[key] = InternCache()
+        return self.intern_caches[key]
+
+    @staticmethod
+    def _parent_to_intern(item: Dict[str, Any]) -> Optional[str]:
+        """압축 형식으로 인코딩할 때 ID로 바꿔야 하는 부모 URL을 반환합니다. (JSON으로 인코딩하면 None)"""
+        return item.get("parent") if is_compact_encodable(item) else None
+
+    @staticmethod
+    def _encode_with_parent_id(item: Dict[str, Any], parent_id: Optional[int]) -> str:
+        """부모 URL ID를 구한 항목을 Redis에 저장할 문자열로 인코딩합니다."""
+        if not is_compact_encodable(item):
+            return json.dumps(item)
+        return encode_item(item, parent_id)
+
+    @abc.abstractmethod
+    def _spill_redis_client(self):
+        """스필 프런티어가 사용할 동기 Redis 클라이언트를 반환합니다."""
+
+    def _get_spill(self, key: str) -> Optional[FrontierSpill]:
+        """키의 디스크 스필 프런티어를 반환합니다. 스필을 사용하지 않으면 None을 반환합니다."""
+        if not is_spill_enabled():
+            return None
+        if key not in self.spills:
+            self.spills[key] = FrontierSpill(key, self._spill_redis_client(), self._get_queue_key(key))
+        return self.spills[key]
+
+
+class RedisQueueManager(_QueueKeys):
+    def __init__(self, max_retries=3, retry_delay=1):
+        super().__init__(max_retries, retry_delay)
+        self.redis_client = redis.Redis(**_redis_options())
         self.temp_file = "temp_state"
         self.load_lock_key = "redis_load_lock"
         self.load_lock_timeout = 60 # 초 단위 락 타임아웃
@@ -56,37 +143,106 @@ class RedisQueueManager:
                 time.sleep(self.retry_delay)
                 self._connect()  # 재연결 시도
 
-    def _get_queue_key(self, key: str) -> str:
-        """키에 해당하는 큐 키를 반환합니다."""
-        return f"{self.queue_key_prefix}{key}"
-
-    def _get_processing_key(self, key: str) -> str:
-        """키에 해당하는 처리 중인 URL 키를 반환합니다."""
-        return f"{self.processing_key_prefix}{key}"
-
-    def _get_visited_key(self, key: str) -> str:
-        """키에 해당하는 방문한 URL 키를 반환합니다."""
-        return f"{self.visited_key_prefix}{key}"
+    def _intern_parent(self, parent: Optional[str], key: str) -> Optional[int]:
+        """부모 URL의 ID를 반환합니다. 처음 보는 URL이면 ID 테이블에 등록합니다."""
+        if not parent:
+            return None
+        cache = self._get_intern_cache(key)
+        parent_id = cache.get_id(parent)
+        if parent_id is None:
+            parent_id = int(self.redis_client.eval(INTERN_SCRIPT, 3, *get_intern_keys(key), parent))
+            cache.put(parent, parent_id)
+        return parent_id
+
+    def _resolve_parent(self, parent_id: int, key: str) -> Optional[str]:
+        """ID에 해당하는 부모 URL을 반환합니다."""
+        cache = self._get_intern_cache(key)
+        parent = cache.get_url(parent_id)
+        if parent is None:
+            parent = self.redis_client.hget(get_intern_keys(key)[1], parent_id)
+            if parent is not None:
+                cache.put(parent, parent_id)
+        return parent
+
+    def encode(self, item: Dict[str, Any], key: str) -> str:
+        """큐 항목을 Redis에 저장할 문자열로 인코딩합니다."""
+        return self._encode_with_parent_id(item, self._intern_parent(self._parent_to_intern(item), key))
+
+    def decode(self, raw: str, key: str) -> Dict[str, Any]:
+        """Redis에 저장된 문자열을 큐 항목으로 디코딩합니다. (압축 형식과 기존 JSON 모두 지원)"""
+        return decode_item(raw, lambda parent_id: self._resolve_parent(parent_id, key))
+
+    def _spill_redis_client(self):
+        return self.redis_client
+
+    def flush_spill(self, key: str) -> None:
+        """열려 있는 세그먼트를 닫고 등록합니다. 워커 종료 전에 호출합니다."""
+        spill = self.spills.get(key)
+        if spill is not None:
+            self._execute_with_retry(spill.flush)
+
+    def adopt_spill_segments(self, key: str, host: str, pid: int) -> int:
+        """응답 없는 워커의 열린 세그먼트를 닫아 등록하고 항목 수를 반환합니다."""
+        spill = self._get_spill(key)
+        if spill is None:
+            return 0
+        return self._execute_with_retry(lambda: spill.adopt(host, pid))
 
     def push(self, item: Dict[str, Any], key: str) -> None:
-        """특정 키의 큐에 새로운 항목을 추가합니다."""
+        """특정 키의 큐에 새로운 항목을 추가합니다. 큐가 FRONTIER_HIGH_WATERMARK를 넘으면 디스크에 기록합니다."""
+        raw = self._execute_with_retry(lambda: self.encode(item, key))
+        spill = self._get_spill(key)
+        if spill is not None and self._execute_with_retry(lambda: spill.spill([raw])):
+            return
+
         def _push():
-            self.redis_client.rpush(self._get_queue_key(key), json.dumps(item))
-        self._execute_with_retry(_push)
+            return self.redis_client.rpush(self._get_queue_key(key), raw)
+        length = self._execute_with_retry(_push)
+        if spill is not None:
+            spill.observe_length(length)
 
     def pop(self, key: str) -> Optional[Dict[str, Any]]:
         """특정 키의 큐에서 항목을 가져옵니다."""
         def _pop():
             item = self.redis_client.lpop(self._get_queue_key(key))
-            return json.loads(item) if item else None
+            return self.decode(item, key) if item else None
         return self._execute_with_retry(_pop)
 
+    def claim(self, key: str, worker_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        큐에서 항목을 꺼내는 동시에 워커의 처리 중 목록에 기록합니다. (Lua 스크립트로 원자적으로 실행)
+        항목과 원본 문자열을 반환하며, 처리가 끝나면 release로 목록에서 제거해야 합니다.
+        """
+        spill = self._get_spill(key)
+        if spill is not None:
+            self._execute_with_retry(spill.refill)
+
+        def _claim():
+            raw = self.redis_client.eval(CLAIM_SCRIPT, 2, self._get_queue_key(key), self._get_inflight_key(key, worker_id))
+            return (self.decode(raw, key), raw) if raw else None
+        return self._execute_with_retry(_claim)
+
+    def release(self, raw: str, key: str, worker_id: str) -> None:
+        """claim으로 꺼낸 항목을 워커의 처리 중 목록에서 제거합니다."""
+        def _release():
+            self.redis_client.lrem(self._get_inflight_key(key, worker_id), 1, raw)
+        self._execute_with_retry(_release)
+        spill = self.spills.get(key)
+        if spill is not None:
+            self._execute_with_retry(spill.flush_if_idle)
+
     def mark_as_processing(self, url: str, key: str) -> None:
         """URL을 특정 키의 처리 중인 상태로 표시합니다."""
         def _mark():
             self.redis_client.sadd(self._get_processing_key(key), url)
         self._execute_with_retry(_mark)
 
+    def clear_processing(self, url: str, key: str) -> None:
+        """URL의 처리 중 상태를 방문 완료로 표시하지 않고 해제합니다. (다시 큐에 넣어 처리할 때 사용)"""
+        def _clear():
+            self.redis_client.srem(self._get_processing_key(key), url)
+        self._execute_with_retry(_clear)
+
     def mark_as_visited(self, url: str, key: str) -> None:
         """URL을 특정 키의 방문 완료 상태로 표시합니다."""
         def _mark():
@@ -133,7 +289,7 @@ class RedisQueueManager:
         """특정 키의 현재 Redis 상태를 임시 파일로 저장합니다."""
         try:
             state = {
-                "queue": [json.loads(item) for item in self.redis_client.lrange(self._get_queue_key(key), 0, -1)],
+                "queue": [self.decode(item, key) for item in self.redis_client.lrange(self._get_queue_key(key), 0, -1)],
                 "processing": list(self.redis_client.smembers(self._get_processing_key(key))),
                 "visited": list(self.redis_client.smembers(self._get_visited_key(key)))
             }
@@ -159,7 +315,7 @@ class RedisQueueManager:
 
             # 큐 데이터 복원
             if state.get("queue"):
-                self.redis_client.rpush(self._get_queue_key(key), *[json.dumps(item) for item in state["queue"]])
+                self.redis_client.rpush(self._get_queue_key(key), *[self.encode(item, key) for item in state["queue"]])
 
             # 처리 중인 URL 복원
             if state.get("processing"):
@@ -308,4 +464,169 @@ class RedisQueueManager:
                  print(f"임시 파일 {self.temp_file}를 삭제했습니다.")
 
         except Exception as e:
-            print(f"스크래퍼 상태 정리 중 오류 발생: {e}") 
\ No newline at end of file
+            print(f"스크래퍼 상태 정리 중 오류 발생: {e}")
+
+
+class AsyncRedisQueueManager(_QueueKeys):
+    """
+    asyncio 크롤 엔진용 Redis 큐 매니저입니다.
+    RedisQueueManager와 동일한 키 구조를 사용하므로 동기/비동기 스크래퍼가 같은 큐를 공유할 수 있습니다.
+    """
+
+    def __init__(self, max_retries=3, retry_delay=1):
+        super().__init__(max_retries, retry_delay)
+        self.redis_client = aioredis.Redis(**_redis_options())
+        self.spill_redis_client = None  # 스필 프런티어용 동기 클라이언트 (스필 사용 시 생성)
+
+    async def _execute_with_retry(self, operation):
+        """Redis 작업을 재시도 로직과 함께 실행합니다."""
+        retries = 0
+        while True:
+            try:
+                return await operation()
+            except (ConnectionError, RedisError) as e:
+                retries += 1
+                if retries == self.max_retries:
+                    raise Exception(f"Redis 작업 실패: {str(e)}")
+                print(f"Redis 작업 재시도 {retries}/{self.max_retries}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _intern_parent(self, parent: Optional[str], key: str) -> Optional[int]:
+        if not parent:
+            return None
+        cache = self._get_intern_cache(key)
+        parent_id = cache.get_id(parent)
+        if parent_id is None:
+            parent_id = int(await self.redis_client.eval(INTERN_SCRIPT, 3, *get_intern_keys(key), parent))
+            cache.put(parent, parent_id)
+        return parent_id
+
+    async def _resolve_parent(self, parent_id: Optional[int], key: str) -> Optional[str]:
+        if parent_id is None:
+            return None
+        cache = self._get_intern_cache(key)
+        parent = cache.get_url(parent_id)
+        if parent is None:
+            parent = await self.redis_client.hget(get_intern_keys(key)[1], parent_id)
+            if parent is not None:
+                cache.put(parent, parent_id)
+        return parent
+
+    async def encode(self, item: Dict[str, Any], key: str) -> str:
+        """큐 항목을 Redis에 저장할 문자열로 인코딩합니다."""
+        return self._encode_with_parent_id(item, await self._intern_parent(self._parent_to_intern(item), key))
+
+    async def decode(self, raw: str, key: str) -> Dict[str, Any]:
+        """Redis에 저장된 문자열을 큐 항목으로 디코딩합니다. (압축 형식과 기존 JSON 모두 지원)"""
+        parent = await self._resolve_parent(peek_parent_id(raw), key)
+        return decode_item(raw, lambda parent_id: parent)
+
+    def _spill_redis_client(self):
+        """스필 프런티어는 세그먼트 I/O가 있어 _run_spill로 스레드 풀에서 호출하므로 동기 클라이언트를 사용합니다."""
+        if self.spill_redis_client is None:
+            self.spill_redis_client = redis.Redis(**_redis_options())
+        return self.spill_redis_client
+
+    async def _run_spill(self, func):
+        """동기 스필 작업을 재시도 로직과 함께 스레드 풀에서 실행합니다."""
+        loop = asyncio.get_running_loop()
+        return await self._execute_with_retry(lambda: loop.run_in_executor(None, func))
+
+    async def flush_spill(self, key: str) -> None:
+        """열려 있는 세그먼트를 닫고 등록합니다. 워커 종료 전에 호출합니다."""
+        spill = self.spills.get(key)
+        if spill is not None:
+            await self._run_spill(spill.flush)
+
+    async def _spill_or_push(self, encoded: List[str], key: str) -> None:
+        """인코딩된 항목을 큐에 추가하거나, 디스크에 기록 중이면 세그먼트에 추가합니다."""
+        spill = self._get_spill(key)
+        if spill is not None and await self._run_spill(lambda: spill.spill(encoded)):
+            return
+
+        length = await self._execute_with_retry(
+            lambda: self.redis_client.rpush(self._get_queue_key(key), *encoded))
+        if spill is not None:
+            spill.observe_length(length)
+
+    async def push(self, item: Dict[str, Any], key: str) -> None:
+        """특정 키의 큐에 새로운 항목을 추가합니다. 큐가 FRONTIER_HIGH_WATERMARK를 넘으면 디스크에 기록합니다."""
+        encoded = [await self._execute_with_retry(lambda: self.encode(item, key))]
+        await self._spill_or_push(encoded, key)
+
+    async def push_many(self, items: List[Dict[str, Any]], key: str) -> None:
+        """여러 항목을 한 번의 왕복으로 큐에 추가합니다. (같은 부모 URL은 한 번만 조회)"""
+        if not items:
+            return
+        async def _encode_all():
+            return [await self.encode(item, key) for item in items]
+        await self._spill_or_push(await self._execute_with_retry(_encode_all), key)
+
+    async def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        """특정 키의 큐에서 항목을 가져옵니다."""
+        async def _pop():
+            item = await self.redis_client.lpop(self._get_queue_key(key))
+            return await self.decode(item, key) if item else None
+        return await self._execute_with_retry(_pop)
+
+    async def claim(self, key: str, worker_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """큐에서 항목을 꺼내는 동시에 워커의 처리 중 목록에 기록합니다."""
+        spill = self._get_spill(key)
+        if spill is not None:
+            await self._run_spill(spill.refill)
+
+        async def _claim():
+            raw = await self.redis_client.eval(CLAIM_SCRIPT, 2, self._get_queue_key(key), self._get_inflight_key(key, worker_id))
+            return (await self.decode(raw, key), raw) if raw else None
+        return await self._execute_with_retry(_claim)
+
+    async def release(self, raw: str, key: str, worker_id: str) -> None:
+        """claim으로 꺼낸 항목을 워커의 처리 중 목록에서 제거합니다."""
+        await self._execute_with_retry(
+            lambda: self.redis_client.lrem(self._get_inflight_key(key, worker_id), 1, raw))
+        spill = self.spills.get(key)
+        if spill is not None:
+            await self._run_spill(spill.flush_if_idle)
+
+    async def mark_as_processing(self, url: str, key: str) -> None:
+        """URL을 특정 키의 처리 중인 상태로 표시합니다."""
+        await self._execute_with_retry(
+            lambda: self.redis_client.sadd(self._get_processing_key(key), url))
+
+    async def mark_as_visited(self, url: str, key: str) -> None:
+        """URL을 특정 키의 방문 완료 상태로 표시합니다."""
+        async def _mark():
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.sadd(self._get_visited_key(key), url)
+                pipe.srem(self._get_processing_key(key), url)
+                await pipe.execute()
+        await self._execute_with_retry(_mark)
+
+    async def is_visited(self, url: str, key: str) -> bool:
+        """URL이 특정 키에서 이미 방문되었는지 확인합니다."""
+        return bool(await self._execute_with_retry(
+            lambda: self.redis_client.sismember(self._get_visited_key(key), url)))
+
+    async def filter_unvisited(self, urls: List[str], key: str) -> List[str]:
+        """방문하지 않은 URL만 한 번의 왕복으로 걸러 반환합니다."""
+        if not urls:
+            return []
+        flags = await self._execute_with_retry(
+            lambda: self.redis_client.smismember(self._get_visited_key(key), urls))
+        return [url for url, visited in zip(urls, flags) if not visited]
+
+    async def is_processing(self, url: str, key: str) -> bool:
+        """URL이 특정 키에서 현재 처리 중인지 확인합니다."""
+        return bool(await self._execute_with_retry(
+            lambda: self.redis_client.sismember(self._get_processing_key(key), url)))
+
+    async def get_queue_length(self, key: str) -> int:
+        """특정 키의 현재 큐 길이를 반환합니다."""
+        return await self._execute_with_retry(
+            lambda: self.redis_client.llen(self._get_queue_key(key)))
+
+    async def close(self) -> None:
+        """Redis 연결을 닫습니다."""
+        await self.redis_client.aclose()
+        if self.spill_redis_client is not None:
+            self.spill_redis_client.close()
@@ -0,0 +1,189 @@
+# utils/rate_limiter.py
+# 모든 워커가 공유하는 호스트별 적응형 요청 속도 제한기입니다.
+# Redis에 호스트마다 토큰 버킷을 두고, 응답 지연과 오류/429 응답에 따라 허용 속도를 AIMD 방식으로 조절합니다.
+# (정상 응답이면 조금씩 늘리고, 과부하 신호가 오면 절반으로 줄임)
+
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+import redis
+from utils.config import (
+    REDIS_CONFIG,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_INITIAL_RATE,
+    RATE_LIMIT_MIN_RATE,
+    RATE_LIMIT_MAX_RATE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_INCREASE,
+    RATE_LIMIT_DECREASE,
+    RATE_LIMIT_LATENCY_TARGET,
+    RATE_LIMIT_DECREASE_COOLDOWN,
+)
+
+# 토큰 하나를 요청합니다. 바로 사용할 수 있으면 0, 아니면 기다려야 할 시간(초)을 반환합니다.
+# 시간은 Redis 서버 시계를 사용하므로 워커 간 시계 차이의 영향을 받지 않습니다.
+# KEYS[1]: 버킷 키, ARGV: 초기 속도, 버킷 크기
+ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate', 'blocked_until')
+local rate = tonumber(b[3]) or tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local blocked_until = tonumber(b[4]) or 0
+if blocked_until > now then
+    return tostring(blocked_until - now)
+end
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now), 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], 86400)
+return tostring(wait)
+"""
+
+# 요청 결과를 반영하여 허용 속도를 조절하고 새 속도를 반환합니다.
+# KEYS[1]: 버킷 키
+# ARGV: 결과(ok/backoff), 초기 속도, 최소 속도, 최대 속도, 가산 증가량, 감소 비율, 감소 간격, Retry-After(초)
+FEEDBACK_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'rate', 'last_decrease')
+local rate = tonumber(b[1]) or tonumber(ARGV[2])
+local last_decrease = tonumber(b[2]) or 0
+if ARGV[1] == 'ok' then
+    rate = math.min(tonumber(ARGV[4]), rate + tonumber(ARGV[5]) / rate)
+elseif now - last_decrease >= tonumber(ARGV[7]) then
+    rate = math.max(tonumber(ARGV[3]), rate * tonumber(ARGV[6]))
+    redis.call('HSET', KEYS[1], 'last_decrease', tostring(now))
+end
+local retry_after = tonumber(ARGV[8]) or 0
+if retry_after > 0 then
+    redis.call('HSET', KEYS[1], 'blocked_until', tostring(now + retry_after))
+end
+redis.call('HSET', KEYS[1], 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], 86400)
+return tostring(rate)
+"""
+
+# 과부하 신호로 간주하는 HTTP 상태 코드
+BACKOFF_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    호스트별 토큰 버킷을 Redis에 두고 모든 워커가 함께 사용하는 속도 제한기입니다.
+    페이지 로딩, HEAD 요청, 파일/이미지 다운로드 전에 acquire를 호출하고, 응답을 받은 뒤 record로 결과를 알려야 합니다.
+    """
+
+    def __init__(self, redis_client=None, key_prefix: str = "rate_limit:"):
+        self.redis_client = redis_client or redis.Redis(
+            host=REDIS_CONFIG["host"],
+            port=REDIS_CONFIG["port"],
+            password=REDIS_CONFIG["password"],
+            db=REDIS_CONFIG["db"],
+            decode_responses=True
+        )
+        self.key_prefix = key_prefix
+        self._acquire = self.redis_client.register_script(ACQUIRE_SCRIPT)
+        self._feedback = self.redis_client.register_script(FEEDBACK_SCRIPT)
+
+    def _get_bucket_key(self, url: str) -> str:
+        return f"{self.key_prefix}{urlparse(url).netloc.lower()}"
+
+    def reserve(self, url: str) -> float:
+        """토큰을 요청하고, 얻었으면 0을, 아니면 다시 시도하기 전 기다릴 시간(초)을 반환합니다."""
+        return float(self._acquire(keys=[self._get_bucket_key(url)],
+                                   args=[RATE_LIMIT_INITIAL_RATE, RATE_LIMIT_BURST]))
+
+    def acquire(self, url: str) -> None:
+        """해당 호스트의 토큰을 얻을 때까지 대기합니다."""
+        while True:
+            wait = self.reserve(url)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def record(self, url: str, latency: float, status: Optional[int] = None,
+               error: bool = False, retry_after: Optional[str] = None) -> float:
+        """
+        요청 결과를 반영하여 호스트의 허용 속도를 조절하고 새 속도를 반환합니다.
+        오류, 과부하 상태 코드, 목표보다 긴 지연은 속도를 줄이고, 그 외에는 속도를 조금씩 늘립니다.
+        """
+        backoff = error or status in BACKOFF_STATUS_CODES or latency > RATE_LIMIT_LATENCY_TARGET
+        retry_seconds = 0
+        if retry_after and str(retry_after).isdigit():
+            retry_seconds = int(retry_after)
+        return float(self._feedback(keys=[self._get_bucket_key(url)], args=[
+            "backoff" if backoff else "ok",
+            RATE_LIMIT_INITIAL_RATE,
+            RATE_LIMIT_MIN_RATE,
+            RATE_LIMIT_MAX_RATE,
+            RATE_LIMIT_INCREASE,
+            RATE_LIMIT_DECREASE,
+            RATE_LIMIT_DECREASE_COOLDOWN,
+            retry_seconds,
+        ]))
+
+    def get_rate(self, url: str) -> float:
+        """해당 호스트의 현재 허용 속도(요청/초)를 반환합니다."""
+        rate = self.redis_client.hget(self._get_bucket_key(url), "rate")
+        return float(rate) if rate else RATE_LIMIT_INITIAL_RATE
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[HostRateLimiter]:
+    """프로세스 공용 속도 제한기를 반환합니다. 비활성화된 경우 None을 반환합니다."""
+    global _limiter
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = HostRateLimiter()
+    return _limiter
+
+
+def acquire(url: str) -> None:
+    """해당 URL의 호스트에 요청을 보내기 전 토큰을 얻을 때까지 대기합니다."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+    try:
+        limiter.acquire(url)
+    except redis.RedisError as e:
+        # 속도 제한기 장애가 크롤을 멈추게 하지 않도록 통과시킴
+        print(f"속도 제한 토큰 요청 중 오류 발생: {e}")
+
+
+def reserve(url: str) -> float:
+    """토큰을 요청하고 기다려야 할 시간(초)을 반환합니다. (비동기 엔진용)"""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0
+    try:
+        return limiter.reserve(url)
+    except redis.RedisError as e:
+        print(f"속도 제한 토큰 요청 중 오류 발생: {e}")
+        return 0
+
+
+def record(url: str, latency: float, status: Optional[int] = None,
+           error: bool = False, retry_after: Optional[str] = None) -> None:
+    """요청 결과를 속도 제한기에 반영합니다."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return
+    try:
+        limiter.record(url, latency, status, error, retry_after)
+    except redis.RedisError as e:
+        print(f"속도 제한 결과 기록 중 오류 발생: {e}")
@@ -0,0 +1,218 @@
+# utils/recategorize.py
+# cat_mapping.json이 바뀌었을 때 이미 저장된 contents의 카테고리를 다시 맞추는 작업입니다.
+# (`python -m utils.recategorize [--full] [--dry-run]`)
+#
+# 마지막으로 반영한 매핑(CAT_MAPPING_APPLIED_JSON)과 현재 매핑을 비교하여 추가/삭제된 패턴만 찾고,
+# 그 패턴의 고정 접두어로 scrap_info.scrap_url 인덱스를 범위 검색해 영향받는 페이지만 다시 분류합니다.
+# 카테고리 추가는 같은 페이지의 기존 행을 서버 안에서 복사(INSERT ... SELECT)하고, 삭제는 id 목록으로 일괄 처리합니다.
+# 삭제하거나 카테고리를 지운 행은 contents_tombstones(`python -m utils.migrate`로 생성)에 기록하여 내보내기(utils/exporter.py)가 인덱서에 삭제를 전달합니다.
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from utils.config import CAT_MAPPING_APPLIED_JSON, RECATEGORIZE_BATCH_SIZE, MYSQL_ID_COLUMNS
+from utils.db_manager import ensure_index, get_connection
+from utils.exporter import check_export_schema, record_tombstones
+from utils.url_matcher import (
+    compile_category_mapping,
+    get_pattern_prefix,
+    load_category_mapping,
+    match_categories,
+)
+
+# 한 번의 SELECT에 OR로 묶을 LIKE 조건 수
+PREFIX_GROUP_SIZE = 50
+
+
+def load_applied_mapping(path: str = CAT_MAPPING_APPLIED_JSON) -> Optional[Dict[str, List[str]]]:
+    """마지막으로 DB에 반영한 매핑을 로드합니다. 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_applied_mapping(mapping: Dict[str, List[str]], path: str = CAT_MAPPING_APPLIED_JSON) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def diff_mappings(old: Dict[str, List[str]], new: Dict[str, List[str]]) -> Set[Tuple[str, str]]:
+    """두 매핑 사이에 추가되거나 삭제된 (카테고리, 패턴) 집합을 반환합니다."""
+    old_pairs = {(category, pattern) for category, patterns in old.items() for pattern in patterns}
+    new_pairs = {(category, pattern) for category, patterns in new.items() for pattern in patterns}
+    return old_pairs ^ new_pairs
+
+
+def _escape_like(prefix: str) -> str:
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def find_affected_pages(cursor, changed: Optional[Set[Tuple[str, str]]]) -> Dict[int, str]:
+    """
+    바뀐 패턴에 일치하는 페이지(scrap_info)의 {log_id: URL}을 반환합니다. changed가 None이면 전체 페이지를 반환합니다.
+    패턴의 고정 접두어로 LIKE 'prefix%' 범위 검색을 하고, 실제 일치 여부는 정규식으로 다시 확인합니다.
+    """
+    log_id_column = MYSQL_ID_COLUMNS["scrap_info"]
+    base_query = f"SELECT {log_id_column}, scrap_url FROM scrap_info WHERE data_type = 0"
+
+    if changed is None:
+        cursor.execute(base_query)
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    compiled = compile_category_mapping({"changed": [pattern for _, pattern in changed]})
+    prefixes = sorted({get_pattern_prefix(pattern) for _, pattern in changed})
+    if "" in prefixes:
+        # 접두어가 없는 패턴('*...')은 범위를 좁힐 수 없으므로 전체를 확인
+        cursor.execute(base_query)
+        rows = cursor.fetchall()
+    else:
+        rows = []
+        for start in range(0, len(prefixes), PREFIX_GROUP_SIZE):
+            group = prefixes[start:start + PREFIX_GROUP_SIZE]
+            condition = " OR ".join(["scrap_url LIKE %s"] * len(group))
+            cursor.execute(f"{base_query} AND ({condition})", [_escape_like(p) + "%" for p in group])
+            rows.extend(cursor.fetchall())
+
+    return {log_id: url for log_id, url in rows if match_categories(url, compiled)}
+
+
+def _plan_batch(cursor, pages: Dict[int, Set[str]]) -> Dict[str, Any]:
+    """
+    페이지별 목표 카테고리와 현재 contents 행을 비교하여 추가/삭제/보존할 작업을 계산합니다.
+    모든 카테고리가 빠지는 페이지는 본문을 잃지 않도록 한 행을 카테고리 없음(NULL)으로 남겨,
+    이후 매핑이 다시 바뀌었을 때 그 행에서 복사할 수 있도록 합니다.
+    """
+    content_id_column = MYSQL_ID_COLUMNS["contents"]
+    log_ids = list(pages)
+    cursor.execute(
+        f"SELECT {content_id_column}, log_id, category FROM contents "
+        f"WHERE data_type = 0 AND log_id IN ({', '.join(['%s'] * len(log_ids))})",
+        log_ids)
+    current: Dict[int, List[Tuple[int, Optional[str]]]] = {}
+    for content_id, log_id, category in cursor.fetchall():
+        current.setdefault(log_id, []).append((content_id, category))
+
+    plan = {"inserts": [], "deletes": [], "clear": [], "missing": 0, "changed": 0}
+    for log_id, desired in pages.items():
+        rows = sorted(current.get(log_id, []))
+        if not rows:
+            # 카테고리가 없어 본문을 저장하지 않았던 페이지는 복사할 원본이 없음 (재크롤 또는 아카이브 재처리 필요)
+            if desired:
+                plan["missing"] += 1
+            continue
+
+        categories = {category for _, category in rows if category is not None}
+        source_id = rows[0][0]
+        inserts = [(source_id, category) for category in sorted(desired - categories)]
+        clear = []
+        if desired:
+            deletes = [cid for cid, category in rows if category is None or category not in desired]
+        else:
+            keeper = next((cid for cid, category in rows if category is None), source_id)
+            if rows[0][1] is not None and keeper == source_id:
+                clear.append(keeper)
+            deletes = [cid for cid, _ in rows if cid != keeper]
+
+        if inserts or deletes or clear:
+            plan["changed"] += 1
+            plan["inserts"].extend(inserts)
+            plan["deletes"].extend(deletes)
+            plan["clear"].extend(clear)
+    return plan
+
+
+def _apply_batch(cursor, plan: Dict[str, Any]) -> None:
+    """계산된 작업을 집합 단위 SQL로 적용합니다. (복사 원본이 지워질 수 있으므로 추가를 먼저 실행)"""
+    content_id_column = MYSQL_ID_COLUMNS["contents"]
+    if plan["inserts"]:
+        targets = " UNION ALL ".join(["SELECT %s AS source_id, %s AS category"] * len(plan["inserts"]))
+        cursor.execute(f"""
+            INSERT INTO contents (data_type, data, created_at, category, log_id, org_file_name, org_file_ext)
+            SELECT c.data_type, c.data, NOW(), t.category, c.log_id, c.org_file_name, c.org_file_ext
+            FROM contents c
+            JOIN ({targets}) t ON c.{content_id_column} = t.source_id
+        """, [value for pair in plan["inserts"] for value in pair])
+    record_tombstones(cursor, plan["clear"] + plan["deletes"])
+    if plan["clear"]:
+        cursor.execute(
+            f"UPDATE contents SET category = NULL WHERE {content_id_column} IN ({', '.join(['%s'] * len(plan['clear']))})",
+            plan["clear"])
+    if plan["deletes"]:
+        cursor.execute(
+            f"DELETE FROM contents WHERE {content_id_column} IN ({', '.join(['%s'] * len(plan['deletes']))})",
+            plan["deletes"])
+
+
+def recategorize(full: bool = False, dry_run: bool = False, batch_size: int = RECATEGORIZE_BATCH_SIZE) -> Dict[str, int]:
+    """
+    매핑 변경분에 해당하는 페이지의 카테고리를 다시 계산하여 contents에 반영하고 집계를 반환합니다.
+    배치마다 커밋하며, 현재 DB 상태를 기준으로 계산하므로 중간에 실패해도 다시 실행하면 이어서 맞춰집니다.
+    """
+    started = time.monotonic()
+    new_mapping = load_category_mapping()
+    old_mapping = load_applied_mapping()
+
+    if full or old_mapping is None:
+        if old_mapping is None and not full:
+            print("이전에 반영한 매핑이 없어 전체 페이지를 다시 분류합니다.")
+        changed = None
+    else:
+        changed = diff_mappings(old_mapping, new_mapping)
+        if not changed:
+            print("매핑 변경 사항이 없습니다.")
+            return {"pages": 0, "changed": 0, "inserted": 0, "deleted": 0, "missing": 0}
+        for category, pattern in sorted(changed):
+            state = "추가" if pattern in new_mapping.get(category, []) else "삭제"
+            print(f"ㄴ패턴 {state}: [{category}] {pattern}")
+
+    compiled = compile_category_mapping(new_mapping)
+    totals = {"pages": 0, "changed": 0, "inserted": 0, "deleted": 0, "missing": 0}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        ensure_index(cursor, "scrap_info", "scrap_url", "idx_scrap_info_scrap_url", length=255)
+        ensure_index(cursor, "contents", "log_id", "idx_contents_log_id")
+        check_export_schema(cursor)
+
+        affected = find_affected_pages(cursor, changed)
+        totals["pages"] = len(affected)
+        print(f"영향받는 페이지: {len(affected)}개")
+
+        log_ids = sorted(affected)
+        for start in range(0, len(log_ids), batch_size):
+            batch = {log_id: set(match_categories(affected[log_id], compiled))
+                     for log_id in log_ids[start:start + batch_size]}
+            plan = _plan_batch(cursor, batch)
+            if not dry_run:
+                _apply_batch(cursor, plan)
+                conn.commit()
+            totals["changed"] += plan["changed"]
+            totals["inserted"] += len(plan["inserts"])
+            totals["deleted"] += len(plan["deletes"])
+            totals["missing"] += plan["missing"]
+    except Exception as e:
+        print(f"카테고리 재분류 중 오류 발생: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not dry_run:
+        save_applied_mapping(new_mapping)
+    print(f"카테고리 재분류 {'계획' if dry_run else '완료'}: 페이지 {totals['changed']}개 변경, "
+          f"행 추가 {totals['inserted']}개, 삭제 {totals['deleted']}개 ({time.monotonic() - started:.1f}초)")
+    if totals["missing"]:
+        print(f"경고: 본문이 저장되지 않은 페이지 {totals['missing']}개는 새 카테고리를 추가하지 못했습니다. "
+              f"(재크롤하거나 `python -m scraper.page_archive`로 재처리)")
+    return totals
+
+
+if __name__ == "__main__":
+    recategorize(full="--full" in sys.argv, dry_run="--dry-run" in sys.argv)
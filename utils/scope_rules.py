@@ -0,0 +1,179 @@
+# utils/scope_rules.py
+# 큐에 넣기 전에 URL을 걸러내는 탐색 영역 / 크롤러 함정 규칙 엔진입니다.
+# scope_rules.json의 "default" 규칙에 START_KEY별 규칙을 덧붙여 한 번만 컴파일하고,
+# 어떤 규칙이 몇 개의 URL을 걸러냈는지 집계합니다.
+#
+# 쿼리 조합 함정(max_query_variants_per_path)은 파라미터 이름과, 달력/검색처럼 값이 무한히 늘어나는
+# 파라미터(variant_params)의 값만으로 조합을 구분합니다. (articleNo 같은 ID 파라미터는 값이 달라도 같은 조합)
+# 조합은 모든 워커가 공유하도록 Redis 집합(scope_variants:<key>:<경로>)에 기록하며,
+# query_variant_window초가 지나면 집합이 만료되어 다시 허용합니다.
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
+import redis
+from utils.config import REDIS_CONFIG, SCOPE_RULES_JSON
+
+DEFAULT_TRAPS = {
+    "max_query_params": 6,  # 쿼리 파라미터 수 상한
+    "max_path_depth": 12,  # 경로 깊이 상한
+    "max_segment_repeat": 2,  # 같은 경로 조각이 반복될 수 있는 최대 횟수 (/a/b/a/b/a/... 방지)
+    "max_query_variants_per_path": 300,  # 같은 경로에서 허용할 서로 다른 쿼리 조합 수 (달력/검색 폭증 방지)
+    # 값까지 조합에 포함할 파라미터 이름 (그 외 파라미터는 이름만 포함)
+    "variant_params": "^(year|month|day|date|week|start_?date|end_?date|.*search.*|keyword|query|q|sort.*|order.*)$",
+    "query_variant_window": 86400,  # 쿼리 조합 기록을 유지하는 시간 (초)
+}
+
+# 조합이 이미 기록되어 있거나 상한 미만이면 기록하고 1을, 상한에 도달했으면 0을 반환하는 스크립트
+VARIANT_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 1 then
+    return 1
+end
+if redis.call('SCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SADD', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 1
+"""
+
+
+def load_scope_rules() -> Dict[str, Any]:
+    """탐색 영역 규칙 파일을 로드합니다."""
+    try:
+        with open(SCOPE_RULES_JSON, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"경고: {SCOPE_RULES_JSON} 파일을 찾을 수 없습니다.")
+        return {}
+    except json.JSONDecodeError:
+        print(f"경고: {SCOPE_RULES_JSON} 파일의 JSON 형식이 올바르지 않습니다.")
+        return {}
+
+
+def _compile(patterns: List[str]) -> Optional[re.Pattern]:
+    """정규식 목록을 하나의 정규식으로 합쳐 컴파일합니다."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+class ScopeRules:
+    """
+    키별 허용(allow)/차단(deny)/통합인증(sso) 규칙과 함정 휴리스틱을 적용합니다.
+    키에 정의된 allow는 default의 allow를 대체하고, deny와 sso는 default에 추가됩니다.
+    """
+
+    def __init__(self, rules: Dict[str, Any], key: str, redis_client=None):
+        default = rules.get("default", {})
+        specific = rules.get(key, {})
+        self.key = key
+        self.allow = _compile(specific.get("allow", default.get("allow", [])))
+        self.deny = _compile(default.get("deny", []) + specific.get("deny", []))
+        self.sso = _compile(default.get("sso", []) + specific.get("sso", []))
+        self.traps = {**DEFAULT_TRAPS, **default.get("traps", {}), **specific.get("traps", {})}
+        self.variant_params = re.compile(self.traps["variant_params"], re.IGNORECASE)
+        self.redis_client = redis_client or redis.Redis(
+            host=REDIS_CONFIG["host"],
+            port=REDIS_CONFIG["port"],
+            password=REDIS_CONFIG["password"],
+            db=REDIS_CONFIG["db"],
+            decode_responses=True
+        )
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, url: str, count_variants: bool = True) -> Optional[str]:
+        """
+        URL을 걸러낸 규칙 이름을 반환합니다. 통과하면 None을 반환합니다.
+        count_variants가 False이면 쿼리 조합 함정을 검사하지 않고 조합으로 기록하지도 않습니다. (이미지 등)
+        """
+        reason = self._check(url, count_variants)
+        with self._lock:
+            self.stats[reason or "accepted"] += 1
+        return reason
+
+    def allows(self, url: str, count_variants: bool = True) -> bool:
+        """URL이 탐색 영역 안에 있고 함정 규칙에 걸리지 않는지 판단합니다."""
+        return self.check(url, count_variants) is None
+
+    def _signature(self, params: List[tuple]) -> str:
+        """쿼리 조합을 구분하는 문자열입니다. variant_params가 아닌 파라미터는 이름만 사용합니다."""
+        return "&".join(sorted(f"{k}={v}" if self.variant_params.search(k) else k for k, v in params))
+
+    def _allow_variant(self, path_key: str, signature: str) -> bool:
+        """경로의 쿼리 조합을 공유 집합에 기록하고, 상한에 도달했으면 False를 반환합니다. (Redis 오류 시 허용)"""
+        digest = hashlib.blake2b(path_key.encode("utf-8"), digest_size=8).hexdigest()
+        try:
+            return bool(self.redis_client.eval(
+                VARIANT_SCRIPT, 1, f"scope_variants:{self.key}:{digest}", signature,
+                self.traps["max_query_variants_per_path"], self.traps["query_variant_window"]))
+        except redis.RedisError as e:
+            print(f"쿼리 조합 확인 중 오류 발생: {e}")
+            return True
+
+    def _check(self, url: str, count_variants: bool = True) -> Optional[str]:
+        try:
+            parsed = urlparse(url)
+        except ValueError:
+            return "invalid"
+        if not parsed.scheme or not parsed.netloc:
+            return "invalid"
+
+        if self.allow is not None and not self.allow.search(url):
+            return "not_allowed"
+        if self.deny is not None and self.deny.search(url):
+            return "deny"
+        if self.sso is not None and self.sso.search(url):
+            return "sso"
+
+        params = parse_qsl(parsed.query, keep_blank_values=True)
+        if len(params) > self.traps["max_query_params"]:
+            return "trap_query_params"
+
+        segments = [s for s in parsed.path.split("/") if s]
+        if len(segments) > self.traps["max_path_depth"]:
+            return "trap_path_depth"
+        if segments and max(Counter(segments).values()) > self.traps["max_segment_repeat"]:
+            return "trap_path_repeat"
+
+        if parsed.query and count_variants:
+            if not self._allow_variant(f"{parsed.netloc}{parsed.path}", self._signature(params)):
+                return "trap_query_variants"
+        return None
+
+    def report(self, redis_client=None) -> Dict[str, int]:
+        """규칙별로 걸러낸 URL 수를 출력하고, redis_client가 주어지면 scope_stats:<key> 해시에 누적합니다."""
+        with self._lock:
+            stats = dict(self.stats)
+            self.stats.clear()
+        if stats:
+            print("탐색 영역 규칙 집계: " + ", ".join(f"{name}={count}" for name, count in sorted(stats.items())))
+            if redis_client is not None:
+                try:
+                    pipe = redis_client.pipeline()
+                    for name, count in stats.items():
+                        pipe.hincrby(f"scope_stats:{self.key}", name, count)
+                    pipe.execute()
+                except Exception as e:
+                    print(f"탐색 영역 규칙 집계 저장 중 오류 발생: {e}")
+        return stats
+
+
+_scope_rules: Dict[str, ScopeRules] = {}
+_scope_rules_lock = threading.Lock()
+
+
+def get_scope_rules(key: str) -> ScopeRules:
+    """키에 해당하는 컴파일된 규칙을 반환합니다. (프로세스당 한 번만 컴파일)"""
+    if key not in _scope_rules:
+        with _scope_rules_lock:
+            if key not in _scope_rules:
+                _scope_rules[key] = ScopeRules(load_scope_rules(), key)
+    return _scope_rules[key]
@@ -1,6 +1,6 @@
 import json
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from utils.config import CAT_MAPPING_JSON
 
 def load_category_mapping() -> Dict[str, List[str]]:
@@ -41,4 +41,24 @@ def get_categories_for_url(url: str):
     if len(match_results) > 0:
         print('ㄴ-', ' '.join(matched_categories))
         
-    return matched_categories 
\ No newline at end of file
+    return matched_categories
+
+def compile_category_mapping(mapping: Dict[str, List[str]]) -> List[Tuple[str, str, re.Pattern]]:
+    """카테고리 매핑을 (카테고리, 패턴, 컴파일된 정규식) 목록으로 변환합니다. (여러 URL에 반복 적용할 때 사용)"""
+    return [
+        (category, pattern, re.compile(pattern_to_regex(pattern)))
+        for category, patterns in mapping.items()
+        for pattern in patterns
+    ]
+
+def match_categories(url: str, compiled: List[Tuple[str, str, re.Pattern]]) -> List[str]:
+    """컴파일된 매핑에서 URL에 일치하는 카테고리 목록을 (중복 없이) 반환합니다."""
+    matched = []
+    for category, _, regex in compiled:
+        if category not in matched and regex.match(url):
+            matched.append(category)
+    return matched
+
+def get_pattern_prefix(pattern: str) -> str:
+    """패턴에서 와일드카드('*') 앞의 고정된 접두어를 반환합니다. (인덱스 범위 검색용)"""
+    return pattern.split('*', 1)[0]
@@ -0,0 +1,186 @@
+# utils/worker_registry.py
+# Redis 기반 워커 레지스트리입니다.
+# 각 워커는 하트비트와 처리 중 항목 수를 기록하고, 모든 워커가 같은 기준으로 크롤 종료 여부를 판단합니다.
+
+import json
+import os
+import signal
+import socket
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+from utils.config import WORKER_HEARTBEAT_INTERVAL, WORKER_HEARTBEAT_TTL
+from utils.queue_manager import RedisQueueManager
+from utils.queue_codec import peek_url
+from utils.frontier_spill import get_spilled_key
+
+# 큐와 디스크에 넘긴 항목이 없고 살아있는 모든 워커의 처리 중 목록이 비어있을 때만 1을 반환합니다.
+# KEYS[1]: 큐 키, KEYS[2]: 워커 레지스트리 해시 키, KEYS[3]: 디스크에 넘긴 항목 수 키, ARGV[1]: 처리 중 목록 키 접두사
+COMPLETION_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) > 0 then
+    return 0
+end
+if tonumber(redis.call('GET', KEYS[3]) or '0') > 0 then
+    return 0
+end
+for _, worker_id in ipairs(redis.call('HKEYS', KEYS[2])) do
+    if redis.call('LLEN', ARGV[1] .. worker_id) > 0 then
+        return 0
+    end
+end
+return 1
+"""
+
+
+class WorkerRegistry:
+    """
+    워커 등록, 하트비트, 처리 중 항목 추적, 종료 판정을 담당합니다.
+    하트비트가 끊긴 워커의 처리 중 항목은 살아있는 워커가 큐 앞쪽으로 되돌려 이어서 처리합니다.
+    """
+
+    def __init__(self, queue_manager: RedisQueueManager, key: str,
+                 heartbeat_interval: float = WORKER_HEARTBEAT_INTERVAL,
+                 heartbeat_ttl: int = WORKER_HEARTBEAT_TTL):
+        self.queue_manager = queue_manager
+        self.redis_client = queue_manager.redis_client
+        self.key = key
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_ttl = heartbeat_ttl
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.registry_key = f"workers:{key}"
+        self.heartbeat_key_prefix = f"worker_heartbeat:{key}:"
+        self.reap_lock_key = f"worker_reap_lock:{key}"
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.draining = False
+        self._stop_event = threading.Event()
+        self._heartbeat_thread = None
+
+    def _get_heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.heartbeat_key_prefix}{worker_id}"
+
+    def _get_inflight_key(self, worker_id: str) -> str:
+        return self.queue_manager._get_inflight_key(self.key, worker_id)
+
+    def _worker_info(self) -> Dict[str, Any]:
+        return {
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "heartbeat_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "in_flight": self.redis_client.llen(self._get_inflight_key(self.worker_id)),
+            "state": "draining" if self.draining else "running",
+        }
+
+    def heartbeat(self) -> None:
+        """하트비트 키의 TTL을 갱신하고 레지스트리의 워커 정보를 업데이트합니다."""
+        pipe = self.redis_client.pipeline()
+        pipe.set(self._get_heartbeat_key(self.worker_id), self.worker_id, ex=self.heartbeat_ttl)
+        pipe.hset(self.registry_key, self.worker_id, json.dumps(self._worker_info()))
+        pipe.execute()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop_event.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"워커 하트비트 갱신 중 오류 발생: {e}")
+
+    def register(self) -> None:
+        """워커를 레지스트리에 등록하고 백그라운드 하트비트를 시작합니다."""
+        self.heartbeat()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        print(f"워커 등록: {self.worker_id}")
+
+    def deregister(self) -> None:
+        """하트비트를 멈추고, 남은 처리 중 항목을 큐로 되돌린 뒤 레지스트리에서 제거합니다."""
+        self._stop_event.set()
+        try:
+            requeued = self._requeue_items(self.worker_id)
+            if requeued:
+                print(f"처리하지 못한 항목 {requeued}개를 큐로 되돌렸습니다.")
+            self.redis_client.hdel(self.registry_key, self.worker_id)
+            self.redis_client.delete(self._get_heartbeat_key(self.worker_id))
+            print(f"워커 등록 해제: {self.worker_id}")
+        except Exception as e:
+            print(f"워커 등록 해제 중 오류 발생: {e}")
+
+    def request_drain(self, signum=None, frame=None) -> None:
+        """현재 항목까지만 처리하고 종료하도록 표시합니다. (SIGTERM 핸들러)"""
+        if not self.draining:
+            print(f"종료 신호 수신, 현재 작업을 마친 뒤 종료합니다: {self.worker_id}")
+        self.draining = True
+
+    def install_signal_handlers(self) -> None:
+        """SIGTERM을 받으면 진행 중인 항목을 마치고 정상 종료하도록 핸들러를 등록합니다."""
+        signal.signal(signal.SIGTERM, self.request_drain)
+
+    def _requeue_items(self, worker_id: str) -> int:
+        """워커의 처리 중 항목을 큐 앞쪽으로 되돌리고 처리 중 표시를 해제합니다."""
+        inflight_key = self._get_inflight_key(worker_id)
+        raws = self.redis_client.lrange(inflight_key, 0, -1)
+        if not raws:
+            return 0
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        for raw in reversed(raws):
+            pipe.lpush(self.queue_manager._get_queue_key(self.key), raw)
+            url = peek_url(raw)
+            if url:
+                pipe.srem(self.queue_manager._get_processing_key(self.key), url)
+        pipe.delete(inflight_key)
+        pipe.execute()
+        return len(raws)
+
+    def _adopt_segments(self, worker_id: str) -> int:
+        """응답 없는 워커가 디스크에 기록 중이던(아직 등록하지 않은) 세그먼트를 닫아 등록합니다."""
+        host, pid, _ = worker_id.rsplit(":", 2)
+        adopted = self.queue_manager.adopt_spill_segments(self.key, host, int(pid))
+        if adopted:
+            print(f"응답 없는 워커의 세그먼트 항목 {adopted}개를 등록했습니다: {worker_id}")
+        return adopted
+
+    def reap_dead_workers(self) -> int:
+        """
+        하트비트가 끊긴 워커를 레지스트리에서 제거하고, 그 워커가 처리 중이던 항목을 가져와 큐에 되돌립니다.
+        디스크에 기록 중이던 세그먼트도 닫아 등록합니다. 되돌리거나 등록한 항목 수를 반환합니다.
+        """
+        if not self.redis_client.set(self.reap_lock_key, self.worker_id, nx=True, ex=self.heartbeat_ttl):
+            return 0
+
+        stolen = 0
+        try:
+            for worker_id in self.redis_client.hkeys(self.registry_key):
+                if worker_id == self.worker_id or self.redis_client.exists(self._get_heartbeat_key(worker_id)):
+                    continue
+                stolen += self._requeue_items(worker_id)
+                stolen += self._adopt_segments(worker_id)
+                self.redis_client.hdel(self.registry_key, worker_id)
+                print(f"응답 없는 워커 제거: {worker_id}")
+        finally:
+            self.redis_client.delete(self.reap_lock_key)
+
+        if stolen:
+            print(f"응답 없는 워커의 항목 {stolen}개를 큐로 되돌렸습니다.")
+        return stolen
+
+    def is_crawl_complete(self) -> bool:
+        """큐와 디스크에 넘긴 항목이 없고 어떤 워커도 항목을 처리 중이지 않은지 원자적으로 확인합니다."""
+        return bool(self.redis_client.eval(
+            COMPLETION_SCRIPT, 3,
+            self.queue_manager._get_queue_key(self.key),
+            self.registry_key,
+            get_spilled_key(self.key),
+            self.queue_manager._get_inflight_key(self.key, ""),
+        ))
+
+    def active_workers(self) -> List[Dict[str, Any]]:
+        """레지스트리에 등록된 워커 정보 목록을 반환합니다."""
+        workers = []
+        for worker_id, info in self.redis_client.hgetall(self.registry_key).items():
+            data = json.loads(info)
+            data["worker_id"] = worker_id
+            data["alive"] = bool(self.redis_client.exists(self._get_heartbeat_key(worker_id)))
+            workers.append(data)
+        return workers